@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
     'inbox',
     'staff',
     'site_settings',
+    'integrations',
 ]
 
 MIDDLEWARE = [
@@ -95,9 +97,32 @@ DATABASES = {
 
 # Use SQLite for tests by default to avoid permission issues with PostgreSQL.
 if 'test' in sys.argv and os.environ.get('DJANGO_TEST_USE_SQLITE', '1') == '1':
+    # A file test database lets the stress-test threads share it; the busy
+    # timeout lets concurrent writers queue up instead of failing with
+    # "database is locked".
     DATABASES['default'] = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'test_db.sqlite3',
+        'OPTIONS': {'timeout': 20},
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+# The file backend is shared by all worker processes on the host, so cache
+# invalidation (e.g. booking availability versions) is seen by every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+if 'test' in sys.argv:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 
 
@@ -146,6 +171,10 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Files generated while tests run (ticket QR codes) must not land in the real media folder.
+if 'test' in sys.argv:
+    MEDIA_ROOT = Path(tempfile.gettempdir()) / 'anti_cafe_reservation_test_media'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 EMAIL_STUB_ENABLED = True
@@ -164,3 +193,21 @@ EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
 DEFAULT_FROM_EMAIL = ''
 SERVER_EMAIL = ''
+
+# Availability engine for booking search: 'python' or 'numpy' (falls back to
+# 'python' when NumPy is not installed).
+BOOKING_AVAILABILITY_BACKEND = 'python'
+
+# Telegram Bot API endpoint (override to point at a local fake server) and the
+# window in seconds within which queued notifications are merged into one message.
+TELEGRAM_API_URL = 'https://api.telegram.org'
+TELEGRAM_COALESCE_SECONDS = 10
+
+# Reminders: how far ahead `send_reminders` looks, and the public site address
+# used to build absolute ticket links in e-mails sent outside a request.
+REMINDER_LEAD_MINUTES = 120
+SITE_URL = ''
+
+# TrueType font with Cyrillic glyphs for the downloadable ticket image. When
+# empty, DejaVu Sans is looked up among system fonts, then Pillow's built-in font is used.
+TICKET_FONT_PATH = ''
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Reservation, Table
+from .models import OccupancyRollup, Reservation, SlotHold, Table
 
 
 @admin.register(Table)
@@ -14,6 +14,20 @@ class TableAdmin(admin.ModelAdmin):
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
     """Админ-конфигурация для бронирований."""
-    list_display = ('date', 'start_time', 'table', 'seats', 'status', 'customer_name')
+    list_display = ('date', 'start_time', 'table', 'seats', 'status', 'customer_name', 'arrived_at')
     list_filter = ('status', 'date')
     search_fields = ('customer_name', 'customer_email', 'public_code')
+
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    """Админ-конфигурация для удержаний слотов."""
+    list_display = ('date', 'start_time', 'end_time', 'table', 'expires_at')
+    list_filter = ('date',)
+
+
+@admin.register(OccupancyRollup)
+class OccupancyRollupAdmin(admin.ModelAdmin):
+    """Админ-конфигурация для сводок занятости."""
+    list_display = ('date', 'hour', 'table', 'booked_minutes', 'seat_minutes', 'no_show_count', 'cancelled_count')
+    list_filter = ('date', 'table')
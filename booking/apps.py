@@ -6,3 +6,7 @@ class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
     verbose_name = 'Бронирования'
+
+    def ready(self):
+        """Подключает обработчики сигналов приложения."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,263 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings as django_settings
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from site_settings.models import SiteSettings
+
+from .constants import OCCUPYING_STATUSES
+from .schedule import ScheduleIndex
+from .utils import get_working_window
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy является необязательной зависимостью.
+    np = None
+
+
+class DayOccupancy:
+    """Занятость столов на дату, загруженная одним запросом к бронированиям.
+
+    Хранит активные столы и интервалы занятости по каждому столу и отвечает
+    на вопросы о свободных столах и времени без обращений к базе на каждый слот.
+    """
+
+    def __init__(self, date, tables, busy, valid_until=None):
+        """Сохраняет дату, активные столы, интервалы занятости и срок актуальности."""
+        self.date = date
+        self.tables = list(tables)
+        self.busy = busy
+        self.valid_until = valid_until
+
+    @classmethod
+    def load(cls, date, exclude_hold=None) -> "DayOccupancy":
+        """Загружает активные столы, занимающие брони и действующие удержания на дату."""
+        Table = apps.get_model('booking', 'Table')
+        Reservation = apps.get_model('booking', 'Reservation')
+        tables = Table.objects.filter(is_active=True).order_by('capacity', 'name')
+        rows = Reservation.objects.filter(
+            date=date,
+            status__in=OCCUPYING_STATUSES,
+        ).values_list('table_id', 'start_time', 'end_time')
+        busy = defaultdict(list)
+        for table_id, start_time, end_time in rows:
+            busy[table_id].append((start_time, end_time))
+        valid_until = None
+        for _, table_id, start_time, end_time, expires_at in _active_holds(exclude_hold, date=date):
+            busy[table_id].append((start_time, end_time))
+            valid_until = min(valid_until or expires_at, expires_at)
+        return cls(date, tables, busy, valid_until)
+
+    @classmethod
+    def load_range(cls, start, end, exclude_hold=None) -> dict:
+        """Загружает занятость на каждую дату диапазона включительно.
+
+        Выполняет по одному запросу к столам, броням и удержаниям за весь
+        диапазон и один к особым дням, после чего все даты считаются в памяти.
+        """
+        Table = apps.get_model('booking', 'Table')
+        Reservation = apps.get_model('booking', 'Reservation')
+        tables = list(Table.objects.filter(is_active=True).order_by('capacity', 'name'))
+        rows = Reservation.objects.filter(
+            date__range=(start, end),
+            status__in=OCCUPYING_STATUSES,
+        ).values_list('date', 'table_id', 'start_time', 'end_time')
+        busy_by_date = defaultdict(lambda: defaultdict(list))
+        for date, table_id, start_time, end_time in rows:
+            busy_by_date[date][table_id].append((start_time, end_time))
+        valid_until_by_date = {}
+        for date, table_id, start_time, end_time, expires_at in _active_holds(exclude_hold, date__range=(start, end)):
+            busy_by_date[date][table_id].append((start_time, end_time))
+            valid_until_by_date[date] = min(valid_until_by_date.get(date, expires_at), expires_at)
+
+        windows = ScheduleIndex.load(start, end).windows_for(start, end)
+        results = {}
+        earliest_start = None
+        for date, window in windows.items():
+            occupancy = cls(date, tables, busy_by_date.get(date, {}), valid_until_by_date.get(date))
+            occupancy.window = window
+            if window is not None:
+                if earliest_start is None:
+                    earliest_start = occupancy.earliest_start
+                occupancy.earliest_start = earliest_start
+            results[date] = occupancy
+        return results
+
+    @cached_property
+    def window(self):
+        """Рабочее окно на дату или None, если день закрыт."""
+        return get_working_window(self.date)
+
+    @cached_property
+    def earliest_start(self):
+        """Самое раннее допустимое начало с учетом минимального предупреждения."""
+        settings = SiteSettings.get_solo()
+        earliest = timezone.localtime() + timedelta(minutes=settings.min_notice_minutes)
+        return earliest.replace(tzinfo=None)
+
+    def is_free(self, table_id, start_time, end_time) -> bool:
+        """Проверяет, что интервал не пересекается с бронями стола."""
+        for busy_start, busy_end in self.busy.get(table_id, ()):
+            if busy_start < end_time and busy_end > start_time:
+                return False
+        return True
+
+    def free_tables(self, start_time, end_time, seats) -> list:
+        """Возвращает активные столы, свободные в интервал и вмещающие гостей."""
+        return [
+            table for table in self.tables
+            if table.capacity >= seats and self.is_free(table.id, start_time, end_time)
+        ]
+
+    def slots(self, duration_minutes, step_minutes=30) -> list:
+        """Возвращает пары (начало, окончание) слотов рабочего окна после порога предупреждения."""
+        if self.window is None:
+            return []
+        open_time, close_time = self.window
+        start_dt = datetime.combine(self.date, open_time)
+        close_dt = datetime.combine(self.date, close_time)
+        duration = timedelta(minutes=duration_minutes)
+        step = timedelta(minutes=step_minutes)
+        results = []
+        while start_dt + duration <= close_dt:
+            if start_dt >= self.earliest_start:
+                results.append((start_dt.time(), (start_dt + duration).time()))
+            start_dt += step
+        return results
+
+    def free_start_times(self, duration_minutes, seats, step_minutes=30) -> list:
+        """Возвращает времена начала, для которых найдется хотя бы один стол."""
+        tables = [table for table in self.tables if table.capacity >= seats]
+        return [
+            start_time
+            for start_time, end_time in self.slots(duration_minutes, step_minutes)
+            if any(self.is_free(table.id, start_time, end_time) for table in tables)
+        ]
+
+    def free_tables_for_day(self, duration_minutes, seats, step_minutes=30) -> list:
+        """Возвращает столы, у которых есть хотя бы один свободный слот за день."""
+        slots = self.slots(duration_minutes, step_minutes)
+        tables = [
+            table for table in self.tables
+            if table.capacity >= seats
+            and any(self.is_free(table.id, start_time, end_time) for start_time, end_time in slots)
+        ]
+        return sorted(tables, key=lambda t: (t.capacity, t.name))
+
+    def free_start_times_for_table(self, table, duration_minutes, seats, step_minutes=30) -> list:
+        """Возвращает свободные времена начала для выбранного стола."""
+        if seats > table.capacity:
+            return []
+        return [
+            start_time
+            for start_time, end_time in self.slots(duration_minutes, step_minutes)
+            if self.is_free(table.id, start_time, end_time)
+        ]
+
+
+def _active_holds(exclude_hold=None, **filters):
+    """Возвращает неистекшие удержания слотов как кортежи (дата, стол, начало, окончание, срок)."""
+    SlotHold = apps.get_model('booking', 'SlotHold')
+    holds = SlotHold.objects.filter(expires_at__gt=timezone.now(), **filters)
+    if exclude_hold:
+        holds = holds.exclude(token=exclude_hold)
+    return holds.values_list('date', 'table_id', 'start_time', 'end_time', 'expires_at')
+
+
+def _minutes(value, round_up=False) -> int:
+    """Переводит время в минуты от начала суток, при необходимости округляя вверх."""
+    minutes = value.hour * 60 + value.minute
+    if round_up and (value.second or value.microsecond):
+        minutes += 1
+    return minutes
+
+
+class MatrixOccupancy(DayOccupancy):
+    """Занятость дня в виде булевой матрицы NumPy: столы × минуты рабочего окна.
+
+    Брони закрашиваются срезами, свободные слоты для длительности находятся
+    скользящим окном по кумулятивным суммам, а фильтр по местам — маской
+    по вектору вместимостей. Результаты совпадают с DayOccupancy.
+    """
+
+    @cached_property
+    def _layout(self):
+        """Возвращает (минута открытия, индексы строк, кумулятивные суммы, вместимости)."""
+        open_time, close_time = self.window
+        open_min = _minutes(open_time)
+        width = max(_minutes(close_time) - open_min, 0)
+        rows = {table.id: index for index, table in enumerate(self.tables)}
+        matrix = np.zeros((len(self.tables), width), dtype=bool)
+        for table_id, intervals in self.busy.items():
+            row = rows.get(table_id)
+            if row is None:
+                continue
+            for busy_start, busy_end in intervals:
+                # Бронь через полночь (окончание раньше начала) не пересекается со слотами дня.
+                start = max(_minutes(busy_start) - open_min, 0)
+                end = min(_minutes(busy_end, round_up=True) - open_min, width)
+                if end > start:
+                    matrix[row, start:end] = True
+        cumulative = np.zeros((len(self.tables), width + 1), dtype=np.int32)
+        np.cumsum(matrix, axis=1, out=cumulative[:, 1:])
+        capacities = np.array([table.capacity for table in self.tables], dtype=np.int64)
+        return open_min, rows, cumulative, capacities
+
+    def _free_matrix(self, duration_minutes, step_minutes):
+        """Возвращает допустимые времена начала и матрицу свободы столы × слоты."""
+        slots = self.slots(duration_minutes, step_minutes)
+        open_min, rows, cumulative, capacities = self._layout
+        offsets = np.array([_minutes(start) - open_min for start, _ in slots], dtype=np.int64)
+        free = (cumulative[:, offsets + duration_minutes] - cumulative[:, offsets]) == 0
+        return [start for start, _ in slots], free
+
+    def free_start_times(self, duration_minutes, seats, step_minutes=30) -> list:
+        """Возвращает времена начала, для которых найдется хотя бы один стол."""
+        if self.window is None:
+            return []
+        starts, free = self._free_matrix(duration_minutes, step_minutes)
+        capacities = self._layout[3]
+        fits = free[capacities >= seats].any(axis=0)
+        return [start for start, ok in zip(starts, fits) if ok]
+
+    def free_tables_for_day(self, duration_minutes, seats, step_minutes=30) -> list:
+        """Возвращает столы, у которых есть хотя бы один свободный слот за день."""
+        if self.window is None:
+            return []
+        _, free = self._free_matrix(duration_minutes, step_minutes)
+        capacities = self._layout[3]
+        mask = free.any(axis=1) & (capacities >= seats)
+        tables = [table for table, ok in zip(self.tables, mask) if ok]
+        return sorted(tables, key=lambda t: (t.capacity, t.name))
+
+    def free_start_times_for_table(self, table, duration_minutes, seats, step_minutes=30) -> list:
+        """Возвращает свободные времена начала для выбранного стола."""
+        if self.window is None or seats > table.capacity:
+            return []
+        row = self._layout[1].get(table.id)
+        if row is None:
+            # Неактивного стола нет в матрице: проверяем его интервалы напрямую.
+            return super().free_start_times_for_table(table, duration_minutes, seats, step_minutes)
+        starts, free = self._free_matrix(duration_minutes, step_minutes)
+        return [start for start, ok in zip(starts, free[row]) if ok]
+
+
+def get_occupancy_class():
+    """Возвращает класс движка занятости по настройке BOOKING_AVAILABILITY_BACKEND."""
+    backend = getattr(django_settings, 'BOOKING_AVAILABILITY_BACKEND', 'python')
+    if backend == 'numpy' and np is not None:
+        return MatrixOccupancy
+    return DayOccupancy
+
+
+def load_occupancy(date, exclude_hold=None) -> DayOccupancy:
+    """Загружает занятость на дату выбранным движком, не считая собственное удержание."""
+    return get_occupancy_class().load(date, exclude_hold)
+
+
+def load_occupancy_range(start, end, exclude_hold=None) -> dict:
+    """Загружает занятость на диапазон дат выбранным движком."""
+    return get_occupancy_class().load_range(start, end, exclude_hold)
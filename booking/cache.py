@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from site_settings.cache import bump_generation, get_generation
+from site_settings.models import SiteSettings
+
+KEY_PREFIX = 'booking:availability'
+GLOBAL_VERSION_KEY = f'{KEY_PREFIX}:version'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+CACHE_TIMEOUT = 60 * 10
+
+
+def _date_version_key(date) -> str:
+    """Возвращает ключ версии доступности для даты."""
+    return f'{GLOBAL_VERSION_KEY}:{date.isoformat()}'
+
+
+def _count(key) -> None:
+    """Увеличивает счетчик попаданий или промахов."""
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def bump_availability(date=None) -> None:
+    """Сбрасывает кеш доступности для даты или для всех дат, если дата не указана."""
+    if date is None:
+        bump_generation(GLOBAL_VERSION_KEY)
+    else:
+        bump_generation(_date_version_key(date))
+
+
+def bump_availability_on_commit(dates) -> None:
+    """Сбрасывает кеш доступности дат после фиксации текущей транзакции.
+
+    До фиксации параллельный расчет еще видит прежние данные и сохранил бы
+    их под новой версией на все время жизни записи.
+    """
+    dates = {date for date in dates if date}
+    if dates:
+        transaction.on_commit(lambda: [bump_availability(date) for date in dates])
+
+
+def _notice_cutoff(date) -> str:
+    """Возвращает часть ключа, зависящую от минимального времени предупреждения."""
+    settings = SiteSettings.get_solo()
+    earliest = timezone.localtime() + timedelta(minutes=settings.min_notice_minutes)
+    if earliest.date() < date:
+        return ''
+    if earliest.date() > date:
+        return 'closed'
+    # Слоты начинаются в целые минуты, поэтому порог можно округлить вверх до минуты.
+    if earliest.second or earliest.microsecond:
+        earliest += timedelta(minutes=1)
+    return earliest.strftime('%H%M')
+
+
+def availability_fingerprint(date) -> str:
+    """Возвращает строку версий, от которых зависит доступность на дату."""
+    return ':'.join(
+        str(part)
+        for part in (
+            get_generation(GLOBAL_VERSION_KEY),
+            get_generation(_date_version_key(date)),
+            _notice_cutoff(date),
+        )
+    )
+
+
+def _timeout_until(valid_until) -> int:
+    """Возвращает время жизни записи, не переживающей ближайшее истечение удержания."""
+    if valid_until is None:
+        return CACHE_TIMEOUT
+    return min(CACHE_TIMEOUT, int((valid_until - timezone.now()).total_seconds()))
+
+
+def cached_availability(kind, date, params, compute):
+    """Возвращает результат расчета доступности из кеша или вычисляет и сохраняет его.
+
+    compute возвращает пару (значение, срок актуальности или None); запись
+    живет не дольше этого срока, чтобы истекшие удержания освобождали слоты.
+    """
+    key = ':'.join(
+        str(part)
+        for part in (KEY_PREFIX, availability_fingerprint(date), date.isoformat(), kind, *params)
+    )
+    value = cache.get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+    _count(MISSES_KEY)
+    value, valid_until = compute()
+    timeout = _timeout_until(valid_until)
+    if timeout > 0:
+        cache.set(key, value, timeout)
+    return value
+
+
+def get_cache_stats() -> dict:
+    """Возвращает счетчики попаданий и промахов кеша доступности."""
+    return {'hits': cache.get(HITS_KEY, 0), 'misses': cache.get(MISSES_KEY, 0)}
+
+
+def reset_cache_stats() -> None:
+    """Обнуляет счетчики попаданий и промахов."""
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,94 @@
+"""Отметка прихода гостя по отсканированному коду билета."""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .constants import RESERVATION_STATUSES, STATUS_CONFIRMED, STATUS_NEW
+from .models import OccupancyRollup, Reservation
+
+RESULT_CHECKED_IN = 'checked_in'
+RESULT_ALREADY = 'already'
+RESULT_WRONG_DATE = 'wrong_date'
+RESULT_INVALID = 'invalid'
+RESULT_NOT_FOUND = 'not_found'
+
+# Статусы, из которых гостя можно впустить.
+CHECKIN_STATUSES = {STATUS_NEW, STATUS_CONFIRMED}
+STATUS_LABELS = dict(RESERVATION_STATUSES)
+FIELDS = (
+    'id', 'public_code', 'date', 'start_time', 'end_time', 'seats', 'customer_name',
+    'status', 'arrived_at', 'table_id', 'table__name',
+)
+
+
+def _message(result, row) -> str:
+    """Возвращает короткое сообщение для экрана сканера."""
+    if result == RESULT_CHECKED_IN:
+        return 'Гость отмечен.'
+    if result == RESULT_ALREADY:
+        return f'Гость уже отмечен в {timezone.localtime(row["arrived_at"]):%H:%M}.'
+    if result == RESULT_WRONG_DATE:
+        return f'Бронь на другую дату: {row["date"]:%d.%m.%Y}.'
+    if result == RESULT_INVALID:
+        return f'Бронь недействительна: {STATUS_LABELS.get(row["status"], row["status"]).lower()}.'
+    return 'Билет не найден.'
+
+
+def check_in(public_code, now=None) -> dict:
+    """Отмечает приход гостя по коду билета и возвращает результат для ответа сканеру.
+
+    Бронь читается одним запросом по уникальному индексу кода, а отметка —
+    один UPDATE с условием на прочитанный статус и пустое arrived_at. Блокируется
+    только строка брони и только на время этого UPDATE, поэтому сканы с разных
+    устройств не ждут друг друга; из двух одновременных сканов одного билета
+    отметку получает первый, второй видит «уже отмечен». Уведомления клиенту
+    не отправляются: гость уже на месте.
+    """
+    now = now or timezone.now()
+    code = public_code.strip().upper()
+    row = Reservation.objects.filter(public_code=code).values(*FIELDS).first()
+    if row is None:
+        return {'result': RESULT_NOT_FOUND, 'message': _message(RESULT_NOT_FOUND, None), 'reservation': None}
+    if row['arrived_at'] is not None:
+        result = RESULT_ALREADY
+    elif row['status'] not in CHECKIN_STATUSES:
+        result = RESULT_INVALID
+    elif row['date'] != timezone.localdate(now):
+        result = RESULT_WRONG_DATE
+    else:
+        with transaction.atomic():
+            updated = Reservation.objects.filter(
+                pk=row['id'], status=row['status'], arrived_at__isnull=True
+            ).update(status=STATUS_CONFIRMED, arrived_at=now, updated_at=now)
+            if updated and row['status'] != STATUS_CONFIRMED:
+                # UPDATE не шлет post_save; занятые минуты не меняются, поэтому вместо
+                # пересчета сводки с блокировкой стола переносим бронь между счетчиками.
+                OccupancyRollup.objects.filter(
+                    date=row['date'], table_id=row['table_id'], hour=row['start_time'].hour
+                ).update(new_count=F('new_count') - 1, confirmed_count=F('confirmed_count') + 1)
+        if updated:
+            result = RESULT_CHECKED_IN
+            row.update(status=STATUS_CONFIRMED, arrived_at=now)
+        else:
+            # Строку изменили между чтением и UPDATE: отметка с другого устройства
+            # или отмена брони. Ответ строится по свежему состоянию.
+            row = Reservation.objects.filter(pk=row['id']).values(*FIELDS).first()
+            if row is None:
+                return {'result': RESULT_NOT_FOUND, 'message': _message(RESULT_NOT_FOUND, None), 'reservation': None}
+            result = RESULT_ALREADY if row['arrived_at'] is not None else RESULT_INVALID
+    return {
+        'result': result,
+        'message': _message(result, row),
+        'reservation': {
+            'code': row['public_code'],
+            'date': row['date'].isoformat(),
+            'start_time': row['start_time'].strftime('%H:%M'),
+            'end_time': row['end_time'].strftime('%H:%M'),
+            'table': row['table__name'],
+            'seats': row['seats'],
+            'name': row['customer_name'],
+            'status': row['status'],
+            'status_label': STATUS_LABELS.get(row['status'], row['status']),
+            'arrived_at': timezone.localtime(row['arrived_at']).strftime('%H:%M') if row['arrived_at'] else None,
+        },
+    }
@@ -13,3 +13,11 @@ RESERVATION_STATUSES = [
 ]
 
 OCCUPYING_STATUSES = {STATUS_NEW, STATUS_CONFIRMED}
+
+TABLE_BUSY_MESSAGE = 'Стол уже занят в это время.'
+
+# Имя исключающего ограничения PostgreSQL против пересечения броней одного стола.
+OVERLAP_CONSTRAINT = 'booking_reservation_no_overlap'
+
+# Сколько минут держится слот, выбранный клиентом, пока он заполняет форму.
+SLOT_HOLD_TTL_MINUTES = 5
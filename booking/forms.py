@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django import forms
 from django.db.models import Max
+from django.utils import timezone
 
 from site_settings.models import SiteSettings
 
@@ -37,8 +40,49 @@ class BookingAvailabilityForm(forms.Form):
         return duration
 
 
+class CalendarQueryForm(forms.Form):
+    """Параметры запроса календаря доступности на диапазон дат."""
+    MAX_DAYS = 90
+    DEFAULT_DAYS = 30
+
+    date_from = forms.DateField(label='С', required=False)
+    date_to = forms.DateField(label='По', required=False)
+    duration_minutes = forms.IntegerField(label='Длительность (мин.)', required=False)
+    seats = forms.IntegerField(label='Мест', min_value=1, required=False)
+
+    def clean_duration_minutes(self):
+        """Проверяет длительность по настройкам, по умолчанию берет первую из доступных."""
+        duration = self.cleaned_data.get('duration_minutes')
+        settings = SiteSettings.get_solo()
+        duration_choices = settings.slot_duration_choices or [60, 120, 180, 240]
+        if duration is None:
+            return duration_choices[0]
+        if duration not in duration_choices:
+            raise forms.ValidationError('Выберите длительность из доступных.')
+        return duration
+
+    def clean_seats(self):
+        """Возвращает количество мест, по умолчанию одно."""
+        return self.cleaned_data.get('seats') or 1
+
+    def clean(self):
+        """Заполняет границы диапазона по умолчанию и ограничивает его длину."""
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from') or timezone.localdate()
+        date_to = cleaned_data.get('date_to') or date_from + timedelta(days=self.DEFAULT_DAYS - 1)
+        if date_to < date_from:
+            raise forms.ValidationError('Дата окончания раньше даты начала.')
+        if (date_to - date_from).days >= self.MAX_DAYS:
+            raise forms.ValidationError(f'Диапазон не может быть длиннее {self.MAX_DAYS} дней.')
+        cleaned_data['date_from'] = date_from
+        cleaned_data['date_to'] = date_to
+        return cleaned_data
+
+
 class ReservationForm(forms.ModelForm):
     """Форма создания бронирования."""
+    hold_token = forms.CharField(required=False, widget=forms.HiddenInput())
+
     class Meta:
         """Мета-настройки модели или формы."""
         model = Reservation
@@ -92,3 +136,9 @@ class ReservationForm(forms.ModelForm):
             for field_name in ['date', 'start_time', 'duration_minutes', 'seats', 'table']:
                 if field_name in self.fields:
                     self.fields[field_name].widget = forms.HiddenInput()
+
+    def clean(self):
+        """Передает брони токен удержания, чтобы собственный слот не считался занятым."""
+        cleaned_data = super().clean()
+        self.instance.hold_token = cleaned_data.get('hold_token') or None
+        return cleaned_data
@@ -0,0 +1,296 @@
+"""Массовый импорт броней из CSV и JSON с проверкой всех строк в памяти."""
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from site_settings.models import SiteSettings
+
+from .cache import bump_availability_on_commit
+from .constants import (
+    OCCUPYING_STATUSES,
+    OVERLAP_CONSTRAINT,
+    RESERVATION_STATUSES,
+    STATUS_NEW,
+    TABLE_BUSY_MESSAGE,
+)
+from .models import Reservation, SlotHold, Table
+from .rollups import schedule_refresh
+from .schedule import ScheduleIndex
+
+BATCH_SIZE = 500
+FORMATS = ('csv', 'json')
+
+FIELDS = (
+    'table',
+    'date',
+    'start_time',
+    'duration_minutes',
+    'end_time',
+    'seats',
+    'customer_name',
+    'customer_email',
+    'comment',
+    'status',
+    'public_code',
+)
+# Русские заголовки выгрузки броней, чтобы выгруженный файл можно было загрузить обратно.
+HEADER_ALIASES = {
+    'стол': 'table',
+    'дата': 'date',
+    'начало': 'start_time',
+    'окончание': 'end_time',
+    'длительность (мин.)': 'duration_minutes',
+    'мест': 'seats',
+    'имя': 'customer_name',
+    'email': 'customer_email',
+    'комментарий': 'comment',
+    'статус': 'status',
+    'код билета': 'public_code',
+}
+STATUS_CODES = {code.lower(): code for code, _ in RESERVATION_STATUSES}
+STATUS_CODES.update({label.lower(): code for code, label in RESERVATION_STATUSES})
+
+
+def _normalize(record) -> dict:
+    """Приводит ключи записи к именам полей импорта, отбрасывая неизвестные."""
+    values = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        name = str(key).strip().lower()
+        name = HEADER_ALIASES.get(name, name)
+        if name in FIELDS:
+            values[name] = '' if value is None else str(value).strip()
+    return values
+
+
+def read_rows(content, file_format) -> list:
+    """Разбирает текст файла в список пар (номер строки, значения полей).
+
+    Для CSV номер — строка файла, разделитель (запятая, точка с запятой
+    или табуляция) определяется по заголовку. Для JSON — номер объекта в массиве.
+    """
+    if file_format == 'json':
+        try:
+            records = json.loads(content)
+        except ValueError as exc:
+            raise ValidationError(f'Файл не является JSON: {exc}.') from exc
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValidationError('JSON должен быть массивом объектов.')
+        return [(index, _normalize(record)) for index, record in enumerate(records, start=1)]
+    if file_format != 'csv':
+        raise ValidationError('Поддерживаются только CSV и JSON.')
+    content = content.lstrip('\ufeff')
+    header = content.split('\n', 1)[0]
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(content), dialect=dialect)
+    return [(reader.line_num, _normalize(record)) for record in reader]
+
+
+def _parse_date(value):
+    """Разбирает дату в формате ГГГГ-ММ-ДД или ДД.ММ.ГГГГ."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, '%d.%m.%Y').date()
+
+
+def _parse_positive(value, label) -> int:
+    """Разбирает положительное целое число."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValidationError(f'{label}: ожидается целое число.')
+    if number <= 0:
+        raise ValidationError(f'{label}: число должно быть больше нуля.')
+    return number
+
+
+def _parse_row(values, tables) -> dict:
+    """Проверяет формат значений строки и возвращает поля брони."""
+    for field in ('table', 'date', 'start_time', 'seats', 'customer_name', 'customer_email'):
+        if not values.get(field):
+            raise ValidationError(f'Не заполнено поле {field}.')
+    table = tables.get(values['table'].lower()) or tables.get(f'#{values["table"]}')
+    if table is None:
+        raise ValidationError(f'Стол «{values["table"]}» не найден.')
+    try:
+        reservation_date = _parse_date(values['date'])
+    except ValueError:
+        raise ValidationError(f'Неверная дата «{values["date"]}».')
+    try:
+        start_time = time.fromisoformat(values['start_time'])
+        end_time = time.fromisoformat(values['end_time']) if values.get('end_time') else None
+    except ValueError:
+        raise ValidationError('Неверное время: ожидается ЧЧ:ММ.')
+    if values.get('duration_minutes'):
+        duration = _parse_positive(values['duration_minutes'], 'Длительность')
+    elif end_time is not None:
+        delta = datetime.combine(reservation_date, end_time) - datetime.combine(reservation_date, start_time)
+        duration = int(delta.total_seconds() // 60)
+        if duration <= 0:
+            raise ValidationError('Окончание должно быть позже начала.')
+    else:
+        raise ValidationError('Нужна длительность или время окончания.')
+    status = STATUS_CODES.get((values.get('status') or STATUS_NEW).lower())
+    if status is None:
+        raise ValidationError(f'Неизвестный статус «{values["status"]}».')
+    try:
+        validate_email(values['customer_email'])
+    except ValidationError:
+        raise ValidationError(f'Неверный email «{values["customer_email"]}».')
+    name = values['customer_name']
+    if len(name) > Reservation._meta.get_field('customer_name').max_length:
+        raise ValidationError('Слишком длинное имя.')
+    code = (values.get('public_code') or '').upper()
+    if len(code) > Reservation._meta.get_field('public_code').max_length:
+        raise ValidationError('Слишком длинный код билета.')
+    return {
+        'table': table,
+        'date': reservation_date,
+        'start_time': start_time,
+        'duration_minutes': duration,
+        'seats': _parse_positive(values['seats'], 'Количество мест'),
+        'customer_name': name,
+        'customer_email': values['customer_email'],
+        'comment': values.get('comment') or '',
+        'status': status,
+        'public_code': code,
+    }
+
+
+def _load_tables() -> dict:
+    """Возвращает столы по названию в нижнем регистре и по «#id»."""
+    tables = {}
+    for table in Table.objects.all():
+        tables.setdefault(table.name.lower(), table)
+        tables[f'#{table.id}'] = table
+    return tables
+
+
+def _check_rows(parsed, errors) -> list:
+    """Проверяет брони по столам, длительности, графику и занятости и возвращает допустимые.
+
+    Проверки те же, что в Reservation.clean, кроме минимального времени
+    предупреждения: импорт переносит и уже прошедшие брони. Брони и
+    действующие удержания диапазона дат, особые дни и занятые коды читаются
+    четырьмя запросами; принятые строки файла сразу занимают свои интервалы,
+    так что пересечения внутри файла тоже отсекаются.
+    """
+    if not parsed:
+        return []
+    dates = [fields['date'] for _, fields in parsed]
+    start, end = min(dates), max(dates)
+    table_ids = {fields['table'].id for _, fields in parsed}
+    schedule = ScheduleIndex.load(start, end)
+    duration_choices = SiteSettings.get_solo().slot_duration_choices or [60, 120, 180, 240]
+    busy = defaultdict(list)
+    rows = Reservation.objects.filter(
+        date__range=(start, end),
+        table_id__in=table_ids,
+        status__in=OCCUPYING_STATUSES,
+    ).values_list('date', 'table_id', 'start_time', 'end_time')
+    holds = SlotHold.objects.filter(
+        date__range=(start, end),
+        table_id__in=table_ids,
+        expires_at__gt=timezone.now(),
+    ).values_list('date', 'table_id', 'start_time', 'end_time')
+    for reservation_date, table_id, start_time, end_time in [*rows, *holds]:
+        busy[reservation_date, table_id].append((start_time, end_time))
+    codes = {fields['public_code'] for _, fields in parsed if fields['public_code']}
+    taken_codes = set(Reservation.objects.filter(public_code__in=codes).values_list('public_code', flat=True))
+
+    reservations = []
+    for line, fields in parsed:
+        table = fields['table']
+        start_dt = datetime.combine(fields['date'], fields['start_time'])
+        end_dt = start_dt + timedelta(minutes=fields['duration_minutes'])
+        window = schedule.window_for(fields['date'])
+        if not table.is_active:
+            message = 'Стол неактивен и не может быть забронирован.'
+        elif fields['seats'] > table.capacity:
+            message = 'Количество мест превышает вместимость стола.'
+        elif fields['duration_minutes'] not in duration_choices:
+            message = 'Выбрана недоступная длительность.'
+        elif window is None:
+            message = 'На эту дату бронирования не принимаются.'
+        elif (
+            end_dt.date() != fields['date']
+            or fields['start_time'] < window[0]
+            or end_dt.time() > window[1]
+        ):
+            message = 'Бронирование выходит за пределы рабочего времени.'
+        elif fields['status'] in OCCUPYING_STATUSES and any(
+            busy_start < end_dt.time() and busy_end > fields['start_time']
+            for busy_start, busy_end in busy[fields['date'], table.id]
+        ):
+            message = TABLE_BUSY_MESSAGE
+        elif fields['public_code'] in taken_codes:
+            message = f'Код билета {fields["public_code"]} уже занят.'
+        else:
+            message = None
+        if message:
+            errors.append((line, message))
+            continue
+        if fields['status'] in OCCUPYING_STATUSES:
+            busy[fields['date'], table.id].append((fields['start_time'], end_dt.time()))
+        if fields['public_code']:
+            taken_codes.add(fields['public_code'])
+        else:
+            fields['public_code'] = uuid.uuid4().hex[:12].upper()
+        reservations.append(Reservation(end_time=end_dt.time(), **fields))
+    return reservations
+
+
+def import_reservations(rows, dry_run=False, batch_size=BATCH_SIZE) -> dict:
+    """Проверяет строки импорта и вставляет допустимые брони пачками.
+
+    rows — результат read_rows. Все проверки идут в памяти на данных,
+    прочитанных несколькими запросами, строки стола блокируются на время
+    импорта, а вставка выполняется bulk_create в одной транзакции. Возвращает
+    {'total', 'valid', 'created', 'errors'}, где errors — пары (номер строки, сообщение).
+    """
+    errors = []
+    parsed = []
+    tables = _load_tables()
+    for line, values in rows:
+        try:
+            parsed.append((line, _parse_row(values, tables)))
+        except ValidationError as exc:
+            errors.append((line, ' '.join(exc.messages)))
+
+    with transaction.atomic():
+        table_ids = {fields['table'].id for _, fields in parsed}
+        # Блокировка столов не дает обычному бронированию вклиниться между проверкой и вставкой.
+        list(Table.objects.select_for_update().filter(pk__in=table_ids).values_list('pk'))
+        reservations = _check_rows(parsed, errors)
+        if reservations and not dry_run:
+            try:
+                with transaction.atomic():
+                    Reservation.objects.bulk_create(reservations, batch_size=batch_size)
+            except IntegrityError as exc:
+                if OVERLAP_CONSTRAINT in str(exc):
+                    raise ValidationError(TABLE_BUSY_MESSAGE) from exc
+                raise
+            # bulk_create не шлет post_save, поэтому кеш доступности и сводки обновляются здесь.
+            bump_availability_on_commit({reservation.date for reservation in reservations})
+            schedule_refresh({(reservation.date, reservation.table_id) for reservation in reservations})
+
+    errors.sort()
+    return {
+        'total': len(rows),
+        'valid': len(reservations),
+        'created': 0 if dry_run else len(reservations),
+        'errors': errors,
+    }
@@ -0,0 +1,95 @@
+import random
+import time as perf
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from booking.availability import DayOccupancy, MatrixOccupancy, np
+from booking.models import Table
+from booking.utils import compute_end_time
+
+
+class Command(BaseCommand):
+    """Сравнивает скорость движков доступности на синтетических данных."""
+    help = "Benchmark pure Python vs NumPy availability backends on synthetic days (no database access)."
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            "--tables",
+            type=int,
+            nargs="+",
+            default=[50, 200, 1000],
+            help="Table counts to benchmark.",
+        )
+        parser.add_argument(
+            "--step",
+            type=int,
+            default=15,
+            help="Slot step in minutes.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="How many times to repeat each measurement (best time is reported).",
+        )
+
+    def handle(self, *args, **options):
+        """Строит синтетические дни и замеряет оба движка."""
+        if np is None:
+            self.stdout.write(self.style.ERROR("NumPy is not installed; only the pure Python backend is available."))
+            return
+
+        step = options["step"]
+        self.stdout.write(f"{'tables':>8} {'python, s':>12} {'numpy, s':>12} {'speedup':>9}")
+        for count in options["tables"]:
+            tables, busy = self._synthetic_day(count)
+            python_time, python_result = self._measure(DayOccupancy, tables, busy, step, options["repeat"])
+            numpy_time, numpy_result = self._measure(MatrixOccupancy, tables, busy, step, options["repeat"])
+            if python_result != numpy_result:
+                self.stdout.write(self.style.ERROR(f"Backends disagree for {count} tables."))
+                return
+            speedup = python_time / numpy_time if numpy_time else float("inf")
+            self.stdout.write(f"{count:>8} {python_time:>12.4f} {numpy_time:>12.4f} {speedup:>8.1f}x")
+
+    def _synthetic_day(self, count):
+        """Создает несохраненные столы и случайную занятость дня 10:00–23:00."""
+        rng = random.Random(count)
+        tables = [
+            Table(id=index + 1, name=f"Стол {index + 1}", capacity=rng.choice([2, 4, 6, 8]), is_active=True)
+            for index in range(count)
+        ]
+        busy = defaultdict(list)
+        for table in tables:
+            minute = 10 * 60 + rng.choice([0, 30, 60, 90])
+            while minute < 22 * 60:
+                duration = rng.choice([60, 120, 180])
+                start = time(minute // 60, minute % 60)
+                busy[table.id].append((start, compute_end_time(start, duration)))
+                minute += duration + rng.choice([30, 60, 90, 120, 180])
+        return tables, busy
+
+    def _measure(self, occupancy_class, tables, busy, step, repeat):
+        """Возвращает лучшее время и результаты запросов к движку."""
+        date = timezone.localdate() + timedelta(days=1)
+        best = None
+        result = None
+        for _ in range(max(1, repeat)):
+            occupancy = occupancy_class(date, tables, busy)
+            occupancy.window = (time(10, 0), time(23, 0))
+            occupancy.earliest_start = datetime.min
+            started = perf.perf_counter()
+            result = [
+                (
+                    [t.id for t in occupancy.free_tables_for_day(duration, seats, step)],
+                    occupancy.free_start_times(duration, seats, step),
+                )
+                for duration in (60, 120, 180, 240)
+                for seats in (2, 4, 6)
+            ]
+            elapsed = perf.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from booking.constants import STATUS_COMPLETED, STATUS_NO_SHOW
+from booking.transitions import close_past_reservations
+
+
+class Command(BaseCommand):
+    """Переводит прошедшие брони в статусы «Завершена» и «Не пришли»."""
+    help = "Mark past reservations as COMPLETED (confirmed) or NO_SHOW (never confirmed) in bulk."
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        counts = close_past_reservations()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Completed: {counts[STATUS_COMPLETED]}, no-show: {counts[STATUS_NO_SHOW]}"
+            )
+        )
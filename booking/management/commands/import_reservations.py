@@ -0,0 +1,53 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.importer import BATCH_SIZE, FORMATS, import_reservations, read_rows
+
+
+class Command(BaseCommand):
+    """Загружает брони из CSV или JSON."""
+    help = "Import reservations from a CSV or JSON file, validating every row and inserting valid rows in bulk."
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument("path", help="CSV or JSON file with reservations.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format; detected from the file extension when omitted.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="How many reservations to insert per INSERT statement.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file and report errors without saving anything.",
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        path = options["path"]
+        file_format = options["format"] or ("json" if path.lower().endswith(".json") else "csv")
+        started = time.monotonic()
+        try:
+            with open(path, encoding="utf-8-sig") as handle:
+                rows = read_rows(handle.read(), file_format)
+            report = import_reservations(rows, options["dry_run"], options["batch_size"])
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        except ValidationError as exc:
+            raise CommandError(" ".join(exc.messages))
+        elapsed = time.monotonic() - started
+        for line, message in report["errors"]:
+            self.stderr.write(f"Line {line}: {message}")
+        summary = (
+            f"Rows: {report['total']}, valid: {report['valid']}, created: {report['created']}, "
+            f"errors: {len(report['errors'])} in {elapsed:.2f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,51 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from booking.models import OccupancyRollup, Reservation
+from booking.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """Пересчитывает почасовые сводки занятости из броней."""
+    help = "Rebuild hourly occupancy rollups from reservations, for a date range or for all dates."
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First date, YYYY-MM-DD.")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last date, YYYY-MM-DD.")
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=31,
+            help="How many days to rebuild per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        bounds = Reservation.objects.aggregate(first=Min("date"), last=Max("date"))
+        start = options["date_from"]
+        end = options["date_to"]
+        if start is None and end is None:
+            # Полный пересчет: сводки вне диапазона броней тоже устарели.
+            OccupancyRollup.objects.all().delete()
+        start = start or bounds["first"]
+        # Ночная бронь последнего дня занимает и часы следующей даты.
+        end = end or (bounds["last"] and bounds["last"] + timedelta(days=1))
+        if start is None or end is None:
+            self.stdout.write(self.style.SUCCESS("No reservations to roll up."))
+            return
+        if end < start:
+            raise CommandError("--to is earlier than --from.")
+        started = time.monotonic()
+        rows = 0
+        chunk = timedelta(days=max(options["chunk_days"], 1))
+        current = start
+        while current <= end:
+            chunk_end = min(current + chunk - timedelta(days=1), end)
+            rows += rebuild_rollups(current, chunk_end)
+            current = chunk_end + timedelta(days=1)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Rollup rows written: {rows} for {start}..{end} in {elapsed:.2f}s"))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from booking.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    """Отправляет напоминания о ближайших бронях."""
+    help = "Send reminder e-mails for upcoming reservations (safe to run from cron every few minutes)."
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            "--lead-minutes",
+            type=int,
+            default=getattr(settings, "REMINDER_LEAD_MINUTES", 120),
+            help="Remind about reservations starting within this many minutes.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="How many reservations to render and send per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        site_url = getattr(settings, "SITE_URL", "").rstrip("/")
+
+        def ticket_url_for(reservation):
+            """Возвращает абсолютную ссылку на билет, если задан SITE_URL."""
+            if not site_url:
+                return ""
+            return site_url + reverse("booking:ticket", kwargs={"public_code": reservation.public_code})
+
+        started = time.monotonic()
+        stats = send_reminders(options["lead_minutes"], options["batch_size"], ticket_url_for)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Reminders sent: {stats['sent']}, failed: {stats['failed']} in {elapsed:.2f}s")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from booking.services import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    """Удаляет истекшие удержания слотов."""
+    help = "Delete expired slot holds in a single bulk query."
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        deleted = sweep_expired_holds()
+        self.stdout.write(self.style.SUCCESS(f"Deleted expired holds: {deleted}"))
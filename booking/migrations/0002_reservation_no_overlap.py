@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Интервал занятости хранится в генерируемой колонке диапазона, а исключающее
+# ограничение по GiST-индексу запрещает пересечение интервалов одного стола
+# для занимающих статусов (NEW, CONFIRMED). Равенство стола выражено через
+# int8range, чтобы не требовать расширения btree_gist. Колонка и ограничение
+# есть только в PostgreSQL; на других СУБД бронирование блокирует строку стола.
+CREATE_SQL = [
+    """
+    ALTER TABLE booking_reservation
+    ADD COLUMN occupied tsrange GENERATED ALWAYS AS (
+        tsrange(
+            date + start_time,
+            date + start_time + make_interval(mins => duration_minutes),
+            '[)'
+        )
+    ) STORED
+    """,
+    """
+    ALTER TABLE booking_reservation
+    ADD CONSTRAINT booking_reservation_no_overlap
+    EXCLUDE USING gist (
+        int8range(table_id, table_id, '[]') WITH =,
+        occupied WITH &&
+    ) WHERE (status IN ('NEW', 'CONFIRMED'))
+    """,
+]
+
+DROP_SQL = [
+    'ALTER TABLE booking_reservation DROP CONSTRAINT IF EXISTS booking_reservation_no_overlap',
+    'ALTER TABLE booking_reservation DROP COLUMN IF EXISTS occupied',
+]
+
+
+def add_overlap_constraint(apps, schema_editor):
+    """Создает колонку интервала и исключающее ограничение в PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def remove_overlap_constraint(apps, schema_editor):
+    """Удаляет ограничение и колонку интервала в PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_overlap_constraint, remove_overlap_constraint),
+    ]
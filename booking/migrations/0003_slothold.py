@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_reservation_no_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(editable=False, max_length=32, unique=True, verbose_name='Токен')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('start_time', models.TimeField(verbose_name='Начало')),
+                ('end_time', models.TimeField(verbose_name='Окончание')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Истекает')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='booking.table')),
+            ],
+            options={
+                'verbose_name': 'Удержание слота',
+                'verbose_name_plural': 'Удержания слотов',
+                'indexes': [models.Index(fields=['date', 'expires_at'], name='booking_slo_date_93bc90_idx')],
+            },
+        ),
+    ]
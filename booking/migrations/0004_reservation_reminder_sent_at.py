@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_slothold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Напоминание отправлено'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True)), fields=['date', 'start_time'], name='booking_res_reminder_due_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_reservation_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='booking_res_date_7fc701_idx',
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['date', 'start_time', 'id'], name='booking_res_date_cca94f_idx'),
+        ),
+    ]
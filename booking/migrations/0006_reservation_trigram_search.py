@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Поиск броней в кабинете сотрудника сравнивает имя и email через UPPER(...) LIKE
+# '%...%' (icontains). Такой шаблон не использует B-tree, поэтому в PostgreSQL
+# для этих выражений строятся триграммные GIN-индексы. Расширение pg_trgm есть
+# не в каждой сборке сервера: если его нельзя установить, индексы пропускаются
+# и поиск работает последовательным чтением, как на других СУБД.
+CREATE_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """
+    CREATE INDEX IF NOT EXISTS booking_res_name_trgm_idx
+    ON booking_reservation USING gin (UPPER(customer_name::text) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS booking_res_email_trgm_idx
+    ON booking_reservation USING gin (UPPER(customer_email::text) gin_trgm_ops)
+    """,
+]
+
+DROP_SQL = [
+    'DROP INDEX IF EXISTS booking_res_name_trgm_idx',
+    'DROP INDEX IF EXISTS booking_res_email_trgm_idx',
+]
+
+
+def _trigram_available(schema_editor) -> bool:
+    """Проверяет, что сервер PostgreSQL поставляет расширение pg_trgm."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def add_trigram_indexes(apps, schema_editor):
+    """Создает триграммные индексы поиска по имени и email в PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    if not _trigram_available(schema_editor):
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    """Удаляет триграммные индексы поиска в PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_reservation_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_reservation_trigram_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('hour', models.PositiveSmallIntegerField(verbose_name='Час')),
+                ('booked_minutes', models.PositiveIntegerField(default=0, verbose_name='Занято минут')),
+                ('seat_minutes', models.PositiveIntegerField(default=0, verbose_name='Место-минут')),
+                ('new_count', models.PositiveIntegerField(default=0, verbose_name='Новых')),
+                ('confirmed_count', models.PositiveIntegerField(default=0, verbose_name='Подтвержденных')),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='Завершенных')),
+                ('cancelled_count', models.PositiveIntegerField(default=0, verbose_name='Отмененных')),
+                ('no_show_count', models.PositiveIntegerField(default=0, verbose_name='Неявок')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='booking.table')),
+            ],
+            options={
+                'verbose_name': 'Сводка занятости',
+                'verbose_name_plural': 'Сводки занятости',
+                'constraints': [models.UniqueConstraint(fields=('date', 'table', 'hour'), name='booking_rollup_unique_hour')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_occupancyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='arrived_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Пришел'),
+        ),
+    ]
@@ -7,7 +7,7 @@ from django.utils import timezone
 
 from site_settings.models import SiteSettings
 
-from .constants import OCCUPYING_STATUSES, RESERVATION_STATUSES
+from .constants import OCCUPYING_STATUSES, RESERVATION_STATUSES, TABLE_BUSY_MESSAGE
 from .services import is_table_available
 from .utils import compute_end_time, get_working_window
 
@@ -45,6 +45,8 @@ class Reservation(models.Model):
 
     public_code = models.CharField('Код билета', max_length=32, unique=True, editable=False)
     email_sent_at = models.DateTimeField('Отправлено на email', null=True, blank=True)
+    reminder_sent_at = models.DateTimeField('Напоминание отправлено', null=True, blank=True)
+    arrived_at = models.DateTimeField('Пришел', null=True, blank=True)
 
     created_at = models.DateTimeField('Создано', auto_now_add=True)
     updated_at = models.DateTimeField('Обновлено', auto_now=True)
@@ -54,8 +56,15 @@ class Reservation(models.Model):
         verbose_name = 'Бронирование'
         verbose_name_plural = 'Бронирования'
         indexes = [
-            models.Index(fields=['date', 'start_time']),
+            # Совпадает с порядком постраничной навигации по курсору в списке броней.
+            models.Index(fields=['date', 'start_time', 'id']),
             models.Index(fields=['table', 'date']),
+            # Только брони без напоминания: индекс остается маленьким, сколько бы броней ни копилось.
+            models.Index(
+                fields=['date', 'start_time'],
+                condition=models.Q(reminder_sent_at__isnull=True),
+                name='booking_res_reminder_due_idx',
+            ),
         ]
 
     def __str__(self) -> str:
@@ -82,8 +91,11 @@ class Reservation(models.Model):
         if self.start_time < open_time or end_time > close_time:
             raise ValidationError('Бронирование выходит за пределы рабочего времени.')
 
-        if not is_table_available(self.table, self.date, self.start_time, end_time, exclude_id=self.id):
-            raise ValidationError('Стол уже занят в это время.')
+        hold_token = getattr(self, 'hold_token', None)
+        if not is_table_available(
+            self.table, self.date, self.start_time, end_time, exclude_id=self.id, exclude_hold=hold_token
+        ):
+            raise ValidationError(TABLE_BUSY_MESSAGE)
 
         now = timezone.localtime()
         reservation_dt = timezone.make_aware(datetime.combine(self.date, self.start_time), now.tzinfo)
@@ -98,3 +110,56 @@ class Reservation(models.Model):
         self.end_time = compute_end_time(self.start_time, self.duration_minutes)
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class SlotHold(models.Model):
+    """Временное удержание слота, пока клиент заполняет форму бронирования."""
+    token = models.CharField('Токен', max_length=32, unique=True, editable=False)
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='holds')
+    date = models.DateField('Дата')
+    start_time = models.TimeField('Начало')
+    end_time = models.TimeField('Окончание')
+    expires_at = models.DateTimeField('Истекает', db_index=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        """Мета-настройки модели или формы."""
+        verbose_name = 'Удержание слота'
+        verbose_name_plural = 'Удержания слотов'
+        indexes = [
+            models.Index(fields=['date', 'expires_at']),
+        ]
+
+    def __str__(self) -> str:
+        """Возвращает человекочитаемое строковое представление объекта."""
+        return f'{self.date} {self.start_time} {self.table} до {self.expires_at:%H:%M}'
+
+
+class OccupancyRollup(models.Model):
+    """Сводка по столу за час дня: занятые минуты, место-минуты и брони по статусам.
+
+    Минуты считаются по всем пересечениям брони с часом, а брони по статусам —
+    в часе начала, чтобы каждая бронь учитывалась один раз.
+    """
+    date = models.DateField('Дата')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='rollups')
+    hour = models.PositiveSmallIntegerField('Час')
+    booked_minutes = models.PositiveIntegerField('Занято минут', default=0)
+    seat_minutes = models.PositiveIntegerField('Место-минут', default=0)
+    new_count = models.PositiveIntegerField('Новых', default=0)
+    confirmed_count = models.PositiveIntegerField('Подтвержденных', default=0)
+    completed_count = models.PositiveIntegerField('Завершенных', default=0)
+    cancelled_count = models.PositiveIntegerField('Отмененных', default=0)
+    no_show_count = models.PositiveIntegerField('Неявок', default=0)
+
+    class Meta:
+        """Мета-настройки модели или формы."""
+        verbose_name = 'Сводка занятости'
+        verbose_name_plural = 'Сводки занятости'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'table', 'hour'], name='booking_rollup_unique_hour'),
+        ]
+
+    def __str__(self) -> str:
+        """Возвращает человекочитаемое строковое представление объекта."""
+        return f'{self.date} {self.hour:02d}:00 {self.table}'
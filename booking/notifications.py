@@ -1,15 +1,21 @@
-import logging
+from urllib.parse import urljoin
 
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMultiAlternatives
+from django.urls import reverse
+from django.utils.html import escape, linebreaks
 
 from site_settings.models import SiteSettings
 
-logger = logging.getLogger(__name__)
+from .constants import STATUS_CANCELLED, STATUS_CONFIRMED
 
+# Статусы, о смене на которые клиенту уходит письмо.
+STATUS_EMAIL_STATUSES = {STATUS_CONFIRMED, STATUS_CANCELLED}
 
-def send_email_ticket(reservation, ticket_url) -> bool:
-    """Отправляет письмо с билетом и сообщает об успехе."""
+
+def build_ticket_email(reservation, ticket_url) -> EmailMultiAlternatives:
+    """Собирает письмо с билетом и QR-кодом в HTML-версии, не отправляя его."""
     settings = SiteSettings.get_solo()
+    image_url = urljoin(ticket_url, reverse('booking:ticket_image', kwargs={'public_code': reservation.public_code}))
     start_time = reservation.start_time.strftime('%H:%M')
     subject = f'Бронирование в {settings.site_name} на {reservation.date} {start_time}'
     deposit_line = ''
@@ -27,19 +33,64 @@ def send_email_ticket(reservation, ticket_url) -> bool:
         f'Телефон: {settings.phone}\n'
         f'Код билета: {reservation.public_code}\n'
         f'Ссылка на билет: {ticket_url}\n'
+        f'Билет картинкой для показа без интернета: {image_url}\n'
+    )
+
+    email = _customer_email(settings, reservation, subject, body)
+    # Адрес QR-картинки абсолютный: почтовый клиент открывает его вне сайта. Файл QR
+    # создает представление при первом открытии, а не запрос бронирования.
+    qr_url = urljoin(ticket_url, reverse('booking:ticket_qr', kwargs={'public_code': reservation.public_code}))
+    email.attach_alternative(
+        f'{linebreaks(body)}<p><img src="{escape(qr_url)}" width="232" height="232" '
+        f'alt="QR-код билета {escape(reservation.public_code)}"></p>',
+        'text/html',
+    )
+    return email
+
+
+def build_status_email(reservation) -> EmailMultiAlternatives:
+    """Собирает письмо клиенту о смене статуса брони."""
+    settings = SiteSettings.get_solo()
+    start_time = reservation.start_time.strftime('%H:%M')
+    status = reservation.get_status_display()
+    subject = f'Бронирование в {settings.site_name} на {reservation.date} {start_time}: {status.lower()}'
+    body = (
+        f'Статус брони: {status}\n'
+        f'Дата: {reservation.date}\n'
+        f'Время: {start_time}\n'
+        f'Стол: {reservation.table.name}\n'
+        f'Код билета: {reservation.public_code}\n'
+        f'Телефон: {settings.phone}\n'
     )
+    return _customer_email(settings, reservation, subject, body)
+
+
+def build_reminder_email(reservation, ticket_url='') -> EmailMultiAlternatives:
+    """Собирает письмо-напоминание о предстоящем визите."""
+    settings = SiteSettings.get_solo()
+    start_time = reservation.start_time.strftime('%H:%M')
+    subject = f'Напоминание: {settings.site_name}, {reservation.date} в {start_time}'
+    ticket_line = f'Ссылка на билет: {ticket_url}\n' if ticket_url else ''
+    body = (
+        f'Ждем вас {reservation.date} в {start_time}.\n'
+        f'Длительность: {reservation.duration_minutes} мин.\n'
+        f'Стол: {reservation.table.name}\n'
+        f'Мест: {reservation.seats}\n'
+        f'Адрес: {settings.address}\n'
+        f'Телефон: {settings.phone}\n'
+        f'Код билета: {reservation.public_code}\n'
+        f'{ticket_line}'
+    )
+    return _customer_email(settings, reservation, subject, body)
+
 
+def _customer_email(settings, reservation, subject, body) -> EmailMultiAlternatives:
+    """Собирает письмо клиенту с отправителем и адресом ответа из настроек."""
     reply_to = [settings.reply_to_email] if settings.reply_to_email else None
-    email = EmailMessage(
+    return EmailMultiAlternatives(
         subject=subject,
         body=body,
         from_email=settings.from_email or None,
         to=[reservation.customer_email],
         reply_to=reply_to,
     )
-    try:
-        email.send(fail_silently=False)
-    except Exception:
-        logger.exception('Failed to send email ticket for reservation %s', reservation.id)
-        return False
-    return True
@@ -0,0 +1,330 @@
+"""Кодировщик QR-кода (байтовый режим, уровень коррекции M) и его отрисовка в PNG и SVG."""
+import io
+
+from PIL import Image
+
+# Для версии 1–10 уровня M: (EC-кодовых слов на блок, [(число блоков, слов данных в блоке), ...]).
+VERSIONS_M = {
+    1: (10, [(1, 16)]),
+    2: (16, [(1, 28)]),
+    3: (26, [(1, 44)]),
+    4: (18, [(2, 32)]),
+    5: (24, [(2, 43)]),
+    6: (16, [(4, 27)]),
+    7: (18, [(4, 31)]),
+    8: (22, [(2, 38), (2, 39)]),
+    9: (22, [(3, 36), (2, 37)]),
+    10: (26, [(4, 43), (1, 44)]),
+}
+ALIGNMENT_POSITIONS = {
+    1: [],
+    2: [6, 18],
+    3: [6, 22],
+    4: [6, 26],
+    5: [6, 30],
+    6: [6, 34],
+    7: [6, 22, 38],
+    8: [6, 24, 42],
+    9: [6, 26, 46],
+    10: [6, 28, 50],
+}
+# Биты уровня коррекции M в информации о формате.
+FORMAT_BITS_M = 0b00
+MODE_BYTE = 0b0100
+PAD_BYTES = (0xEC, 0x11)
+QUIET_ZONE = 4
+
+# Таблицы степеней и логарифмов поля GF(256) с образующим многочленом x^8+x^4+x^3+x^2+1.
+_EXP = [0] * 512
+_LOG = [0] * 256
+_value = 1
+for _power in range(255):
+    _EXP[_power] = _value
+    _LOG[_value] = _power
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11D
+for _power in range(255, 512):
+    _EXP[_power] = _EXP[_power - 255]
+
+MASKS = [
+    lambda row, col: (row + col) % 2 == 0,
+    lambda row, col: row % 2 == 0,
+    lambda row, col: col % 3 == 0,
+    lambda row, col: (row + col) % 3 == 0,
+    lambda row, col: (row // 2 + col // 3) % 2 == 0,
+    lambda row, col: row * col % 2 + row * col % 3 == 0,
+    lambda row, col: (row * col % 2 + row * col % 3) % 2 == 0,
+    lambda row, col: ((row + col) % 2 + row * col % 3) % 2 == 0,
+]
+
+
+def _gf_multiply(left, right) -> int:
+    """Умножает два элемента поля GF(256)."""
+    if left == 0 or right == 0:
+        return 0
+    return _EXP[_LOG[left] + _LOG[right]]
+
+
+def _rs_generator(degree) -> list:
+    """Возвращает коэффициенты порождающего многочлена Рида — Соломона без старшего."""
+    generator = [1]
+    for power in range(degree):
+        root = _EXP[power]
+        generator = [
+            (generator[index] if index < len(generator) else 0)
+            ^ (_gf_multiply(generator[index - 1], root) if index > 0 else 0)
+            for index in range(len(generator) + 1)
+        ]
+    return generator[1:]
+
+
+def _rs_remainder(data, degree) -> list:
+    """Вычисляет EC-кодовые слова блока данных."""
+    generator = _rs_generator(degree)
+    remainder = [0] * degree
+    for byte in data:
+        factor = byte ^ remainder.pop(0)
+        remainder.append(0)
+        for index, coefficient in enumerate(generator):
+            remainder[index] ^= _gf_multiply(coefficient, factor)
+    return remainder
+
+
+def _data_capacity(version) -> int:
+    """Возвращает число кодовых слов данных версии."""
+    return sum(count * size for count, size in VERSIONS_M[version][1])
+
+
+def _choose_version(length) -> int:
+    """Подбирает наименьшую версию, вмещающую length байт."""
+    for version in VERSIONS_M:
+        count_bits = 8 if version < 10 else 16
+        if 4 + count_bits + 8 * length <= 8 * _data_capacity(version):
+            return version
+    raise ValueError(f'Слишком длинные данные для QR-кода: {length} байт.')
+
+
+def _codewords(data, version) -> list:
+    """Кодирует данные, дополняет их и чередует блоки с EC-словами."""
+    capacity = _data_capacity(version)
+    bits = []
+
+    def append(value, width):
+        """Добавляет width младших битов value."""
+        bits.extend((value >> shift) & 1 for shift in range(width - 1, -1, -1))
+
+    append(MODE_BYTE, 4)
+    append(len(data), 8 if version < 10 else 16)
+    for byte in data:
+        append(byte, 8)
+    append(0, min(4, 8 * capacity - len(bits)))
+    append(0, -len(bits) % 8)
+    words = [int(''.join(map(str, bits[index:index + 8])), 2) for index in range(0, len(bits), 8)]
+    words += [PAD_BYTES[index % 2] for index in range(capacity - len(words))]
+
+    ec_size, groups = VERSIONS_M[version]
+    blocks = []
+    offset = 0
+    for count, size in groups:
+        for _ in range(count):
+            blocks.append(words[offset:offset + size])
+            offset += size
+    ec_blocks = [_rs_remainder(block, ec_size) for block in blocks]
+    result = []
+    for index in range(max(len(block) for block in blocks)):
+        result.extend(block[index] for block in blocks if index < len(block))
+    for index in range(ec_size):
+        result.extend(block[index] for block in ec_blocks)
+    return result
+
+
+class _Matrix:
+    """Матрица модулей с отметкой служебных областей."""
+
+    def __init__(self, version):
+        """Создает пустую матрицу версии и рисует служебные узоры."""
+        self.version = version
+        self.size = 17 + 4 * version
+        self.modules = [[False] * self.size for _ in range(self.size)]
+        self.reserved = [[False] * self.size for _ in range(self.size)]
+        self._draw_function_patterns()
+
+    def set(self, row, col, dark) -> None:
+        """Закрашивает служебный модуль и отмечает его занятым."""
+        self.modules[row][col] = dark
+        self.reserved[row][col] = True
+
+    def _draw_function_patterns(self) -> None:
+        """Рисует поисковые и выравнивающие узоры, синхронизацию и темный модуль."""
+        for index in range(self.size):
+            self.set(6, index, index % 2 == 0)
+            self.set(index, 6, index % 2 == 0)
+        for row, col in ((3, 3), (3, self.size - 4), (self.size - 4, 3)):
+            for d_row in range(-4, 5):
+                for d_col in range(-4, 5):
+                    if 0 <= row + d_row < self.size and 0 <= col + d_col < self.size:
+                        self.set(row + d_row, col + d_col, max(abs(d_row), abs(d_col)) not in (2, 4))
+        positions = ALIGNMENT_POSITIONS[self.version]
+        last = len(positions) - 1
+        for i, row in enumerate(positions):
+            for j, col in enumerate(positions):
+                if (i, j) in ((0, 0), (0, last), (last, 0)):
+                    continue
+                for d_row in range(-2, 3):
+                    for d_col in range(-2, 3):
+                        self.set(row + d_row, col + d_col, max(abs(d_row), abs(d_col)) != 1)
+        # Резервируем области формата и версии; настоящие биты пишутся после выбора маски.
+        self.draw_format(0)
+        self._draw_version()
+
+    def draw_format(self, mask) -> None:
+        """Записывает 15 бит информации о формате в обе копии."""
+        data = FORMAT_BITS_M << 3 | mask
+        remainder = data
+        for _ in range(10):
+            remainder = (remainder << 1) ^ ((remainder >> 9) * 0x537)
+        bits = (data << 10 | remainder) ^ 0x5412
+
+        def bit(index):
+            """Возвращает бит формата с номером index."""
+            return (bits >> index) & 1 == 1
+
+        for index in range(6):
+            self.set(index, 8, bit(index))
+        self.set(7, 8, bit(6))
+        self.set(8, 8, bit(7))
+        self.set(8, 7, bit(8))
+        for index in range(9, 15):
+            self.set(8, 14 - index, bit(index))
+        for index in range(8):
+            self.set(8, self.size - 1 - index, bit(index))
+        for index in range(8, 15):
+            self.set(self.size - 15 + index, 8, bit(index))
+        self.set(self.size - 8, 8, True)
+
+    def _draw_version(self) -> None:
+        """Записывает информацию о версии для версий 7 и выше."""
+        if self.version < 7:
+            return
+        remainder = self.version
+        for _ in range(12):
+            remainder = (remainder << 1) ^ ((remainder >> 11) * 0x1F25)
+        bits = self.version << 12 | remainder
+        for index in range(18):
+            dark = (bits >> index) & 1 == 1
+            near, far = index // 3, self.size - 11 + index % 3
+            self.set(far, near, dark)
+            self.set(near, far, dark)
+
+    def place_data(self, codewords) -> None:
+        """Раскладывает биты кодовых слов змейкой по парам столбцов справа налево."""
+        bits = [(word >> shift) & 1 for word in codewords for shift in range(7, -1, -1)]
+        index = 0
+        right = self.size - 1
+        while right >= 1:
+            if right == 6:
+                right = 5
+            upward = (right + 1) & 2 == 0
+            for step in range(self.size):
+                row = self.size - 1 - step if upward else step
+                for col in (right, right - 1):
+                    if not self.reserved[row][col] and index < len(bits):
+                        self.modules[row][col] = bits[index] == 1
+                        index += 1
+            right -= 2
+
+    def apply_mask(self, mask) -> None:
+        """Инвертирует модули данных по условию маски (повторный вызов снимает маску)."""
+        condition = MASKS[mask]
+        for row in range(self.size):
+            for col in range(self.size):
+                if not self.reserved[row][col] and condition(row, col):
+                    self.modules[row][col] = not self.modules[row][col]
+
+    def penalty(self) -> int:
+        """Оценивает матрицу по четырем правилам штрафов стандарта."""
+        size = self.size
+        lines = [row for row in self.modules] + [list(column) for column in zip(*self.modules)]
+        score = 0
+        finder_like = ([True, False, True, True, True, False, True, False, False, False, False],
+                       [False, False, False, False, True, False, True, True, True, False, True])
+        for line in lines:
+            run = 1
+            for index in range(1, size + 1):
+                if index < size and line[index] == line[index - 1]:
+                    run += 1
+                    continue
+                if run >= 5:
+                    score += run - 2
+                run = 1
+            for index in range(size - 10):
+                if line[index:index + 11] in finder_like:
+                    score += 40
+        for row in range(size - 1):
+            for col in range(size - 1):
+                color = self.modules[row][col]
+                if color == self.modules[row][col + 1] == self.modules[row + 1][col] == self.modules[row + 1][col + 1]:
+                    score += 3
+        dark = sum(sum(row) for row in self.modules)
+        total = size * size
+        score += 10 * ((abs(dark * 20 - total * 10) + total - 1) // total - 1)
+        return score
+
+
+def encode(data) -> list:
+    """Кодирует строку или байты в QR-код и возвращает матрицу модулей (True — темный).
+
+    Маска выбирается по наименьшему штрафу, как требует стандарт.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    version = _choose_version(len(data))
+    matrix = _Matrix(version)
+    matrix.place_data(_codewords(data, version))
+    best = None
+    for mask in range(len(MASKS)):
+        matrix.apply_mask(mask)
+        matrix.draw_format(mask)
+        score = matrix.penalty()
+        if best is None or score < best[0]:
+            best = (score, mask)
+        matrix.apply_mask(mask)
+    matrix.apply_mask(best[1])
+    matrix.draw_format(best[1])
+    return matrix.modules
+
+
+def render_image(modules, scale=8, border=QUIET_ZONE) -> Image.Image:
+    """Рисует матрицу в черно-белое изображение Pillow с белой рамкой."""
+    size = len(modules) + 2 * border
+    image = Image.new('1', (size, size), 1)
+    pixels = image.load()
+    for row, line in enumerate(modules):
+        for col, dark in enumerate(line):
+            if dark:
+                pixels[col + border, row + border] = 0
+    return image.resize((size * scale, size * scale), Image.NEAREST)
+
+
+def render_png(modules, scale=8, border=QUIET_ZONE) -> bytes:
+    """Возвращает PNG с QR-кодом."""
+    buffer = io.BytesIO()
+    render_image(modules, scale, border).save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def render_svg(modules, border=QUIET_ZONE) -> str:
+    """Возвращает SVG с QR-кодом: темные модули одним путем, масштабируется без потерь."""
+    size = len(modules) + 2 * border
+    path = ''.join(
+        f'M{col + border},{row + border}h1v1h-1z'
+        for row, line in enumerate(modules)
+        for col, dark in enumerate(line)
+        if dark
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'shape-rendering="crispEdges"><rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{path}" fill="#000"/></svg>'
+    )
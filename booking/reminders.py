@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from integrations.mail import dispatch_emails
+
+from .constants import OCCUPYING_STATUSES
+from .models import Reservation
+from .notifications import build_reminder_email
+
+
+def _starting_between(start, end) -> Q:
+    """Возвращает условие на брони, начинающиеся в интервале локального времени."""
+    if start.date() == end.date():
+        return Q(date=start.date(), start_time__gte=start.time(), start_time__lte=end.time())
+    return (
+        Q(date=start.date(), start_time__gte=start.time())
+        | Q(date__gt=start.date(), date__lt=end.date())
+        | Q(date=end.date(), start_time__lte=end.time())
+    )
+
+
+def due_reminders(lead_minutes, now=None):
+    """Возвращает брони без напоминания, начинающиеся в ближайшие lead_minutes минут."""
+    start = timezone.localtime(now).replace(tzinfo=None, second=0, microsecond=0)
+    end = start + timedelta(minutes=lead_minutes)
+    return Reservation.objects.filter(
+        _starting_between(start, end),
+        status__in=OCCUPYING_STATUSES,
+        reminder_sent_at__isnull=True,
+    ).order_by('date', 'start_time', 'id')
+
+
+def _claim(ids, now) -> list:
+    """Помечает брони напомненными одним UPDATE и возвращает те, что достались этому запуску.
+
+    Параллельный запуск пропускает строки, уже заблокированные другим, поэтому
+    одно напоминание не уходит дважды.
+    """
+    with transaction.atomic():
+        claimed = list(
+            Reservation.objects.select_for_update(skip_locked=True)
+            .filter(id__in=ids, reminder_sent_at__isnull=True)
+            .values_list('id', flat=True)
+        )
+        Reservation.objects.filter(id__in=claimed).update(reminder_sent_at=now)
+    return claimed
+
+
+def _send_chunk(chunk, ticket_url_for, stats) -> None:
+    """Отправляет напоминания одной пачки и снимает отметку с неотправленных."""
+    now = timezone.now()
+    claimed = set(_claim([reservation.id for reservation in chunk], now))
+    reservations = [reservation for reservation in chunk if reservation.id in claimed]
+    emails = [
+        build_reminder_email(reservation, ticket_url_for(reservation))
+        for reservation in reservations
+    ]
+    failed = [
+        reservation.id
+        for reservation, error in zip(reservations, dispatch_emails(emails))
+        if error is not None
+    ]
+    if failed:
+        Reservation.objects.filter(id__in=failed, reminder_sent_at=now).update(reminder_sent_at=None)
+    stats['sent'] += len(reservations) - len(failed)
+    stats['failed'] += len(failed)
+
+
+def send_reminders(lead_minutes, batch_size=500, ticket_url_for=lambda reservation: '', now=None) -> dict:
+    """Отправляет напоминания о ближайших бронях пачками с постоянным расходом памяти."""
+    stats = {'sent': 0, 'failed': 0}
+    chunk = []
+    # Пока курсор читает брони, пачки уже помечаются напомненными; повторная
+    # проверка reminder_sent_at в _claim не дает отправить напоминание дважды.
+    reservations = due_reminders(lead_minutes, now).select_related('table').iterator(chunk_size=batch_size)
+    for reservation in reservations:
+        chunk.append(reservation)
+        if len(chunk) >= batch_size:
+            _send_chunk(chunk, ticket_url_for, stats)
+            chunk = []
+    if chunk:
+        _send_chunk(chunk, ticket_url_for, stats)
+    return stats
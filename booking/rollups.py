@@ -0,0 +1,139 @@
+"""Почасовые сводки занятости столов для аналитики."""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from .constants import (
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_CONFIRMED,
+    STATUS_NEW,
+    STATUS_NO_SHOW,
+)
+from .models import OccupancyRollup, Reservation, Table
+
+BATCH_SIZE = 1000
+# Счетчик сводки для каждого статуса брони.
+STATUS_COUNTERS = {
+    STATUS_NEW: 'new_count',
+    STATUS_CONFIRMED: 'confirmed_count',
+    STATUS_COMPLETED: 'completed_count',
+    STATUS_CANCELLED: 'cancelled_count',
+    STATUS_NO_SHOW: 'no_show_count',
+}
+# Брони, время которых считается занятым: ожидаемые и состоявшиеся.
+BOOKED_STATUSES = {STATUS_NEW, STATUS_CONFIRMED, STATUS_COMPLETED}
+COUNTERS = ('booked_minutes', 'seat_minutes', *STATUS_COUNTERS.values())
+
+
+def hour_parts(date, start_time, end_time):
+    """Разбивает интервал брони на пары (дата, час, минуты) по границам часов.
+
+    Бронь, у которой окончание не позже начала, продолжается на следующий день.
+    """
+    current = datetime.combine(date, start_time)
+    end = datetime.combine(date, end_time)
+    if end <= current:
+        end += timedelta(days=1)
+    while current < end:
+        boundary = min(current.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1), end)
+        yield current.date(), current.hour, int((boundary - current).total_seconds() // 60)
+        current = boundary
+
+
+def _collect(rows) -> dict:
+    """Суммирует вклады броней в сводки по ключу (дата, стол, час)."""
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for date, table_id, start_time, end_time, seats, status in rows:
+        counter = STATUS_COUNTERS.get(status)
+        if counter:
+            totals[date, table_id, start_time.hour][counter] += 1
+        if status not in BOOKED_STATUSES:
+            continue
+        for part_date, hour, minutes in hour_parts(date, start_time, end_time):
+            bucket = totals[part_date, table_id, hour]
+            bucket['booked_minutes'] += minutes
+            bucket['seat_minutes'] += minutes * seats
+    return totals
+
+
+def rebuild_rollups(start, end, table_ids=None) -> int:
+    """Пересчитывает сводки за даты [start, end] одним чтением броней.
+
+    Читает брони с предыдущего дня, потому что ночная бронь занимает и часы
+    следующей даты. Возвращает число записанных строк сводки.
+    """
+    rollups = OccupancyRollup.objects.filter(date__range=(start, end))
+    reservations = Reservation.objects.filter(date__range=(start - timedelta(days=1), end))
+    if table_ids is not None:
+        rollups = rollups.filter(table_id__in=table_ids)
+        reservations = reservations.filter(table_id__in=table_ids)
+    totals = _collect(
+        reservations.values_list('date', 'table_id', 'start_time', 'end_time', 'seats', 'status').iterator()
+    )
+    objects = [
+        OccupancyRollup(date=date, table_id=table_id, hour=hour, **counters)
+        for (date, table_id, hour), counters in totals.items()
+        if start <= date <= end
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        OccupancyRollup.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    return len(objects)
+
+
+def _rebuild_pairs(pairs) -> None:
+    """Пересчитывает сводки ровно для пар (дата, стол) одним чтением броней.
+
+    Условия собираются по столам, поэтому запрос не растет с числом дат,
+    а соседние даты затронутых столов не читаются и не перезаписываются.
+    """
+    dates_by_table = defaultdict(set)
+    for date, table_id in pairs:
+        dates_by_table[table_id].add(date)
+    rollups = Q()
+    reservations = Q()
+    for table_id, dates in dates_by_table.items():
+        rollups |= Q(table_id=table_id, date__in=dates)
+        reservations |= Q(table_id=table_id, date__in=dates | {date - timedelta(days=1) for date in dates})
+    totals = _collect(
+        Reservation.objects.filter(reservations)
+        .values_list('date', 'table_id', 'start_time', 'end_time', 'seats', 'status')
+        .iterator()
+    )
+    objects = [
+        OccupancyRollup(date=date, table_id=table_id, hour=hour, **counters)
+        for (date, table_id, hour), counters in totals.items()
+        if (date, table_id) in pairs
+    ]
+    OccupancyRollup.objects.filter(rollups).delete()
+    OccupancyRollup.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def refresh_rollups(keys) -> None:
+    """Пересчитывает сводки по затронутым парам (дата, стол) и следующему дню каждой.
+
+    Пересчитываются только эти пары, а не весь диапазон дат между ними.
+    Строки столов блокируются, чтобы параллельные пересчеты одного стола
+    не удаляли и не вставляли одни и те же строки сводки одновременно.
+    """
+    keys = {key for key in keys if key and key[1] is not None}
+    if not keys:
+        return
+    pairs = keys | {(date + timedelta(days=1), table_id) for date, table_id in keys}
+    table_ids = {table_id for _, table_id in keys}
+    with transaction.atomic():
+        list(Table.objects.select_for_update().filter(pk__in=table_ids).order_by('pk').values_list('pk'))
+        _rebuild_pairs(pairs)
+
+
+def schedule_refresh(keys) -> None:
+    """Откладывает пересчет сводок до фиксации текущей транзакции.
+
+    Ошибка пересчета не откатывает бронь: она попадает в журнал, а сводку
+    можно восстановить командой rebuild_rollups.
+    """
+    keys = set(keys)
+    transaction.on_commit(lambda: refresh_rollups(keys), robust=True)
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from site_settings.cache import bump_generation, get_generation
+from site_settings.models import SpecialDay, WeeklySchedule
+
+SCHEDULE_GENERATION_KEY = 'booking:schedule:generation'
+
+# Недельный график, общий для процесса: (поколение, {день недели: окно}).
+_weekly_cache = {}
+
+
+def invalidate_schedule() -> None:
+    """Сбрасывает закешированный график во всех процессах."""
+    _weekly_cache.clear()
+    bump_generation(SCHEDULE_GENERATION_KEY)
+
+
+def _window(is_open, open_time, close_time):
+    """Возвращает рабочее окно или None для закрытого дня без времени работы."""
+    if not is_open or open_time is None or close_time is None:
+        return None
+    return open_time, close_time
+
+
+def _weekly_windows() -> dict:
+    """Возвращает окна недельного графика по дням недели из кеша процесса."""
+    generation = get_generation(SCHEDULE_GENERATION_KEY)
+    cached = _weekly_cache.get('weekly')
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    windows = {
+        day: _window(is_open, open_time, close_time)
+        for day, is_open, open_time, close_time in WeeklySchedule.objects.values_list(
+            'day_of_week', 'is_open', 'open_time', 'close_time'
+        )
+    }
+    _weekly_cache['weekly'] = (generation, windows)
+    return windows
+
+
+class ScheduleIndex:
+    """Рабочие окна на диапазон дат: недельный график и особые дни в памяти.
+
+    Загружает семь строк недельного графика (из кеша процесса) и особые дни
+    диапазона одним запросом, после чего отвечает на вопросы без запросов.
+    """
+
+    def __init__(self, weekly, specials, start, end):
+        """Сохраняет окна недельного графика, особые дни и границы диапазона."""
+        self.weekly = weekly
+        self.specials = specials
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def load(cls, start, end=None) -> "ScheduleIndex":
+        """Загружает график на диапазон дат включительно."""
+        end = end or start
+        specials = {
+            date: _window(is_open, open_time, close_time)
+            for date, is_open, open_time, close_time in SpecialDay.objects.filter(
+                date__range=(start, end)
+            ).values_list('date', 'is_open', 'open_time', 'close_time')
+        }
+        return cls(_weekly_windows(), specials, start, end)
+
+    def window_for(self, date):
+        """Возвращает рабочее окно на дату с учетом особых дней."""
+        if not self.start <= date <= self.end:
+            # Дата вне загруженного диапазона: догружаем особые дни всего промежутка
+            # до нее, иначе расширенные границы скрыли бы незагруженные дни.
+            if date < self.start:
+                extra = type(self).load(date, self.start - timedelta(days=1))
+                self.start = date
+            else:
+                extra = type(self).load(self.end + timedelta(days=1), date)
+                self.end = date
+            self.specials.update(extra.specials)
+        if date in self.specials:
+            return self.specials[date]
+        return self.weekly.get(date.weekday())
+
+    def windows_for(self, start, end) -> dict:
+        """Возвращает окна на все даты диапазона включительно."""
+        days = (end - start).days
+        return {
+            start + timedelta(days=offset): self.window_for(start + timedelta(days=offset))
+            for offset in range(days + 1)
+        }
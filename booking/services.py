@@ -1,131 +1,187 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Iterable
 
 from django.apps import apps
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
-from site_settings.models import SiteSettings
+from .availability import load_occupancy, load_occupancy_range
+from .cache import bump_availability_on_commit, cached_availability
+from .constants import OCCUPYING_STATUSES, OVERLAP_CONSTRAINT, SLOT_HOLD_TTL_MINUTES, TABLE_BUSY_MESSAGE
+from .utils import compute_end_time
 
-from .constants import OCCUPYING_STATUSES
-from .utils import get_working_window
 
-
-def is_table_available(table, date, start_time, end_time, exclude_id=None) -> bool:
-    """Проверяет, свободен ли стол в указанный интервал."""
+def is_table_available(table, date, start_time, end_time, exclude_id=None, exclude_hold=None) -> bool:
+    """Проверяет, свободен ли стол в указанный интервал с учетом чужих удержаний."""
     Reservation = apps.get_model('booking', 'Reservation')
+    SlotHold = apps.get_model('booking', 'SlotHold')
+    overlap = Q(start_time__lt=end_time) & Q(end_time__gt=start_time)
     qs = Reservation.objects.filter(
         table=table,
         date=date,
         status__in=OCCUPYING_STATUSES,
-    ).filter(
-        Q(start_time__lt=end_time) & Q(end_time__gt=start_time)
-    )
+    ).filter(overlap)
     if exclude_id:
         qs = qs.exclude(id=exclude_id)
-    return not qs.exists()
+    if qs.exists():
+        return False
+    holds = SlotHold.objects.filter(table=table, date=date, expires_at__gt=timezone.now()).filter(overlap)
+    if exclude_hold:
+        holds = holds.exclude(token=exclude_hold)
+    return not holds.exists()
+
+
+def save_reservation(reservation, hold_token=None):
+    """Сохраняет бронь без двойного бронирования стола при параллельных запросах.
+
+    В PostgreSQL пересечения отсекает исключающее ограничение, и его нарушение
+    превращается в ошибку валидации. На других СУБД до проверки занятости
+    выполняется пустой UPDATE строки стола: он берет блокировку записи
+    (в SQLite — на всю базу, SELECT FOR UPDATE там не работает), так что
+    проверка и вставка идут без вмешательства других бронирований стола.
+    Удержание слота с переданным токеном превращается в бронь: оно удаляется
+    в той же транзакции.
+    """
+    Table = apps.get_model('booking', 'Table')
+    with transaction.atomic():
+        if connection.vendor != 'postgresql':
+            Table.objects.filter(pk=reservation.table_id).update(name=F('name'))
+        try:
+            with transaction.atomic():
+                reservation.save()
+        except IntegrityError as exc:
+            if OVERLAP_CONSTRAINT in str(exc):
+                raise ValidationError(TABLE_BUSY_MESSAGE) from exc
+            raise
+        if hold_token:
+            release_hold(hold_token)
+    return reservation
+
+
+def hold_slot(table, date, start_time, duration_minutes, token):
+    """Удерживает слот за клиентом с токеном token на SLOT_HOLD_TTL_MINUTES минут.
+
+    У клиента одно удержание: при выборе другого слота оно переносится,
+    при повторном выборе того же — продлевается. Кеш доступности сбрасывается,
+    только если слот действительно стал занят: удержание создано, перенесено
+    или продлено после истечения. Возвращает удержание или None, если слот
+    уже занят бронью или чужим удержанием.
+    """
+    SlotHold = apps.get_model('booking', 'SlotHold')
+    end_time = compute_end_time(start_time, duration_minutes)
+    now = timezone.now()
+    with transaction.atomic():
+        hold = SlotHold.objects.select_for_update().filter(token=token).first()
+        if not is_table_available(table, date, start_time, end_time, exclude_hold=token):
+            return None
+        changed = {date}
+        if hold is None:
+            hold = SlotHold(token=token)
+        elif (hold.table_id, hold.date, hold.start_time, hold.end_time) == (table.id, date, start_time, end_time):
+            if hold.expires_at > now:
+                changed = set()
+        else:
+            changed.add(hold.date)
+        hold.table = table
+        hold.date = date
+        hold.start_time = start_time
+        hold.end_time = end_time
+        hold.expires_at = now + timedelta(minutes=SLOT_HOLD_TTL_MINUTES)
+        hold.save()
+        bump_availability_on_commit(changed)
+    return hold
+
+
+def release_hold(token) -> None:
+    """Снимает удержание слота по токену."""
+    SlotHold = apps.get_model('booking', 'SlotHold')
+    with transaction.atomic():
+        dates = set(SlotHold.objects.filter(token=token).values_list('date', flat=True))
+        SlotHold.objects.filter(token=token).delete()
+        bump_availability_on_commit(dates)
+
+
+def sweep_expired_holds() -> int:
+    """Удаляет истекшие удержания одним запросом и возвращает их количество."""
+    SlotHold = apps.get_model('booking', 'SlotHold')
+    deleted, _ = SlotHold.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def own_hold_token(date, hold_token):
+    """Возвращает токен, только если у клиента есть действующее удержание на дату.
+
+    Без своего удержания клиент видит ту же доступность, что и все, поэтому
+    общий результат кешируется без токена и не размножается по посетителям.
+    """
+    if not hold_token:
+        return ''
+    SlotHold = apps.get_model('booking', 'SlotHold')
+    if SlotHold.objects.filter(token=hold_token, date=date, expires_at__gt=timezone.now()).exists():
+        return hold_token
+    return ''
+
+
+def find_available_tables(date, start_time, end_time, seats, hold_token=None) -> Iterable:
+    """Возвращает доступные столы для выбранного времени."""
+    return load_occupancy(date, hold_token).free_tables(start_time, end_time, seats)
 
 
-def find_available_tables(date, start_time, end_time, seats) -> Iterable:
-    """Возвращает доступные столы для выбранного времени."""
-    Table = apps.get_model('booking', 'Table')
-    tables = Table.objects.filter(is_active=True, capacity__gte=seats).order_by('capacity', 'name')
-    return [table for table in tables if is_table_available(table, date, start_time, end_time)]
+def _occupancy_query(date, hold_token, method, *args):
+    """Возвращает функцию расчета для кеша: (результат метода занятости, срок актуальности)."""
+    def compute():
+        """Загружает занятость и вызывает метод расчета."""
+        occupancy = load_occupancy(date, hold_token)
+        return getattr(occupancy, method)(*args), occupancy.valid_until
+    return compute
 
 
-def find_available_start_times(date, duration_minutes, seats, step_minutes=30):
+def find_available_start_times(date, duration_minutes, seats, step_minutes=30, hold_token=None):
     """Находит доступные времена начала для даты."""
-    window = get_working_window(date)
-    if window is None:
-        return []
-    open_time, close_time = window
-
-    settings = SiteSettings.get_solo()
-    tz = timezone.get_current_timezone()
-    open_dt = timezone.make_aware(datetime.combine(date, open_time), tz)
-    close_dt = timezone.make_aware(datetime.combine(date, close_time), tz)
-    start_dt = open_dt
-    results = []
-
-    # Учитываем минимальное время предупреждения для пользователя.
-    min_notice_dt = timezone.localtime() + timedelta(minutes=settings.min_notice_minutes)
-    if timezone.is_naive(start_dt):
-        start_dt = timezone.make_aware(start_dt, timezone.get_current_timezone())
-    if timezone.is_naive(min_notice_dt):
-        min_notice_dt = timezone.make_aware(min_notice_dt, timezone.get_current_timezone())
-
-    # Подбираем слоты с шагом step_minutes и проверяем пересечения по каждому столу.
-    while start_dt + timedelta(minutes=duration_minutes) <= close_dt:
-        if start_dt < min_notice_dt:
-            start_dt += timedelta(minutes=step_minutes)
-            continue
-        start_time = start_dt.time()
-        end_time = (start_dt + timedelta(minutes=duration_minutes)).time()
-        if find_available_tables(date, start_time, end_time, seats):
-            results.append(start_time)
-        start_dt += timedelta(minutes=step_minutes)
-    return results
-
-
-def find_available_tables_for_date(date, duration_minutes, seats, step_minutes=30):
+    hold_token = own_hold_token(date, hold_token)
+    return cached_availability(
+        'times',
+        date,
+        (duration_minutes, seats, step_minutes, hold_token),
+        _occupancy_query(date, hold_token, 'free_start_times', duration_minutes, seats, step_minutes),
+    )
+
+
+def find_available_tables_for_date(date, duration_minutes, seats, step_minutes=30, hold_token=None):
     """Возвращает список доступных столов в течение дня."""
-    window = get_working_window(date)
-    if window is None:
-        return []
-    open_time, close_time = window
-
-    settings = SiteSettings.get_solo()
-    tz = timezone.get_current_timezone()
-    open_dt = timezone.make_aware(datetime.combine(date, open_time), tz)
-    close_dt = timezone.make_aware(datetime.combine(date, close_time), tz)
-    start_dt = open_dt
-    results = {}
-
-    min_notice_dt = timezone.localtime() + timedelta(minutes=settings.min_notice_minutes)
-    if timezone.is_naive(start_dt):
-        start_dt = timezone.make_aware(start_dt, timezone.get_current_timezone())
-    if timezone.is_naive(min_notice_dt):
-        min_notice_dt = timezone.make_aware(min_notice_dt, timezone.get_current_timezone())
-
-    while start_dt + timedelta(minutes=duration_minutes) <= close_dt:
-        if start_dt < min_notice_dt:
-            start_dt += timedelta(minutes=step_minutes)
-            continue
-        start_time = start_dt.time()
-        end_time = (start_dt + timedelta(minutes=duration_minutes)).time()
-        for table in find_available_tables(date, start_time, end_time, seats):
-            results[table.id] = table
-        start_dt += timedelta(minutes=step_minutes)
-    return sorted(results.values(), key=lambda t: (t.capacity, t.name))
-
-
-def find_available_start_times_for_table(date, duration_minutes, seats, table, step_minutes=30):
+    hold_token = own_hold_token(date, hold_token)
+    return cached_availability(
+        'tables',
+        date,
+        (duration_minutes, seats, step_minutes, hold_token),
+        _occupancy_query(date, hold_token, 'free_tables_for_day', duration_minutes, seats, step_minutes),
+    )
+
+
+def find_available_start_times_for_table(date, duration_minutes, seats, table, step_minutes=30, hold_token=None):
     """Находит доступные времена для выбранного стола."""
-    window = get_working_window(date)
-    if window is None:
-        return []
-    open_time, close_time = window
-
-    settings = SiteSettings.get_solo()
-    tz = timezone.get_current_timezone()
-    open_dt = timezone.make_aware(datetime.combine(date, open_time), tz)
-    close_dt = timezone.make_aware(datetime.combine(date, close_time), tz)
-    start_dt = open_dt
-    results = []
-
-    min_notice_dt = timezone.localtime() + timedelta(minutes=settings.min_notice_minutes)
-    if timezone.is_naive(start_dt):
-        start_dt = timezone.make_aware(start_dt, timezone.get_current_timezone())
-    if timezone.is_naive(min_notice_dt):
-        min_notice_dt = timezone.make_aware(min_notice_dt, timezone.get_current_timezone())
-
-    while start_dt + timedelta(minutes=duration_minutes) <= close_dt:
-        if start_dt < min_notice_dt:
-            start_dt += timedelta(minutes=step_minutes)
-            continue
-        start_time = start_dt.time()
-        end_time = (start_dt + timedelta(minutes=duration_minutes)).time()
-        if seats <= table.capacity and is_table_available(table, date, start_time, end_time):
-            results.append(start_time)
-        start_dt += timedelta(minutes=step_minutes)
-    return results
+    hold_token = own_hold_token(date, hold_token)
+    return cached_availability(
+        'table-times',
+        date,
+        (table.id, duration_minutes, seats, step_minutes, hold_token),
+        _occupancy_query(
+            date, hold_token, 'free_start_times_for_table', table, duration_minutes, seats, step_minutes
+        ),
+    )
+
+
+def find_calendar_availability(start, end, duration_minutes, seats, step_minutes=30) -> list:
+    """Возвращает сводку доступности по каждой дате диапазона включительно."""
+    days = []
+    for date, occupancy in sorted(load_occupancy_range(start, end).items()):
+        times = occupancy.free_start_times(duration_minutes, seats, step_minutes)
+        days.append({
+            'date': date,
+            'is_open': occupancy.window is not None,
+            'free_start_times': len(times),
+            'earliest': times[0] if times else None,
+        })
+    return days
@@ -0,0 +1,75 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
+
+from .cache import bump_availability, bump_availability_on_commit
+from .models import Reservation, Table
+from .rollups import schedule_refresh
+from .schedule import invalidate_schedule
+
+# Поля брони, изменение которых влияет на доступность столов.
+AVAILABILITY_FIELDS = {'table', 'date', 'start_time', 'duration_minutes', 'end_time', 'status'}
+# Поля брони, от которых зависят сводки занятости.
+ROLLUP_FIELDS = AVAILABILITY_FIELDS | {'seats'}
+
+
+def _touches(fields, update_fields) -> bool:
+    """Проверяет, затрагивает ли сохранение хотя бы одно из полей."""
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_reservation_date(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Запоминает прежние дату и стол брони, чтобы обновить кеш и сводки и для них."""
+    instance._previous_date = None
+    instance._previous_table_id = None
+    if raw or instance.pk is None or not _touches(ROLLUP_FIELDS, update_fields):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list('date', 'table_id').first()
+    if previous:
+        instance._previous_date, instance._previous_table_id = previous
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Сбрасывает кеш доступности и пересчитывает сводки на дату сохраненной брони."""
+    if raw:
+        return
+    previous_date = getattr(instance, '_previous_date', None)
+    if _touches(AVAILABILITY_FIELDS, update_fields):
+        bump_availability_on_commit({instance.date, previous_date})
+    if _touches(ROLLUP_FIELDS, update_fields):
+        schedule_refresh({
+            (instance.date, instance.table_id),
+            (previous_date, getattr(instance, '_previous_table_id', None)),
+        })
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    """Сбрасывает кеш доступности и пересчитывает сводки на дату удаленной брони."""
+    bump_availability_on_commit({instance.date})
+    schedule_refresh({(instance.date, instance.table_id)})
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+@receiver(post_save, sender=WeeklySchedule)
+@receiver(post_delete, sender=WeeklySchedule)
+@receiver(post_save, sender=SpecialDay)
+@receiver(post_delete, sender=SpecialDay)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def schedule_changed(sender, **kwargs):
+    """Сбрасывает кеш доступности на все даты при изменении столов, графика или настроек."""
+    bump_availability()
+
+
+@receiver(post_save, sender=WeeklySchedule)
+@receiver(post_delete, sender=WeeklySchedule)
+@receiver(post_save, sender=SpecialDay)
+@receiver(post_delete, sender=SpecialDay)
+def working_hours_changed(sender, **kwargs):
+    """Сбрасывает кеш недельного графика."""
+    invalidate_schedule()
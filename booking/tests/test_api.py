@@ -0,0 +1,137 @@
+from datetime import time, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.models import Reservation, Table
+from booking.utils import compute_end_time
+from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
+
+
+class BookingApiTests(TestCase):
+    """Тесты JSON API доступности."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.slot_duration_choices = [60, 120]
+        settings.min_notice_minutes = 0
+        settings.save()
+
+        WeeklySchedule.objects.all().delete()
+        for day in range(7):
+            WeeklySchedule.objects.create(
+                day_of_week=day,
+                is_open=True,
+                open_time=time(10, 0),
+                close_time=time(12, 0),
+            )
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.table = Table.objects.create(name="T1", capacity=4, is_active=True)
+
+    def _reserve(self, date, start, duration=60):
+        """Создает бронь стола на дату."""
+        # Кеш доступности сбрасывается после фиксации транзакции.
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(
+                table=self.table,
+                date=date,
+                start_time=start,
+                duration_minutes=duration,
+                end_time=compute_end_time(start, duration),
+                seats=2,
+                customer_name="Test",
+                customer_email="test@example.com",
+            )
+
+    def test_calendar_reports_open_full_and_closed_days(self):
+        """Проверяет сценарий: calendar reports open full and closed days."""
+        full_day = self.date + timedelta(days=1)
+        closed_day = self.date + timedelta(days=2)
+        self._reserve(self.date, time(10, 0))
+        self._reserve(full_day, time(10, 0), 120)
+        SpecialDay.objects.create(date=closed_day, is_open=False)
+
+        response = self.client.get('/booking/api/calendar/', {
+            'from': self.date.isoformat(),
+            'to': closed_day.isoformat(),
+            'duration': 60,
+            'seats': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        days = response.json()['days']
+        self.assertEqual(
+            days,
+            [
+                {'date': self.date.isoformat(), 'is_open': True, 'free_start_times': 1, 'earliest': '11:00'},
+                {'date': full_day.isoformat(), 'is_open': True, 'free_start_times': 0, 'earliest': None},
+                {'date': closed_day.isoformat(), 'is_open': False, 'free_start_times': 0, 'earliest': None},
+            ],
+        )
+
+    def test_calendar_query_count_does_not_depend_on_range(self):
+        """Проверяет сценарий: calendar query count does not depend on range."""
+        counts = []
+        for days in (7, 90):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/booking/api/calendar/', {
+                    'from': self.date.isoformat(),
+                    'to': (self.date + timedelta(days=days - 1)).isoformat(),
+                    'duration': 60,
+                })
+            self.assertEqual(len(response.json()['days']), days)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_calendar_rejects_long_range_and_unknown_duration(self):
+        """Проверяет сценарий: calendar rejects long range and unknown duration."""
+        response = self.client.get('/booking/api/calendar/', {
+            'from': self.date.isoformat(),
+            'to': (self.date + timedelta(days=90)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/booking/api/calendar/', {'duration': 45})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('duration_minutes', response.json()['errors'])
+
+    def test_times_api_returns_not_modified_until_reservation_changes(self):
+        """Проверяет сценарий: times api returns not modified until reservation changes."""
+        params = {
+            'date': self.date.isoformat(),
+            'duration_minutes': 60,
+            'seats': 2,
+            'table': self.table.id,
+        }
+        response = self.client.get('/booking/api/times/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['times'], ['10:00', '10:30', '11:00'])
+        etag = response['ETag']
+
+        response = self.client.get('/booking/api/times/', params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self._reserve(self.date, time(10, 0))
+        response = self.client.get('/booking/api/times/', params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['times'], ['11:00'])
+
+    def test_tables_api_lists_free_tables(self):
+        """Проверяет сценарий: tables api lists free tables."""
+        response = self.client.get('/booking/api/tables/', {
+            'date': self.date.isoformat(),
+            'duration_minutes': 60,
+            'seats': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['tables'],
+            [{'id': self.table.id, 'name': 'T1', 'capacity': 4}],
+        )
+        self.assertIn('ETag', response)
+        response = self.client.get('/booking/api/tables/', {'date': 'bad'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,155 @@
+from datetime import time, timedelta
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.availability import DayOccupancy, MatrixOccupancy, get_occupancy_class, np
+from booking.constants import STATUS_CANCELLED
+from booking.models import Reservation, SlotHold, Table
+from booking.services import (
+    find_available_start_times,
+    find_available_start_times_for_table,
+    find_available_tables_for_date,
+    is_table_available,
+)
+from booking.utils import compute_end_time
+from site_settings.models import SiteSettings, WeeklySchedule
+
+
+class DayOccupancyTests(TestCase):
+    """Тесты движка занятости столов на дату."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.slot_duration_choices = [60, 120]
+        settings.min_notice_minutes = 0
+        settings.save()
+
+        WeeklySchedule.objects.all().delete()
+        self.date = timezone.localdate() + timedelta(days=1)
+        WeeklySchedule.objects.create(
+            day_of_week=self.date.weekday(),
+            is_open=True,
+            open_time=time(10, 0),
+            close_time=time(22, 0),
+        )
+        self.small = Table.objects.create(name="T1", capacity=2, is_active=True)
+        self.large = Table.objects.create(name="T2", capacity=4, is_active=True)
+
+    def _reserve(self, table, start, duration, status='NEW'):
+        """Создает бронь стола на тестовую дату."""
+        # Кеш доступности сбрасывается после фиксации транзакции.
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(
+                table=table,
+                date=self.date,
+                start_time=start,
+                duration_minutes=duration,
+                end_time=compute_end_time(start, duration),
+                seats=2,
+                customer_name="Test",
+                customer_email="test@example.com",
+                status=status,
+            )
+
+    def _brute_force_times(self, table, duration, seats, step):
+        """Считает свободные времена стола перебором по запросу на слот."""
+        results = []
+        start = 10 * 60
+        while start + duration <= 22 * 60:
+            start_time = time(start // 60, start % 60)
+            end_time = compute_end_time(start_time, duration)
+            if seats <= table.capacity and is_table_available(table, self.date, start_time, end_time):
+                results.append(start_time)
+            start += step
+        return results
+
+    def test_start_times_for_table_match_per_slot_queries(self):
+        """Проверяет сценарий: start times for table match per slot queries."""
+        self._reserve(self.large, time(12, 0), 120)
+        self._reserve(self.large, time(16, 30), 60)
+        cancelled = self._reserve(self.large, time(19, 0), 60)
+        cancelled.status = STATUS_CANCELLED
+        cancelled.save()
+        for duration in (60, 120):
+            expected = self._brute_force_times(self.large, duration, 3, 30)
+            actual = find_available_start_times_for_table(self.date, duration, 3, self.large)
+            self.assertEqual(actual, expected)
+
+    def test_tables_for_date_skip_fully_booked_table(self):
+        """Проверяет сценарий: tables for date skip fully booked table."""
+        self._reserve(self.small, time(10, 0), 120)
+        self._reserve(self.small, time(12, 0), 120)
+        tables = find_available_tables_for_date(self.date, 120, 2, step_minutes=120)
+        self.assertEqual([t.id for t in tables], [self.small.id, self.large.id])
+        self._reserve(self.small, time(14, 0), 120)
+        self._reserve(self.small, time(16, 0), 120)
+        self._reserve(self.small, time(18, 0), 120)
+        self._reserve(self.small, time(20, 0), 120)
+        tables = find_available_tables_for_date(self.date, 120, 2, step_minutes=120)
+        self.assertEqual([t.id for t in tables], [self.large.id])
+
+    def test_start_times_need_table_with_enough_seats(self):
+        """Проверяет сценарий: start times need table with enough seats."""
+        self._reserve(self.large, time(12, 0), 60)
+        times = find_available_start_times(self.date, 60, 3, step_minutes=60)
+        self.assertIn(time(11, 0), times)
+        self.assertNotIn(time(12, 0), times)
+        self.assertIn(time(12, 0), find_available_start_times(self.date, 60, 2, step_minutes=60))
+
+    def test_booking_index_query_count_does_not_grow_with_tables(self):
+        """Проверяет сценарий: booking index query count does not grow with tables."""
+        params = {
+            'date': self.date.isoformat(),
+            'duration_minutes': 60,
+            'seats': 2,
+            'table': self.large.id,
+            'start_time': '12:00',
+        }
+        cache.clear()
+        with CaptureQueriesContext(connection) as before:
+            self.client.get('/booking/', params)
+        for index in range(10):
+            table = Table.objects.create(name=f"X{index}", capacity=4, is_active=True)
+            self._reserve(table, time(14, 0), 60)
+        SlotHold.objects.all().delete()
+        self.client.cookies.clear()
+        cache.clear()
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get('/booking/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(after), len(before))
+
+    @skipIf(np is None, 'NumPy не установлен')
+    def test_matrix_backend_matches_python_backend(self):
+        """Проверяет сценарий: matrix backend matches python backend."""
+        self._reserve(self.small, time(10, 30), 60)
+        self._reserve(self.large, time(12, 0), 120)
+        self._reserve(self.large, time(17, 0), 120)
+        python = DayOccupancy.load(self.date)
+        matrix = MatrixOccupancy.load(self.date)
+        for duration in (60, 120, 180):
+            for seats in (1, 3, 5):
+                for step in (15, 30, 60):
+                    self.assertEqual(
+                        matrix.free_start_times(duration, seats, step),
+                        python.free_start_times(duration, seats, step),
+                    )
+                    self.assertEqual(
+                        matrix.free_tables_for_day(duration, seats, step),
+                        python.free_tables_for_day(duration, seats, step),
+                    )
+                    self.assertEqual(
+                        matrix.free_start_times_for_table(self.large, duration, seats, step),
+                        python.free_start_times_for_table(self.large, duration, seats, step),
+                    )
+
+    @override_settings(BOOKING_AVAILABILITY_BACKEND='numpy')
+    def test_numpy_backend_falls_back_without_numpy(self):
+        """Проверяет сценарий: numpy backend falls back without numpy."""
+        expected = DayOccupancy if np is None else MatrixOccupancy
+        self.assertIs(get_occupancy_class(), expected)
@@ -0,0 +1,92 @@
+from datetime import time, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.cache import availability_fingerprint, get_cache_stats, reset_cache_stats
+from booking.constants import STATUS_CANCELLED
+from booking.models import Reservation, Table
+from booking.services import find_available_start_times_for_table, find_available_tables_for_date
+from booking.utils import compute_end_time
+from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
+
+
+class AvailabilityCacheTests(TestCase):
+    """Тесты кеша доступности и его инвалидации."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        cache.clear()
+        settings = SiteSettings.get_solo()
+        settings.slot_duration_choices = [60, 120]
+        settings.min_notice_minutes = 0
+        settings.save()
+
+        WeeklySchedule.objects.all().delete()
+        self.date = timezone.localdate() + timedelta(days=1)
+        WeeklySchedule.objects.create(
+            day_of_week=self.date.weekday(),
+            is_open=True,
+            open_time=time(10, 0),
+            close_time=time(12, 0),
+        )
+        self.table = Table.objects.create(name="T1", capacity=4, is_active=True)
+        reset_cache_stats()
+
+    def _reserve(self, start, duration=60):
+        """Создает бронь стола на тестовую дату."""
+        # Кеш доступности сбрасывается после фиксации транзакции.
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(
+                table=self.table,
+                date=self.date,
+                start_time=start,
+                duration_minutes=duration,
+                end_time=compute_end_time(start, duration),
+                seats=2,
+                customer_name="Test",
+                customer_email="test@example.com",
+            )
+
+    def test_repeated_lookup_is_served_from_cache(self):
+        """Проверяет сценарий: repeated lookup is served from cache."""
+        first = find_available_start_times_for_table(self.date, 60, 2, self.table)
+        with self.assertNumQueries(0):
+            second = find_available_start_times_for_table(self.date, 60, 2, self.table)
+        self.assertEqual(first, second)
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_reservation_changes_invalidate_date(self):
+        """Проверяет сценарий: reservation changes invalidate date."""
+        self.assertIn(time(10, 0), find_available_start_times_for_table(self.date, 60, 2, self.table))
+        reservation = self._reserve(time(10, 0))
+        self.assertNotIn(time(10, 0), find_available_start_times_for_table(self.date, 60, 2, self.table))
+        reservation.status = STATUS_CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.save()
+        self.assertIn(time(10, 0), find_available_start_times_for_table(self.date, 60, 2, self.table))
+        self.assertEqual(get_cache_stats()['hits'], 0)
+
+    def test_version_is_bumped_only_after_commit(self):
+        """Проверяет сценарий: version is bumped only after commit."""
+        before = availability_fingerprint(self.date)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Reservation.objects.create(
+                table=self.table, date=self.date, start_time=time(10, 0), duration_minutes=60,
+                end_time=time(11, 0), seats=2, customer_name="Test", customer_email="test@example.com",
+            )
+            self.assertEqual(availability_fingerprint(self.date), before)
+        self.assertEqual(availability_fingerprint(self.date), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(availability_fingerprint(self.date), before)
+
+    def test_schedule_and_table_changes_invalidate_all_dates(self):
+        """Проверяет сценарий: schedule and table changes invalidate all dates."""
+        self.assertEqual(len(find_available_tables_for_date(self.date, 60, 2)), 1)
+        SpecialDay.objects.create(date=self.date, is_open=False)
+        self.assertEqual(find_available_tables_for_date(self.date, 60, 2), [])
+        SpecialDay.objects.all().delete()
+        self.table.capacity = 1
+        self.table.save()
+        self.assertEqual(find_available_tables_for_date(self.date, 60, 2), [])
@@ -0,0 +1,152 @@
+import threading
+from datetime import time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.checkin import RESULT_ALREADY, RESULT_CHECKED_IN, RESULT_INVALID, check_in
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED, STATUS_NEW
+from booking.models import OccupancyRollup, Reservation, Table
+from booking.rollups import rebuild_rollups
+
+
+def _reservations(table, *rows):
+    """Создает брони на стол по парам (код, статус, дата)."""
+    Reservation.objects.bulk_create([
+        Reservation(
+            table=table, date=day, start_time=time(10 + index * 2, 0), end_time=time(11 + index * 2, 0),
+            duration_minutes=60, seats=2, customer_name=f"Гость {index}",
+            customer_email=f"guest{index}@example.com", status=status, public_code=code,
+        )
+        for index, (code, status, day) in enumerate(rows)
+    ])
+
+
+class CheckInTests(TestCase):
+    """Тесты отметки прихода гостей по коду билета."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        self.today = timezone.localdate()
+        self.table = Table.objects.create(name="Окно", capacity=4, is_active=True)
+        _reservations(
+            self.table,
+            ("NEWCODE001", STATUS_NEW, self.today),
+            ("CONFIRMED1", STATUS_CONFIRMED, self.today),
+            ("CANCELLED1", STATUS_CANCELLED, self.today),
+            ("TOMORROW01", STATUS_NEW, self.today + timedelta(days=1)),
+        )
+        user = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(user)
+
+    def test_checks_in_with_one_lookup_and_one_update(self):
+        """Проверяет сценарий: checks in with one lookup and one update."""
+        with CaptureQueriesContext(connection) as queries:
+            result = check_in(" confirmed1 ")
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual(statements.count('SELECT'), 1)
+        self.assertEqual(statements.count('UPDATE'), 1)
+        self.assertEqual(result['result'], RESULT_CHECKED_IN)
+        self.assertEqual(result['reservation']['table'], "Окно")
+        reservation = Reservation.objects.get(public_code="CONFIRMED1")
+        self.assertIsNotNone(reservation.arrived_at)
+
+    def test_repeat_scan_reports_already_checked_in(self):
+        """Проверяет сценарий: repeat scan reports already checked in."""
+        check_in("NEWCODE001")
+        arrived_at = Reservation.objects.get(public_code="NEWCODE001").arrived_at
+        result = check_in("NEWCODE001")
+        self.assertEqual(result['result'], RESULT_ALREADY)
+        self.assertIn('уже отмечен', result['message'])
+        self.assertEqual(Reservation.objects.get(public_code="NEWCODE001").arrived_at, arrived_at)
+
+    def test_cancel_during_scan_reports_invalid(self):
+        """Проверяет сценарий: cancel during scan reports invalid."""
+        localdate = timezone.localdate
+
+        def cancel_then_localdate(*args, **kwargs):
+            """Отменяет бронь между чтением строки и UPDATE отметки."""
+            Reservation.objects.filter(public_code="NEWCODE001").update(status=STATUS_CANCELLED)
+            return localdate(*args, **kwargs)
+
+        with patch('booking.checkin.timezone.localdate', side_effect=cancel_then_localdate):
+            result = check_in("NEWCODE001")
+        self.assertEqual(result['result'], RESULT_INVALID)
+        self.assertIn('недействительна', result['message'])
+        self.assertEqual(result['reservation']['status'], STATUS_CANCELLED)
+        self.assertIsNone(Reservation.objects.get(public_code="NEWCODE001").arrived_at)
+
+    def test_new_reservation_moves_rollup_counter(self):
+        """Проверяет сценарий: new reservation moves rollup counter."""
+        rebuild_rollups(self.today, self.today)
+        check_in("NEWCODE001")
+        rollup = OccupancyRollup.objects.get(date=self.today, table=self.table, hour=10)
+        self.assertEqual((rollup.new_count, rollup.confirmed_count), (0, 1))
+        rebuild_rollups(self.today, self.today)
+        rebuilt = OccupancyRollup.objects.get(date=self.today, table=self.table, hour=10)
+        self.assertEqual((rebuilt.new_count, rebuilt.confirmed_count), (0, 1))
+
+    def test_api_statuses(self):
+        """Проверяет сценарий: api statuses."""
+        url = reverse('staff:checkin_api')
+        response = self.client.post(url, {'code': "NEWCODE001"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['reservation']['status'], STATUS_CONFIRMED)
+        self.assertEqual(self.client.post(url, {'code': "CANCELLED1"}).status_code, 409)
+        self.assertEqual(self.client.post(url, {'code': "TOMORROW01"}).status_code, 409)
+        self.assertEqual(self.client.post(url, {'code': "MISSING"}).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(Reservation.objects.get(public_code="TOMORROW01").status, STATUS_NEW)
+
+    def test_page_returns_fragment_for_fetch(self):
+        """Проверяет сценарий: page returns fragment for fetch."""
+        url = reverse('staff:checkin')
+        self.assertContains(self.client.get(url), 'data-checkin-form')
+        response = self.client.post(url, {'code': "NEWCODE001"}, HTTP_X_REQUESTED_WITH='fetch')
+        self.assertContains(response, 'Гость отмечен.')
+        self.assertNotContains(response, '<html')
+        page = self.client.post(url, {'code': "NEWCODE001"})
+        self.assertContains(page, 'уже отмечен')
+        self.assertContains(page, '<html')
+
+    def test_requires_staff(self):
+        """Проверяет сценарий: requires staff."""
+        self.client.logout()
+        response = self.client.post(reverse('staff:checkin_api'), {'code': "NEWCODE001"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(Reservation.objects.get(public_code="NEWCODE001").arrived_at)
+
+
+class ConcurrentCheckInTests(TransactionTestCase):
+    """Тест одновременных сканов одного билета с нескольких устройств."""
+    workers = 6
+
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        today = timezone.localdate()
+        _reservations(Table.objects.create(name="T1", capacity=4, is_active=True), ("SAMECODE01", STATUS_NEW, today))
+
+    def _scan(self, barrier, results):
+        """Сканирует билет из отдельного потока."""
+        try:
+            barrier.wait()
+            results.append(check_in("SAMECODE01")['result'])
+        except Exception as exc:  # noqa: BLE001 - любая ошибка проваливает тест.
+            results.append(repr(exc))
+        finally:
+            connection.close()
+
+    def test_only_one_scan_checks_in(self):
+        """Проверяет сценарий: only one scan checks in."""
+        barrier = threading.Barrier(self.workers)
+        results = []
+        threads = [threading.Thread(target=self._scan, args=(barrier, results)) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), [RESULT_ALREADY] * (self.workers - 1) + [RESULT_CHECKED_IN])
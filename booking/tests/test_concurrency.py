@@ -0,0 +1,104 @@
+import threading
+from datetime import time, timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from booking.constants import OCCUPYING_STATUSES, TABLE_BUSY_MESSAGE
+from booking.models import Reservation, Table
+from booking.services import save_reservation
+from site_settings.models import SiteSettings, WeeklySchedule
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Стресс-тест параллельного бронирования одного стола."""
+    workers = 8
+
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.slot_duration_choices = [60, 120]
+        settings.min_notice_minutes = 0
+        settings.save()
+
+        self.date = timezone.localdate() + timedelta(days=1)
+        WeeklySchedule.objects.create(
+            day_of_week=self.date.weekday(),
+            is_open=True,
+            open_time=time(10, 0),
+            close_time=time(22, 0),
+        )
+        self.table = Table.objects.create(name="T1", capacity=4, is_active=True)
+
+    def _book(self, index, barrier, results):
+        """Пытается забронировать пересекающийся слот из отдельного потока."""
+        try:
+            barrier.wait()
+            save_reservation(Reservation(
+                table_id=self.table.id,
+                date=self.date,
+                start_time=time(12, 0) if index % 2 else time(12, 30),
+                duration_minutes=60,
+                seats=2,
+                customer_name=f"Guest {index}",
+                customer_email=f"guest{index}@example.com",
+            ))
+            results.append('ok')
+        except ValidationError as exc:
+            results.append('busy' if TABLE_BUSY_MESSAGE in exc.messages else repr(exc))
+        except Exception as exc:  # noqa: BLE001 - любая другая ошибка проваливает тест.
+            results.append(repr(exc))
+        finally:
+            connection.close()
+
+    def test_parallel_bookings_never_double_book(self):
+        """Проверяет сценарий: parallel bookings never double book."""
+        barrier = threading.Barrier(self.workers)
+        results = []
+        threads = [
+            threading.Thread(target=self._book, args=(index, barrier, results))
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), ['busy'] * (self.workers - 1) + ['ok'])
+        self.assertEqual(
+            Reservation.objects.filter(
+                table=self.table,
+                date=self.date,
+                status__in=OCCUPYING_STATUSES,
+            ).count(),
+            1,
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'Исключающее ограничение есть только в PostgreSQL')
+    def test_exclusion_constraint_rejects_overlap_missed_by_clean(self):
+        """Проверяет сценарий: exclusion constraint rejects overlap missed by clean."""
+        save_reservation(Reservation(
+            table=self.table,
+            date=self.date,
+            start_time=time(12, 0),
+            duration_minutes=60,
+            seats=2,
+            customer_name="First",
+            customer_email="first@example.com",
+        ))
+        with patch('booking.models.is_table_available', return_value=True):
+            with self.assertRaisesMessage(ValidationError, TABLE_BUSY_MESSAGE):
+                save_reservation(Reservation(
+                    table=self.table,
+                    date=self.date,
+                    start_time=time(12, 30),
+                    duration_minutes=60,
+                    seats=2,
+                    customer_name="Second",
+                    customer_email="second@example.com",
+                ))
+        self.assertEqual(Reservation.objects.count(), 1)
@@ -0,0 +1,146 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.utils import timezone
+
+from booking.cache import availability_fingerprint, get_cache_stats, reset_cache_stats
+from booking.models import Reservation, SlotHold, Table
+from booking.services import find_available_start_times_for_table, sweep_expired_holds
+from site_settings.models import SiteSettings, WeeklySchedule
+
+
+class SlotHoldTests(TestCase):
+    """Тесты временного удержания слотов."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        cache.clear()
+        settings = SiteSettings.get_solo()
+        settings.slot_duration_choices = [60, 120]
+        settings.min_notice_minutes = 0
+        settings.save()
+
+        WeeklySchedule.objects.all().delete()
+        self.date = timezone.localdate() + timedelta(days=1)
+        WeeklySchedule.objects.create(
+            day_of_week=self.date.weekday(),
+            is_open=True,
+            open_time=time(10, 0),
+            close_time=time(22, 0),
+        )
+        self.table = Table.objects.create(name="T1", capacity=4, is_active=True)
+        self.params = {
+            'date': self.date.isoformat(),
+            'duration_minutes': 60,
+            'seats': 2,
+            'table': self.table.id,
+            'start_time': '12:00',
+        }
+
+    def _post(self, client, token=''):
+        """Отправляет форму бронирования выбранного слота."""
+        return client.post(
+            '/booking/new/',
+            {
+                'table': self.table.id,
+                'date': self.date.isoformat(),
+                'start_time': '12:00',
+                'duration_minutes': 60,
+                'seats': 2,
+                'customer_name': 'Ivan',
+                'customer_email': 'ivan@example.com',
+                'hold_token': token,
+            },
+        )
+
+    def _select(self, client, start_time='12:00'):
+        """Открывает страницу бронирования ради cookie и выбирает время POST-запросом."""
+        selection = {key: value for key, value in self.params.items() if key != 'start_time'}
+        client.get('/booking/', selection)
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.post('/booking/', {**selection, 'start_time': start_time})
+
+    def test_selected_slot_is_held_for_other_clients(self):
+        """Проверяет сценарий: selected slot is held for other clients."""
+        response = self._select(self.client)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('start_time=12%3A00', response['Location'])
+        hold = self.client.get(response['Location']).context['hold']
+        self.assertEqual(hold.start_time, time(12, 0))
+        self.assertEqual(hold.end_time, time(13, 0))
+        self.assertIn(time(12, 0), self.client.get('/booking/', self.params).context['available_times'])
+        self.assertEqual(SlotHold.objects.count(), 1)
+
+        other = Client().get('/booking/', self.params)
+        self.assertNotIn(time(12, 0), other.context['available_times'])
+        self.assertNotIn(time(11, 30), other.context['available_times'])
+        self.assertIn(time(13, 0), other.context['available_times'])
+        self.assertIsNone(other.context['hold'])
+        self.assertIsNone(other.context['selected_time'])
+        self.assertEqual(self._post(Client()).status_code, 200)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_get_requests_never_create_holds(self):
+        """Проверяет сценарий: get requests never create holds."""
+        response = Client().get('/booking/', self.params)
+        self.assertIsNone(response.context['hold'])
+        self.assertNotIn('slot_hold', response.cookies)
+        self.client.get('/booking/', self.params)
+        response = self.client.get('/booking/', self.params)
+        self.assertIsNone(response.context['hold'])
+        self.assertFalse(SlotHold.objects.exists())
+
+    def test_selection_issues_cookie_that_must_come_back(self):
+        """Проверяет сценарий: selection issues cookie that must come back."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/booking/', self.params)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('slot_hold', response.cookies)
+        self.assertEqual(SlotHold.objects.count(), 1)
+        self.assertIsNone(Client().get(response['Location']).context['hold'])
+        self.assertIsNotNone(self.client.get(response['Location']).context['hold'])
+
+    def test_visitors_without_holds_share_cached_availability(self):
+        """Проверяет сценарий: visitors without holds share cached availability."""
+        self._select(Client())
+        reset_cache_stats()
+        for _ in range(3):
+            Client().get('/booking/', self.params)
+        self.assertEqual(get_cache_stats()['misses'], 2)
+        self.assertEqual(get_cache_stats()['hits'], 4)
+
+    def test_client_keeps_one_hold_and_renewal_does_not_bump(self):
+        """Проверяет сценарий: client keeps one hold and renewal does not bump."""
+        self._select(self.client)
+        before = availability_fingerprint(self.date)
+        self._select(self.client)
+        self.assertEqual(availability_fingerprint(self.date), before)
+        self._select(self.client, '15:00')
+        self.assertNotEqual(availability_fingerprint(self.date), before)
+        hold = SlotHold.objects.get()
+        self.assertEqual(hold.start_time, time(15, 0))
+
+    def test_submit_converts_hold_into_reservation(self):
+        """Проверяет сценарий: submit converts hold into reservation."""
+        self._select(self.client)
+        hold = self.client.get('/booking/', self.params).context['hold']
+        response = self._post(self.client, hold.token)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Reservation.objects.filter(table=self.table, start_time=time(12, 0)).exists())
+        self.assertFalse(SlotHold.objects.exists())
+
+    def test_expired_holds_free_slot_and_are_swept(self):
+        """Проверяет сценарий: expired holds free slot and are swept."""
+        self._select(self.client)
+        self.assertNotIn(time(12, 0), find_available_start_times_for_table(self.date, 60, 2, self.table))
+        SlotHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        cache.clear()
+        self.assertIn(time(12, 0), find_available_start_times_for_table(self.date, 60, 2, self.table))
+        with self.assertNumQueries(1):
+            self.assertEqual(sweep_expired_holds(), 1)
+        self.assertFalse(SlotHold.objects.exists())
+        out = StringIO()
+        call_command('sweep_slot_holds', stdout=out)
+        self.assertIn('Deleted expired holds: 0', out.getvalue())
@@ -0,0 +1,187 @@
+import io
+import json
+import os
+import tempfile
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.constants import STATUS_CONFIRMED, STATUS_NEW, TABLE_BUSY_MESSAGE
+from booking.importer import import_reservations, read_rows
+from booking.models import Reservation, SlotHold, Table
+from site_settings.models import SpecialDay, WeeklySchedule
+from staff.export import export_rows, stream_csv
+
+
+class ReservationImportTests(TestCase):
+    """Тесты массовой загрузки броней."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        WeeklySchedule.objects.all().delete()
+        for day in range(7):
+            WeeklySchedule.objects.create(day_of_week=day, is_open=True, open_time=time(10, 0), close_time=time(22, 0))
+        self.date = timezone.localdate() + timedelta(days=2)
+        self.small = Table.objects.create(name="Малый", capacity=2, is_active=True)
+        self.big = Table.objects.create(name="Большой", capacity=6, is_active=True)
+        self.hidden = Table.objects.create(name="Старый", capacity=4, is_active=False)
+
+    def _csv(self, *lines):
+        """Собирает CSV с заголовком из строк данных."""
+        header = 'table,date,start_time,duration_minutes,seats,customer_name,customer_email,status'
+        return '\n'.join((header,) + lines) + '\n'
+
+    def test_valid_rows_are_inserted_and_errors_reported_per_line(self):
+        """Проверяет сценарий: valid rows are inserted and errors reported per line."""
+        day = self.date.isoformat()
+        Reservation.objects.bulk_create([
+            Reservation(
+                table=self.big, date=self.date, start_time=time(18, 0), end_time=time(20, 0),
+                duration_minutes=120, seats=2, customer_name="Есть", customer_email="a@example.com",
+                status=STATUS_CONFIRMED, public_code="EXISTING01",
+            )
+        ])
+        content = self._csv(
+            f'Малый,{day},12:00,120,2,Анна,anna@example.com,',
+            f'Малый,{day},13:00,60,2,Борис,boris@example.com,',
+            f'Большой,{day},19:00,60,2,Вера,vera@example.com,confirmed',
+            f'Старый,{day},12:00,60,2,Гена,gena@example.com,',
+            f'Малый,{day},21:00,120,2,Даша,dasha@example.com,',
+            f'Малый,{day},15:00,60,5,Егор,egor@example.com,',
+            f'Нет такого,{day},15:00,60,2,Женя,zhenya@example.com,',
+            f'#{self.big.id},{self.date:%d.%m.%Y},12:00,60,4,Зоя,zoya@example.com,Подтверждена',
+            f'Малый,{day},16:00,60,2,Илья,not-an-email,',
+        )
+        report = import_reservations(read_rows(content, 'csv'))
+        self.assertEqual(report['total'], 9)
+        self.assertEqual(report['created'], 2)
+        errors = dict(report['errors'])
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7, 8, 10])
+        self.assertEqual(errors[3], TABLE_BUSY_MESSAGE)
+        self.assertEqual(errors[4], TABLE_BUSY_MESSAGE)
+        self.assertIn('неактивен', errors[5])
+        self.assertIn('рабочего времени', errors[6])
+        self.assertIn('вместимость', errors[7])
+        self.assertIn('не найден', errors[8])
+        self.assertIn('email', errors[10])
+        imported = Reservation.objects.exclude(public_code="EXISTING01").order_by('customer_name')
+        self.assertEqual([reservation.customer_name for reservation in imported], ["Анна", "Зоя"])
+        self.assertEqual(imported[0].end_time, time(14, 0))
+        self.assertEqual(imported[0].status, STATUS_NEW)
+        self.assertEqual(imported[1].status, STATUS_CONFIRMED)
+
+    def test_schedule_and_codes_are_checked(self):
+        """Проверяет сценарий: schedule and codes are checked."""
+        SpecialDay.objects.create(date=self.date, is_open=False)
+        rows = [
+            {'table': 'Малый', 'date': self.date.isoformat(), 'start_time': '12:00', 'end_time': '13:30',
+             'seats': 2, 'customer_name': 'Анна', 'customer_email': 'anna@example.com'},
+            {'table': 'Малый', 'date': (self.date + timedelta(days=1)).isoformat(), 'start_time': '12:00',
+             'end_time': '14:00', 'seats': 2, 'customer_name': 'Борис', 'customer_email': 'b@example.com',
+             'public_code': 'partner-1'},
+            {'table': 'Большой', 'date': (self.date + timedelta(days=1)).isoformat(), 'start_time': '12:00',
+             'duration_minutes': 60, 'seats': 2, 'customer_name': 'Вера', 'customer_email': 'v@example.com',
+             'public_code': 'PARTNER-1'},
+        ]
+        report = import_reservations(read_rows(json.dumps(rows), 'json'))
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([line for line, _ in report['errors']], [1, 3])
+        reservation = Reservation.objects.get()
+        self.assertEqual(reservation.public_code, 'PARTNER-1')
+        self.assertEqual(reservation.duration_minutes, 120)
+
+    def test_durations_and_active_holds_are_checked(self):
+        """Проверяет сценарий: durations and active holds are checked."""
+        now = timezone.now()
+        SlotHold.objects.create(
+            token='active', table=self.small, date=self.date, start_time=time(12, 0), end_time=time(13, 0),
+            expires_at=now + timedelta(minutes=5),
+        )
+        SlotHold.objects.create(
+            token='expired', table=self.big, date=self.date, start_time=time(12, 0), end_time=time(13, 0),
+            expires_at=now - timedelta(minutes=1),
+        )
+        day = self.date.isoformat()
+        content = self._csv(
+            f'Малый,{day},12:00,60,2,Анна,anna@example.com,',
+            f'Малый,{day},15:00,90,2,Борис,boris@example.com,',
+            f'Большой,{day},12:00,60,2,Вера,vera@example.com,',
+        )
+        report = import_reservations(read_rows(content, 'csv'))
+        self.assertEqual(report['created'], 1)
+        errors = dict(report['errors'])
+        self.assertEqual(errors[2], TABLE_BUSY_MESSAGE)
+        self.assertIn('длительность', errors[3])
+        self.assertEqual(Reservation.objects.get().customer_name, "Вера")
+
+    def test_dry_run_saves_nothing(self):
+        """Проверяет сценарий: dry run saves nothing."""
+        content = self._csv(f'Малый,{self.date.isoformat()},12:00,60,2,Анна,anna@example.com,')
+        report = import_reservations(read_rows(content, 'csv'), dry_run=True)
+        self.assertEqual((report['valid'], report['created']), (1, 0))
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_validation_queries_do_not_grow_with_rows(self):
+        """Проверяет сценарий: validation queries do not grow with rows."""
+        def build(count):
+            """Собирает строки без пересечений на count дней."""
+            return self._csv(*[
+                f'{table.name},{self.date + timedelta(days=offset)},{hour}:00,60,2,Гость,g@example.com,'
+                for offset in range(count)
+                for table in (self.small, self.big)
+                for hour in (10, 12, 14)
+            ])
+
+        import_reservations(read_rows(build(1), 'csv'), dry_run=True)
+        with CaptureQueriesContext(connection) as few:
+            report = import_reservations(read_rows(build(1), 'csv'), dry_run=True)
+        self.assertEqual(report['valid'], 6)
+        with CaptureQueriesContext(connection) as many:
+            report = import_reservations(read_rows(build(30), 'csv'), dry_run=True)
+        self.assertEqual(report['valid'], 180)
+        self.assertEqual(len(few), len(many))
+
+    def test_export_file_imports_back(self):
+        """Проверяет сценарий: export file imports back."""
+        content = self._csv(
+            f'Малый,{self.date.isoformat()},12:00,60,2,Анна,anna@example.com,',
+            f'Большой,{self.date.isoformat()},12:00,60,3,Борис,boris@example.com,confirmed',
+        )
+        import_reservations(read_rows(content, 'csv'))
+        exported = ''.join(stream_csv(export_rows({})))
+        Reservation.objects.all().delete()
+        report = import_reservations(read_rows(exported, 'csv'))
+        self.assertEqual((report['created'], report['errors']), (2, []))
+        self.assertEqual(Reservation.objects.get(customer_name="Борис").status, STATUS_CONFIRMED)
+
+    def test_command_and_staff_page(self):
+        """Проверяет сценарий: command and staff page."""
+        content = self._csv(
+            f'Малый,{self.date.isoformat()},12:00,60,2,Анна,anna@example.com,',
+            f'Старый,{self.date.isoformat()},12:00,60,2,Гена,gena@example.com,',
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'legacy.csv')
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(content)
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command('import_reservations', path, stdout=stdout, stderr=stderr)
+        self.assertIn('created: 1', stdout.getvalue())
+        self.assertIn('Line 3:', stderr.getvalue())
+
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+        upload = SimpleUploadedFile(
+            'partner.csv',
+            self._csv(f'Большой,{self.date.isoformat()},15:00,60,2,Вера,vera@example.com,').encode('utf-8'),
+        )
+        response = self.client.post(reverse('staff:reservations_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report']['created'], 1)
+        self.assertEqual(Reservation.objects.count(), 2)
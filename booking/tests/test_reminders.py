@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED
+from booking.models import Reservation, Table
+from booking.reminders import due_reminders, send_reminders
+
+
+class ReminderTests(TestCase):
+    """Тесты рассылки напоминаний о бронях."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.now = timezone.make_aware(datetime.combine(self.date, time(11, 30)))
+
+    def _bulk(self, starts, status=STATUS_CONFIRMED, date=None):
+        """Создает брони напрямую, без валидации расписания, каждую за своим столом."""
+        tables = Table.objects.bulk_create([
+            Table(name=f"B{index}", capacity=4, is_active=True) for index in range(len(starts))
+        ])
+        Reservation.objects.bulk_create([
+            Reservation(
+                table=tables[index],
+                date=date or self.date,
+                start_time=start,
+                duration_minutes=60,
+                end_time=start,
+                seats=2,
+                customer_name="Test",
+                customer_email=f"guest{index}@example.com",
+                status=status,
+                public_code=f"R{index:05d}{start:%H%M}{status[:2]}",
+            )
+            for index, start in enumerate(starts)
+        ])
+
+    def test_only_upcoming_unreminded_reservations_are_sent(self):
+        """Проверяет сценарий: only upcoming unreminded reservations are sent."""
+        self._bulk([time(11, 0), time(12, 0), time(13, 30), time(14, 0)])
+        self._bulk([time(12, 30)], status=STATUS_CANCELLED)
+        stats = send_reminders(120, now=self.now)
+        self.assertEqual(stats, {'sent': 2, 'failed': 0})
+        reminded = Reservation.objects.exclude(reminder_sent_at=None)
+        self.assertEqual(sorted(r.start_time for r in reminded), [time(12, 0), time(13, 30)])
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(send_reminders(120, now=self.now), {'sent': 0, 'failed': 0})
+
+    def test_failed_reminder_is_retried_next_run(self):
+        """Проверяет сценарий: failed reminder is retried next run."""
+        self._bulk([time(12, 0), time(12, 30)])
+        with patch('booking.reminders.dispatch_emails', return_value=[OSError('550'), None]):
+            self.assertEqual(send_reminders(120, now=self.now), {'sent': 1, 'failed': 1})
+        self.assertEqual(Reservation.objects.get(reminder_sent_at=None).start_time, time(12, 0))
+        self.assertEqual(send_reminders(120, now=self.now), {'sent': 1, 'failed': 0})
+
+    def test_window_crosses_midnight(self):
+        """Проверяет сценарий: window crosses midnight."""
+        self._bulk([time(23, 30)])
+        self._bulk([time(0, 30)], date=self.date + timedelta(days=1))
+        now = timezone.make_aware(datetime.combine(self.date, time(23, 0)))
+        self.assertEqual(due_reminders(120, now).count(), 2)
+
+    def test_large_run_uses_constant_number_of_queries_per_batch(self):
+        """Проверяет сценарий: large run uses constant number of queries per batch."""
+        self._bulk([time(12, 0)] * 1200)
+        with CaptureQueriesContext(connection) as queries:
+            stats = send_reminders(120, batch_size=500, now=self.now)
+        self.assertEqual(stats['sent'], 1200)
+        self.assertEqual(len(mail.outbox), 1200)
+        self.assertLess(len(queries), 30)
+        self.assertFalse(Reservation.objects.filter(reminder_sent_at=None).exists())
+
+    def test_command_reports_result(self):
+        """Проверяет сценарий: command reports result."""
+        out = StringIO()
+        call_command('send_reminders', '--lead-minutes', '60', stdout=out)
+        self.assertIn('Reminders sent: 0, failed: 0', out.getvalue())
@@ -0,0 +1,178 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED, STATUS_NEW, STATUS_NO_SHOW
+from booking.models import OccupancyRollup, Reservation, Table
+from booking.rollups import rebuild_rollups, refresh_rollups
+from booking.transitions import close_past_reservations
+from site_settings.models import SiteSettings, WeeklySchedule
+from staff.analytics import build_analytics
+
+
+class OccupancyRollupTests(TestCase):
+    """Тесты почасовых сводок занятости и страницы аналитики."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.min_notice_minutes = 0
+        settings.save()
+        WeeklySchedule.objects.all().delete()
+        for day in range(7):
+            WeeklySchedule.objects.create(day_of_week=day, is_open=True, open_time=time(10, 0), close_time=time(20, 0))
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.first = Table.objects.create(name="A", capacity=4, is_active=True)
+        self.second = Table.objects.create(name="B", capacity=4, is_active=True)
+        self.count = 0
+
+    def _reserve(self, table, start, end, status=STATUS_CONFIRMED, date=None, seats=2):
+        """Создает бронь напрямую, без валидации и сигналов."""
+        self.count += 1
+        return Reservation.objects.bulk_create([
+            Reservation(
+                table=table,
+                date=date or self.date,
+                start_time=start,
+                duration_minutes=60,
+                end_time=end,
+                seats=seats,
+                customer_name="Guest",
+                customer_email="guest@example.com",
+                status=status,
+                public_code=f"RU{self.count:06d}",
+            )
+        ])[0]
+
+    def _rollups(self):
+        """Возвращает сводки как словарь (дата, стол, час) -> (минуты, место-минуты)."""
+        return {
+            (rollup.date, rollup.table_id, rollup.hour): (rollup.booked_minutes, rollup.seat_minutes)
+            for rollup in OccupancyRollup.objects.all()
+        }
+
+    def test_save_and_status_change_refresh_rollups(self):
+        """Проверяет сценарий: save and status change refresh rollups."""
+        reservation = Reservation(
+            table=self.first,
+            date=self.date,
+            start_time=time(10, 30),
+            duration_minutes=120,
+            seats=3,
+            customer_name="Guest",
+            customer_email="guest@example.com",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.save()
+        self.assertEqual(self._rollups(), {
+            (self.date, self.first.id, 10): (30, 90),
+            (self.date, self.first.id, 11): (60, 180),
+            (self.date, self.first.id, 12): (30, 90),
+        })
+        self.assertEqual(OccupancyRollup.objects.get(hour=10).new_count, 1)
+
+        reservation.status = STATUS_CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.save(update_fields=['status'])
+        self.assertEqual(self._rollups(), {(self.date, self.first.id, 10): (0, 0)})
+        self.assertEqual(OccupancyRollup.objects.get().cancelled_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.delete()
+        self.assertFalse(OccupancyRollup.objects.exists())
+
+    def test_overnight_booking_spills_into_next_date(self):
+        """Проверяет сценарий: overnight booking spills into next date."""
+        self._reserve(self.first, time(23, 30), time(1, 0))
+        rebuild_rollups(self.date, self.date + timedelta(days=1))
+        next_day = self.date + timedelta(days=1)
+        self.assertEqual(self._rollups(), {
+            (self.date, self.first.id, 23): (30, 60),
+            (next_day, self.first.id, 0): (60, 120),
+        })
+        rebuild_rollups(next_day, next_day)
+        self.assertEqual(self._rollups()[next_day, self.first.id, 0], (60, 120))
+
+    def test_bulk_status_updates_refresh_rollups(self):
+        """Проверяет сценарий: bulk status updates refresh rollups."""
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self._reserve(self.first, time(12, 0), time(13, 0), status=STATUS_NEW, date=yesterday)
+        rebuild_rollups(yesterday, yesterday)
+        self.assertEqual(OccupancyRollup.objects.get().booked_minutes, 60)
+        now = timezone.make_aware(datetime.combine(timezone.localdate(), time(12, 0)))
+        with self.captureOnCommitCallbacks(execute=True):
+            close_past_reservations(now)
+        rollup = OccupancyRollup.objects.get()
+        self.assertEqual((rollup.booked_minutes, rollup.no_show_count, rollup.new_count), (0, 1, 0))
+
+    def test_refresh_touches_only_affected_pairs(self):
+        """Проверяет сценарий: refresh touches only affected pairs."""
+        later = self.date + timedelta(days=30)
+        self._reserve(self.first, time(10, 0), time(11, 0))
+        self._reserve(self.first, time(23, 30), time(0, 30), date=later)
+        untouched = [
+            OccupancyRollup.objects.create(date=self.date + timedelta(days=10), table=self.first, hour=9, booked_minutes=5),
+            OccupancyRollup.objects.create(date=self.date, table=self.second, hour=9, booked_minutes=5),
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            refresh_rollups({(self.date, self.first.id), (later, self.first.id)})
+        rollups = self._rollups()
+        self.assertEqual(rollups[self.date, self.first.id, 10], (60, 120))
+        self.assertEqual(rollups[later, self.first.id, 23], (30, 60))
+        self.assertEqual(rollups[later + timedelta(days=1), self.first.id, 0], (30, 60))
+        for rollup in untouched:
+            self.assertEqual(rollups[rollup.date, rollup.table_id, rollup.hour], (5, 0))
+        self.assertLessEqual(len(queries), 6)
+
+    def test_command_rebuilds_all_dates(self):
+        """Проверяет сценарий: command rebuilds all dates."""
+        self._reserve(self.first, time(10, 0), time(11, 0))
+        self._reserve(self.second, time(15, 0), time(16, 30), date=self.date + timedelta(days=40))
+        OccupancyRollup.objects.create(date=self.date - timedelta(days=400), table=self.first, hour=9, booked_minutes=5)
+        out = StringIO()
+        call_command('rebuild_rollups', '--chunk-days', '7', stdout=out)
+        self.assertIn('Rollup rows written: 3', out.getvalue())
+        self.assertEqual(sorted(self._rollups().values()), [(30, 60), (60, 120), (60, 120)])
+
+    def test_analytics_reports_utilization_and_rates(self):
+        """Проверяет сценарий: analytics reports utilization and rates."""
+        self._reserve(self.first, time(10, 0), time(15, 0))
+        self._reserve(self.second, time(10, 0), time(11, 0), status=STATUS_NO_SHOW)
+        self._reserve(self.second, time(12, 0), time(13, 0), status=STATUS_CANCELLED)
+        self._reserve(self.second, time(14, 0), time(15, 0))
+        rebuild_rollups(self.date, self.date)
+        report = build_analytics(self.date, self.date)
+        self.assertEqual(report['reservations'], 4)
+        self.assertEqual(report['utilization'], 30.0)
+        self.assertEqual(report['cancellation_rate'], 25.0)
+        self.assertEqual(report['no_show_rate'], 33.3)
+        self.assertEqual([row['utilization'] for row in report['by_table']], [50.0, 10.0])
+        by_hour = {row['label']: row['utilization'] for row in report['by_hour']}
+        self.assertEqual((by_hour['10:00'], by_hour['14:00'], by_hour['19:00']), (50.0, 100.0, 0.0))
+
+    def test_analytics_page_queries_do_not_grow_with_rollups(self):
+        """Проверяет сценарий: analytics page queries do not grow with rollups."""
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+        url = reverse('staff:analytics')
+        params = {'date_from': self.date.isoformat(), 'date_to': (self.date + timedelta(days=59)).isoformat()}
+        self._reserve(self.first, time(10, 0), time(11, 0))
+        rebuild_rollups(self.date, self.date + timedelta(days=59))
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        for offset in range(1, 60):
+            for table in (self.first, self.second):
+                self._reserve(table, time(12, 0), time(18, 0), date=self.date + timedelta(days=offset))
+        rebuild_rollups(self.date, self.date + timedelta(days=59))
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, params)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(len(response.context['by_date']), 60)
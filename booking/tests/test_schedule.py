@@ -0,0 +1,69 @@
+from datetime import time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.schedule import ScheduleIndex
+from booking.utils import get_working_window
+from site_settings.models import SpecialDay, WeeklySchedule
+
+
+class ScheduleIndexTests(TestCase):
+    """Тесты индекса рабочих окон."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        WeeklySchedule.objects.all().delete()
+        for day in range(7):
+            WeeklySchedule.objects.create(
+                day_of_week=day,
+                is_open=day != 0,
+                open_time=time(10, 0),
+                close_time=time(22, 0),
+            )
+        self.start = timezone.localdate()
+        self.special_open = self.start + timedelta(days=3)
+        self.special_closed = self.start + timedelta(days=5)
+        SpecialDay.objects.create(
+            date=self.special_open,
+            is_open=True,
+            open_time=time(12, 0),
+            close_time=time(18, 0),
+        )
+        SpecialDay.objects.create(date=self.special_closed, is_open=False)
+
+    def test_windows_for_range_match_per_date_lookup(self):
+        """Проверяет сценарий: windows for range match per date lookup."""
+        end = self.start + timedelta(days=60)
+        ScheduleIndex.load(self.start, end)
+        with self.assertNumQueries(1):
+            windows = ScheduleIndex.load(self.start, end).windows_for(self.start, end)
+        self.assertEqual(len(windows), 61)
+        self.assertEqual(windows[self.special_open], (time(12, 0), time(18, 0)))
+        self.assertIsNone(windows[self.special_closed])
+        for date, window in windows.items():
+            self.assertEqual(window, get_working_window(date))
+
+    def test_dates_outside_loaded_range_load_the_gap(self):
+        """Проверяет сценарий: dates outside loaded range load the gap."""
+        index = ScheduleIndex.load(self.start, self.start + timedelta(days=2))
+        index.window_for(self.start + timedelta(days=10))
+        with self.assertNumQueries(0):
+            self.assertIsNone(index.window_for(self.special_closed))
+            self.assertEqual(index.window_for(self.special_open), (time(12, 0), time(18, 0)))
+        index = ScheduleIndex.load(self.start + timedelta(days=10))
+        index.window_for(self.start)
+        with self.assertNumQueries(0):
+            self.assertEqual(index.window_for(self.special_open), (time(12, 0), time(18, 0)))
+
+    def test_weekly_change_invalidates_cached_schedule(self):
+        """Проверяет сценарий: weekly change invalidates cached schedule."""
+        date = self.start + timedelta(days=(7 - self.start.weekday()) % 7 + 14)
+        self.assertIsNone(get_working_window(date))
+        WeeklySchedule.objects.filter(day_of_week=0).delete()
+        WeeklySchedule.objects.create(
+            day_of_week=0,
+            is_open=True,
+            open_time=time(9, 0),
+            close_time=time(21, 0),
+        )
+        self.assertEqual(get_working_window(date), (time(9, 0), time(21, 0)))
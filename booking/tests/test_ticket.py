@@ -0,0 +1,156 @@
+import io
+import shutil
+import tempfile
+from datetime import time, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from booking import qr
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED
+from booking.models import Reservation, Table
+from booking.notifications import build_ticket_email
+from booking.tickets import ticket_qr
+from integrations.outbox import KIND_TICKET, enqueue_email
+from site_settings.models import SiteSettings, invalidate_solo
+
+
+class QrEncoderTests(SimpleTestCase):
+    """Тесты кодировщика QR-кода."""
+    def test_error_correction_matches_reference_example(self):
+        """Проверяет сценарий: error correction matches reference example."""
+        data = [32, 91, 11, 120, 209, 114, 220, 77, 67, 64, 236, 17, 236, 17, 236, 17]
+        self.assertEqual(qr._rs_remainder(data, 10), [196, 35, 39, 119, 235, 215, 231, 226, 93, 23])
+
+    def test_picks_smallest_version_and_draws_finders(self):
+        """Проверяет сценарий: picks smallest version and draws finders."""
+        self.assertEqual(len(qr.encode('TICKET0001')), 21)
+        self.assertEqual(len(qr.encode('x' * 15)), 25)
+        modules = qr.encode('https://example.com/booking/ticket/TICKET0001/')
+        size = len(modules)
+        for row, col in ((0, 0), (0, size - 7), (size - 7, 0)):
+            self.assertEqual(modules[row][col:col + 7], [True] * 7)
+            self.assertEqual(modules[row + 1][col:col + 7], [True, False, False, False, False, False, True])
+        with self.assertRaises(ValueError):
+            qr.encode('x' * 300)
+
+    def test_format_copies_agree(self):
+        """Проверяет сценарий: format copies agree."""
+        modules = qr.encode('TICKET0001')
+        size = len(modules)
+        first = [modules[row][8] for row in (0, 1, 2, 3, 4, 5, 7, 8)] + [modules[8][col] for col in (7, 5, 4, 3, 2, 1, 0)]
+        second = [modules[8][size - 1 - index] for index in range(8)] + [modules[size - 7 + index][8] for index in range(7)]
+        self.assertEqual(first, second)
+        self.assertTrue(modules[size - 8][8])
+
+    def test_renders_png_and_svg(self):
+        """Проверяет сценарий: renders png and svg."""
+        modules = qr.encode('TICKET0001')
+        with Image.open(io.BytesIO(qr.render_png(modules, scale=4))) as image:
+            self.assertEqual(image.size, ((21 + 8) * 4, (21 + 8) * 4))
+        self.assertIn('viewBox="0 0 29 29"', qr.render_svg(modules))
+
+
+class TicketPageTests(TestCase):
+    """Тесты условных запросов и кеша публичного билета."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        # Откат транзакции теста не сбрасывает кеш настроек процесса.
+        self.addCleanup(invalidate_solo)
+        table = Table.objects.create(name="Окно", capacity=4, is_active=True)
+        Reservation.objects.bulk_create([
+            Reservation(
+                table=table, date=timezone.localdate() + timedelta(days=1), start_time=time(18, 0),
+                end_time=time(20, 0), duration_minutes=120, seats=2, customer_name="Анна",
+                customer_email="anna@example.com", status=STATUS_CONFIRMED, public_code="TICKET0001",
+            )
+        ])
+        self.url = reverse('booking:ticket', kwargs={'public_code': "TICKET0001"})
+
+    def test_sets_validators_and_returns_not_modified(self):
+        """Проверяет сценарий: sets validators and returns not modified."""
+        response = self.client.get(self.url)
+        self.assertContains(response, "Окно")
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        repeat = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.content, b'')
+        self.assertFalse(repeat.templates)
+        since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+    def test_changes_invalidate_etag(self):
+        """Проверяет сценарий: changes invalidate etag."""
+        etag = self.client.get(self.url)['ETag']
+        Reservation.objects.filter(public_code="TICKET0001").update(
+            status=STATUS_CANCELLED, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        settings = SiteSettings.get_solo()
+        settings.site_name = "Другое название"
+        settings.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=changed['ETag'])
+        self.assertContains(response, "Другое название")
+
+    def test_repeat_open_served_from_render_cache(self):
+        """Проверяет сценарий: repeat open served from render cache."""
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertFalse(second.templates)
+        self.assertEqual(second.content, first.content)
+
+    def test_unknown_code_returns_404(self):
+        """Проверяет сценарий: unknown code returns 404."""
+        response = self.client.get(reverse('booking:ticket', kwargs={'public_code': "MISSING"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_embeds_stored_qr(self):
+        """Проверяет сценарий: page embeds stored qr."""
+        urls = ticket_qr("TICKET0001")
+        self.assertContains(self.client.get(self.url), urls['svg'])
+        names = cache.get('booking:qr:TICKET0001')
+        self.assertTrue(all(default_storage.exists(name) for name in names.values()))
+        self.assertTrue(names['png'].startswith('qr/') and names['png'].endswith('.png'))
+        self.assertEqual(ticket_qr("TICKET0001"), urls)
+
+    def test_downloads_ticket_image(self):
+        """Проверяет сценарий: downloads ticket image."""
+        url = reverse('booking:ticket_image', kwargs={'public_code': "TICKET0001"})
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('ticket-TICKET0001.png', response['Content-Disposition'])
+        with Image.open(io.BytesIO(response.content)) as image:
+            self.assertEqual(image.format, 'PNG')
+        repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertNotEqual(response['ETag'], self.client.get(self.url)['ETag'])
+
+    def test_email_embeds_qr_and_image_link(self):
+        """Проверяет сценарий: email embeds qr and image link."""
+        reservation = Reservation.objects.select_related('table').get(public_code="TICKET0001")
+        with patch('booking.tickets._store') as store:
+            email = build_ticket_email(reservation, 'http://testserver/booking/ticket/TICKET0001/')
+            message = enqueue_email(email, KIND_TICKET, reservation)
+        store.assert_not_called()
+        self.assertIn('http://testserver/booking/ticket/TICKET0001/image/', email.body)
+        html, mimetype = message.payload['alternatives'][0]
+        self.assertEqual(mimetype, 'text/html')
+        qr_url = reverse('booking:ticket_qr', kwargs={'public_code': "TICKET0001"})
+        self.assertIn('http://testserver' + qr_url, html)
+        response = self.client.get(qr_url)
+        self.assertRedirects(response, ticket_qr("TICKET0001")['png'], fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('booking:ticket_qr', kwargs={'public_code': "MISSING"})).status_code, 404)
@@ -0,0 +1,90 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.constants import (
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_CONFIRMED,
+    STATUS_NEW,
+    STATUS_NO_SHOW,
+)
+from booking.models import Reservation, Table
+from booking.transitions import close_past_reservations
+from integrations.models import OutboxMessage
+from site_settings.models import SiteSettings, invalidate_solo
+
+
+class PastReservationTransitionTests(TestCase):
+    """Тесты массового закрытия прошедших броней."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.tg_enabled = True
+        settings.save()
+        # Откат транзакции теста не сбрасывает кеш настроек процесса.
+        self.addCleanup(invalidate_solo)
+        self.today = timezone.localdate()
+        self.now = timezone.make_aware(datetime.combine(self.today, time(15, 0)))
+        self.count = 0
+
+    def _reservation(self, day_offset, start, end, status):
+        """Создает бронь за отдельным столом напрямую, без валидации."""
+        self.count += 1
+        table = Table.objects.create(name=f"T{self.count}", capacity=4, is_active=True)
+        return Reservation.objects.bulk_create([
+            Reservation(
+                table=table,
+                date=self.today + timedelta(days=day_offset),
+                start_time=start,
+                duration_minutes=60,
+                end_time=end,
+                seats=2,
+                customer_name="Test",
+                customer_email="test@example.com",
+                status=status,
+                public_code=f"CODE{self.count:04d}",
+            )
+        ])[0]
+
+    def _status(self, reservation):
+        """Возвращает текущий статус брони из базы."""
+        return Reservation.objects.values_list('status', flat=True).get(id=reservation.id)
+
+    def test_past_reservations_are_closed_in_bulk(self):
+        """Проверяет сценарий: past reservations are closed in bulk."""
+        confirmed_past = self._reservation(-3, time(12, 0), time(13, 0), STATUS_CONFIRMED)
+        new_past = self._reservation(-1, time(12, 0), time(13, 0), STATUS_NEW)
+        ended_today = self._reservation(0, time(13, 0), time(14, 0), STATUS_CONFIRMED)
+        ongoing = self._reservation(0, time(14, 30), time(15, 30), STATUS_CONFIRMED)
+        future = self._reservation(1, time(12, 0), time(13, 0), STATUS_NEW)
+        cancelled = self._reservation(-2, time(12, 0), time(13, 0), STATUS_CANCELLED)
+        overnight = self._reservation(-1, time(23, 30), time(0, 30), STATUS_CONFIRMED)
+
+        with patch.object(Reservation, 'full_clean') as full_clean:
+            counts = close_past_reservations(self.now)
+        full_clean.assert_not_called()
+
+        self.assertEqual(counts, {STATUS_COMPLETED: 3, STATUS_NO_SHOW: 1})
+        self.assertEqual(self._status(confirmed_past), STATUS_COMPLETED)
+        self.assertEqual(self._status(new_past), STATUS_NO_SHOW)
+        self.assertEqual(self._status(ended_today), STATUS_COMPLETED)
+        self.assertEqual(self._status(ongoing), STATUS_CONFIRMED)
+        self.assertEqual(self._status(future), STATUS_NEW)
+        self.assertEqual(self._status(cancelled), STATUS_CANCELLED)
+        self.assertEqual(self._status(overnight), STATUS_COMPLETED)
+
+        message = OutboxMessage.objects.get()
+        self.assertIn('завершено 3, не пришли 1', message.payload['text'])
+
+    def test_nothing_to_close_sends_no_notification(self):
+        """Проверяет сценарий: nothing to close sends no notification."""
+        self._reservation(1, time(12, 0), time(13, 0), STATUS_NEW)
+        out = StringIO()
+        call_command('close_past_reservations', stdout=out)
+        self.assertIn('Completed: 0, no-show: 0', out.getvalue())
+        self.assertFalse(OutboxMessage.objects.exists())
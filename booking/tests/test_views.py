@@ -1,13 +1,20 @@
 from datetime import time, timedelta
 from unittest.mock import patch
 
-from django.contrib.messages import constants as message_constants
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from booking.models import Reservation, Table
+from integrations.models import STATUS_PENDING, OutboxMessage
+from integrations.outbox import KIND_TICKET, process_batch
 from site_settings.models import SiteSettings, WeeklySchedule
 
+LOCMEM_SEND = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+
 
 class BookingViewsTests(TestCase):
     """Тесты публичных представлений бронирования."""
@@ -69,12 +76,46 @@ class BookingViewsTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertTrue(Reservation.objects.exists())
         reservation = Reservation.objects.first()
+        self.assertIsNone(reservation.email_sent_at)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.filter(reservation=reservation, kind=KIND_TICKET).count(), 1)
+
+        process_batch()
+        reservation.refresh_from_db()
         self.assertIsNotNone(reservation.email_sent_at)
+        self.assertEqual(mail.outbox[0].to, ['test@example.com'])
+
+    def test_booking_create_email_failure_is_retried_later(self):
+        """Проверяет сценарий: booking create email failure is retried later."""
+        response = self.client.post(
+            '/booking/new/',
+            {
+                'table': self.table.id,
+                'date': self.date.isoformat(),
+                'start_time': '12:00',
+                'duration_minutes': 60,
+                'seats': 2,
+                'customer_name': 'Test',
+                'customer_email': 'test@example.com',
+                'comment': '',
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        with patch(LOCMEM_SEND, side_effect=OSError('SMTP down')), \
+                self.assertLogs('integrations.outbox', 'WARNING'):
+            self.assertEqual(process_batch()['retried'], 1)
+        reservation = Reservation.objects.first()
+        self.assertIsNone(reservation.email_sent_at)
+        message = OutboxMessage.objects.get(reservation=reservation)
+        self.assertEqual(message.status, STATUS_PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now())
 
-    def test_booking_create_email_failure_warns_and_skips_sent_at(self):
-        """Проверяет сценарий: booking create email failure warns and skips sent at."""
-        with patch('booking.views.send_email_ticket', return_value=False):
-            response = self.client.post(
+    def test_booking_create_reads_settings_once(self):
+        """Проверяет сценарий: booking create reads settings once."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
                 '/booking/new/',
                 {
                     'table': self.table.id,
@@ -86,9 +127,16 @@ class BookingViewsTests(TestCase):
                     'customer_email': 'test@example.com',
                     'comment': '',
                 },
-                follow=True,
             )
-        reservation = Reservation.objects.first()
-        self.assertIsNone(reservation.email_sent_at)
-        messages = list(response.context['messages'])
-        self.assertTrue(any(msg.level == message_constants.WARNING for msg in messages))
+        settings_queries = [q for q in queries if 'site_settings_sitesettings' in q['sql']]
+        self.assertEqual(len(settings_queries), 1)
+        self.assertTrue(Reservation.objects.exists())
+
+    def test_settings_save_is_visible_immediately(self):
+        """Проверяет сценарий: settings save is visible immediately."""
+        settings = SiteSettings.get_solo()
+        settings.site_name = 'Новое имя'
+        settings.save()
+        self.assertEqual(SiteSettings.get_solo().site_name, 'Новое имя')
+        response = self.client.get('/booking/')
+        self.assertContains(response, 'Новое имя')
@@ -0,0 +1,108 @@
+"""Версия билета, QR-код в медиахранилище и картинка билета для показа без интернета."""
+import hashlib
+import io
+
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageDraw, ImageFont
+
+from site_settings.models import SiteSettings
+
+from . import qr
+
+QR_DIRECTORY = 'qr'
+QR_SCALE = 8
+TICKET_CACHE_TIMEOUT = 60 * 60
+TICKET_IMAGE_WIDTH = 640
+TICKET_IMAGE_PADDING = 32
+FONT_CANDIDATES = ('DejaVuSans.ttf', 'Arial.ttf')
+
+
+def ticket_version(reservation) -> tuple:
+    """Возвращает (версия, время изменения) билета по изменениям брони и настроек сайта."""
+    settings_updated_at = SiteSettings.get_solo().updated_at
+    raw = f'{reservation.public_code}:{reservation.updated_at.isoformat()}:{settings_updated_at.isoformat()}'
+    return hashlib.md5(raw.encode('utf-8')).hexdigest(), max(reservation.updated_at, settings_updated_at)
+
+
+def _store(content, extension) -> str:
+    """Сохраняет файл под именем из хеша содержимого, если такого еще нет."""
+    name = f'{QR_DIRECTORY}/{hashlib.sha256(content).hexdigest()[:16]}.{extension}'
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+    return name
+
+
+def ticket_qr(public_code) -> dict:
+    """Возвращает адреса PNG и SVG с QR-кодом билета, создавая файлы один раз.
+
+    Имена файлов — хеш содержимого, поэтому одинаковые коды не дублируются,
+    а адреса можно кешировать навсегда. Готовые имена хранятся в кеше, и
+    повторное открытие не кодирует QR и не обращается к хранилищу.
+    """
+    key = f'booking:qr:{public_code}'
+    names = cache.get(key)
+    if names is None:
+        modules = qr.encode(public_code)
+        names = {
+            'png': _store(qr.render_png(modules, QR_SCALE), 'png'),
+            'svg': _store(qr.render_svg(modules).encode('utf-8'), 'svg'),
+        }
+        cache.set(key, names, None)
+    return {image_format: default_storage.url(name) for image_format, name in names.items()}
+
+
+def _font(size):
+    """Возвращает шрифт с кириллицей из настроек, системы или встроенный в Pillow."""
+    path = getattr(django_settings, 'TICKET_FONT_PATH', '')
+    for candidate in ((path,) if path else ()) + FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def render_ticket_image(reservation) -> bytes:
+    """Рисует билет одной PNG-картинкой: название, QR-код и данные брони."""
+    settings = SiteSettings.get_solo()
+    code = qr.render_image(qr.encode(reservation.public_code), QR_SCALE).convert('RGB')
+    title_font, text_font = _font(32), _font(24)
+    lines = [
+        f'Билет №{reservation.public_code}',
+        f'Дата: {reservation.date:%d.%m.%Y}',
+        f'Время: {reservation.start_time:%H:%M}',
+        f'Длительность: {reservation.duration_minutes} мин.',
+        f'Стол: {reservation.table.name}',
+        f'Мест: {reservation.seats}',
+        f'Имя: {reservation.customer_name}',
+    ]
+    if settings.address:
+        lines.append(f'Адрес: {settings.address}')
+    line_height = 36
+    height = TICKET_IMAGE_PADDING * 3 + 48 + code.height + line_height * len(lines)
+    image = Image.new('RGB', (TICKET_IMAGE_WIDTH, height), 'white')
+    draw = ImageDraw.Draw(image)
+    top = TICKET_IMAGE_PADDING
+    draw.text((TICKET_IMAGE_PADDING, top), settings.site_name, fill='black', font=title_font)
+    top += 48 + TICKET_IMAGE_PADDING // 2
+    image.paste(code, ((TICKET_IMAGE_WIDTH - code.width) // 2, top))
+    top += code.height + TICKET_IMAGE_PADDING // 2
+    for line in lines:
+        draw.text((TICKET_IMAGE_PADDING, top), line, fill='black', font=text_font)
+        top += line_height
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def ticket_image(reservation, version) -> bytes:
+    """Возвращает PNG билета из кеша по коду и версии или рисует и сохраняет его."""
+    key = f'booking:ticket_image:{reservation.public_code}:{version}'
+    content = cache.get(key)
+    if content is None:
+        content = render_ticket_image(reservation)
+        cache.set(key, content, TICKET_CACHE_TIMEOUT)
+    return content
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from integrations.outbox import enqueue_telegram
+
+from .constants import STATUS_COMPLETED, STATUS_CONFIRMED, STATUS_NEW, STATUS_NO_SHOW
+from .models import Reservation
+from .rollups import schedule_refresh
+
+# Куда переводится прошедшая бронь: подтвержденная считается состоявшейся,
+# а так и не подтвержденная — неявкой.
+PAST_TRANSITIONS = [
+    (STATUS_CONFIRMED, STATUS_COMPLETED),
+    (STATUS_NEW, STATUS_NO_SHOW),
+]
+
+
+def _ended_before(now) -> Q:
+    """Возвращает условие на брони, закончившиеся к локальному моменту now.
+
+    Бронь, у которой окончание не позже начала, заканчивается на следующий день.
+    """
+    today = now.date()
+    yesterday = today - timedelta(days=1)
+    same_day = Q(end_time__gt=F('start_time'))
+    return (
+        Q(date__lt=yesterday)
+        | Q(date=yesterday) & (same_day | Q(end_time__lte=now.time()))
+        | Q(date=today) & same_day & Q(end_time__lte=now.time())
+    )
+
+
+def close_past_reservations(now=None) -> dict:
+    """Переводит прошедшие брони в итоговые статусы набором UPDATE без загрузки объектов.
+
+    Возвращает количество переведенных броней по новому статусу и ставит
+    в очередь одно сводное уведомление в Telegram, если что-то изменилось.
+    """
+    local_now = timezone.localtime(now)
+    ended = _ended_before(local_now.replace(tzinfo=None))
+    counts = {}
+    with transaction.atomic():
+        # UPDATE не шлет post_save, поэтому затронутые сводки собираются заранее.
+        affected = set(
+            Reservation.objects.filter(ended, status__in=[status for status, _ in PAST_TRANSITIONS])
+            .values_list('date', 'table_id')
+            .distinct()
+        )
+        for old_status, new_status in PAST_TRANSITIONS:
+            counts[new_status] = Reservation.objects.filter(ended, status=old_status).update(
+                status=new_status,
+                updated_at=timezone.now(),
+            )
+        if any(counts.values()):
+            schedule_refresh(affected)
+            enqueue_telegram(
+                f'Статусы прошедших броней обновлены: '
+                f'завершено {counts[STATUS_COMPLETED]}, не пришли {counts[STATUS_NO_SHOW]}'
+            )
+    return counts
@@ -9,4 +9,9 @@ urlpatterns = [
     path('new/', views.booking_create, name='create'),
     path('success/', views.booking_success, name='success'),
     path('ticket/<str:public_code>/', views.booking_ticket, name='ticket'),
+    path('ticket/<str:public_code>/image/', views.booking_ticket_image, name='ticket_image'),
+    path('ticket/<str:public_code>/qr.png', views.booking_ticket_qr, name='ticket_qr'),
+    path('api/calendar/', views.calendar_api, name='api_calendar'),
+    path('api/tables/', views.tables_api, name='api_tables'),
+    path('api/times/', views.times_api, name='api_times'),
 ]
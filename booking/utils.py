@@ -2,25 +2,12 @@ from datetime import datetime, timedelta
 
 from django.utils import timezone
 
-from site_settings.models import SpecialDay, WeeklySchedule
+from .schedule import ScheduleIndex
 
 
 def get_working_window(date):
     """Возвращает рабочее окно на дату с учетом исключений."""
-    special = SpecialDay.objects.filter(date=date).first()
-    if special:
-        if not special.is_open:
-            return None
-        if special.open_time is None or special.close_time is None:
-            return None
-        return special.open_time, special.close_time
-
-    weekly = WeeklySchedule.objects.filter(day_of_week=date.weekday()).first()
-    if not weekly or not weekly.is_open:
-        return None
-    if weekly.open_time is None or weekly.close_time is None:
-        return None
-    return weekly.open_time, weekly.close_time
+    return ScheduleIndex.load(date).window_for(date)
 
 
 def compute_end_time(start_time, duration_minutes):
@@ -1,23 +1,109 @@
+import hashlib
+import secrets
 from datetime import datetime
+from urllib.parse import urlencode
 
 from django.contrib import messages
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 
-from integrations.telegram import send_telegram_message
+from integrations.outbox import KIND_TICKET, enqueue_email, enqueue_telegram
+from site_settings.page_cache import PERSONAL_COOKIES
 
-from .forms import BookingAvailabilityForm, ReservationForm
-from .models import Reservation
-from .notifications import send_email_ticket
+from .cache import availability_fingerprint
+from .forms import BookingAvailabilityForm, CalendarQueryForm, ReservationForm
+from .models import Reservation, SlotHold, Table
+from .notifications import build_ticket_email
 from .services import (
     find_available_start_times_for_table,
+    find_calendar_availability,
     find_available_tables_for_date,
+    hold_slot,
+    own_hold_token,
+    save_reservation,
 )
+from .tickets import TICKET_CACHE_TIMEOUT, ticket_image, ticket_qr, ticket_version
+from .utils import compute_end_time
+
+HOLD_COOKIE = 'slot_hold'
+HOLD_COOKIE_SALT = 'booking.slot_hold'
+# Cookie с токеном клиента живет дольше удержания: токен переиспользуется для следующих выборов.
+HOLD_COOKIE_MAX_AGE = 24 * 60 * 60
+
+
+def _hold_token(request):
+    """Возвращает токен удержания слота из подписанной cookie клиента."""
+    return request.get_signed_cookie(HOLD_COOKIE, default=None, salt=HOLD_COOKIE_SALT)
+
+
+def _set_hold_cookie(response, token) -> None:
+    """Выдает клиенту подписанную cookie с токеном удержания."""
+    response.set_signed_cookie(
+        HOLD_COOKIE,
+        token,
+        salt=HOLD_COOKIE_SALT,
+        max_age=HOLD_COOKIE_MAX_AGE,
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+def _index_url(params) -> str:
+    """Возвращает адрес страницы бронирования с параметрами выбора."""
+    return f"{reverse('booking:index')}?{urlencode({key: value for key, value in params.items() if value})}"
+
+
+def _select_slot(request):
+    """Закрепляет выбранный слот за клиентом и возвращает на страницу бронирования.
+
+    Удержание создается только POST-запросом с CSRF-токеном, то есть клиентом,
+    который открыл страницу и вернул ее cookie: ссылки, которые обходят
+    роботы и предзагрузка браузера, слоты не занимают. Cookie с токеном
+    удержания выдается здесь же, а не при просмотре страницы, чтобы кеш
+    доступности оставался общим для посетителей без удержаний.
+    """
+    params = {name: request.POST.get(name, '') for name in ('date', 'duration_minutes', 'seats', 'table')}
+    form = BookingAvailabilityForm(request.POST)
+    token = _hold_token(request) or secrets.token_hex(16)
+    if not form.is_valid():
+        return redirect(_index_url(params))
+    date = form.cleaned_data['date']
+    duration = form.cleaned_data['duration_minutes']
+    seats = form.cleaned_data['seats']
+    try:
+        start_time = datetime.strptime(request.POST.get('start_time', ''), '%H:%M').time()
+        table = Table.objects.filter(id=int(params['table']), is_active=True).first()
+    except ValueError:
+        return redirect(_index_url(params))
+    hold = None
+    if table is not None and start_time in find_available_start_times_for_table(
+        date, duration, seats, table, hold_token=token
+    ):
+        hold = hold_slot(table, date, start_time, duration, token)
+    if hold is None:
+        messages.error(request, 'Это время уже занято, выберите другое.')
+        return redirect(_index_url(params))
+    response = redirect(_index_url({**params, 'start_time': start_time.strftime('%H:%M')}))
+    _set_hold_cookie(response, token)
+    return response
 
 
 def booking_index(request):
-    """Показывает страницу выбора даты и доступности столов."""
+    """Показывает страницу выбора даты и доступности столов.
+
+    GET только читает: форма брони показывается, если выбранный слот уже
+    удерживается за клиентом. Выбор времени отправляется POST-запросом.
+    """
+    if request.method == 'POST':
+        return _select_slot(request)
     availability_form = BookingAvailabilityForm(request.GET or None)
     reservation_form = None
     available_times = []
@@ -25,12 +111,14 @@ def booking_index(request):
     selected_time = None
     selected_table = None
     selected_table_obj = None
+    hold_token = _hold_token(request)
+    hold = None
 
     if availability_form.is_valid():
         date = availability_form.cleaned_data['date']
         duration = availability_form.cleaned_data['duration_minutes']
         seats = availability_form.cleaned_data['seats']
-        available_tables = find_available_tables_for_date(date, duration, seats)
+        available_tables = find_available_tables_for_date(date, duration, seats, hold_token=hold_token)
         selected_time_raw = request.GET.get('start_time')
         if selected_time_raw:
             try:
@@ -52,10 +140,19 @@ def booking_index(request):
                 duration,
                 seats,
                 selected_table_obj,
+                hold_token=hold_token,
             )
-        if selected_table_obj and selected_time:
-            if selected_time not in available_times:
-                selected_time = None
+        if selected_table_obj and selected_time and hold_token:
+            hold = SlotHold.objects.filter(
+                token=hold_token,
+                table=selected_table_obj,
+                date=date,
+                start_time=selected_time,
+                end_time=compute_end_time(selected_time, duration),
+                expires_at__gt=timezone.now(),
+            ).first()
+        if hold is None:
+            selected_time = None
         if selected_table_obj and selected_time:
             reservation_form = ReservationForm(
                 initial={
@@ -64,6 +161,7 @@ def booking_index(request):
                     'seats': seats,
                     'start_time': selected_time,
                     'table': selected_table,
+                    'hold_token': hold.token,
                 },
                 date=date,
                 start_time=selected_time,
@@ -103,36 +201,44 @@ def booking_index(request):
         'selected_table': selected_table,
         'selected_table_obj': selected_table_obj,
         'availability_data': availability_data,
+        'hold': hold,
     }
     return render(request, 'booking/index.html', context)
 
 
 def booking_create(request):
-    """Создает бронирование по форме и отправляет уведомления."""
+    """Создает бронирование по форме и ставит уведомления в очередь."""
     if request.method != 'POST':
         return redirect('booking:index')
 
     form = ReservationForm(request.POST)
+    reservation = None
+    hold_token = _hold_token(request)
     if form.is_valid():
-        reservation = form.save()
-        ticket_url = request.build_absolute_uri(
-            reverse('booking:ticket', kwargs={'public_code': reservation.public_code})
-        )
-        email_sent = send_email_ticket(reservation, ticket_url)
-        if email_sent:
-            reservation.email_sent_at = timezone.now()
-            reservation.save(update_fields=['email_sent_at'])
-        else:
-            messages.warning(request, 'Письмо не отправлено. Проверьте настройки e-mail.')
-
-        start_time = reservation.start_time.strftime('%H:%M')
-        send_telegram_message(
-            f'Новая бронь: {reservation.date} {start_time}, '
-            f'{reservation.duration_minutes} мин., {reservation.table.name}, '
-            f'мест: {reservation.seats}, {reservation.customer_name}, '
-            f'email: {reservation.customer_email}, код: {reservation.public_code}'
-        )
-        return redirect('booking:success')
+        hold_token = form.cleaned_data['hold_token'] or hold_token
+        try:
+            # Бронь и уведомления о ней попадают в базу вместе; отправляет их обработчик очереди.
+            with transaction.atomic():
+                reservation = save_reservation(form.save(commit=False), hold_token=hold_token)
+                ticket_url = request.build_absolute_uri(
+                    reverse('booking:ticket', kwargs={'public_code': reservation.public_code})
+                )
+                enqueue_email(build_ticket_email(reservation, ticket_url), KIND_TICKET, reservation)
+                start_time = reservation.start_time.strftime('%H:%M')
+                enqueue_telegram(
+                    f'Новая бронь: {reservation.date} {start_time}, '
+                    f'{reservation.duration_minutes} мин., {reservation.table.name}, '
+                    f'мест: {reservation.seats}, {reservation.customer_name}, '
+                    f'email: {reservation.customer_email}, код: {reservation.public_code}',
+                    reservation=reservation,
+                )
+        except ValidationError as exc:
+            reservation = None
+            form.add_error(None, exc)
+    if reservation is not None:
+        response = redirect('booking:success')
+        response.delete_cookie(HOLD_COOKIE, samesite='Lax')
+        return response
 
     messages.error(request, 'Проверьте форму бронирования.')
     availability_form = BookingAvailabilityForm(request.POST or None)
@@ -147,7 +253,7 @@ def booking_create(request):
         date = availability_data['date']
         duration = availability_data['duration_minutes']
         seats = availability_data['seats']
-        available_tables = find_available_tables_for_date(date, duration, seats)
+        available_tables = find_available_tables_for_date(date, duration, seats, hold_token=hold_token)
         selected_table = request.POST.get('table')
         try:
             selected_table = int(selected_table) if selected_table else None
@@ -157,7 +263,9 @@ def booking_create(request):
             selected_table_obj = next((t for t in available_tables if t.id == selected_table), None)
             selected_table = selected_table_obj.id if selected_table_obj else None
         if selected_table_obj:
-            available_times = find_available_start_times_for_table(date, duration, seats, selected_table_obj)
+            available_times = find_available_start_times_for_table(
+                date, duration, seats, selected_table_obj, hold_token=hold_token
+            )
         selected_time = request.POST.get('start_time')
         if selected_time:
             try:
@@ -185,7 +293,187 @@ def booking_success(request):
     return render(request, 'booking/success.html')
 
 
+def _ticket_response(request, public_code, variant, build):
+    """Отдает представление билета с ETag и Last-Modified по версии билета.
+
+    Версия складывается из времени изменения брони и настроек сайта, поэтому
+    повторное открытие неизмененного билета получает 304 без вызова build.
+    """
+    reservation = get_object_or_404(Reservation.objects.select_related('table'), public_code=public_code)
+    version, modified = ticket_version(reservation)
+    etag = quote_etag(f'{variant}-{version}')
+    last_modified = int(modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build(reservation, version)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 def booking_ticket(request, public_code):
-    """Показывает публичный билет по коду."""
+    """Показывает публичный билет по коду с QR-кодом.
+
+    Посетителям без сессии страница отдается из кеша готового HTML по коду
+    и версии билета.
+    """
+    def build(reservation, version):
+        """Отдает HTML билета из кеша или рендерит его."""
+        # С сессией в странице могут оказаться флеш-сообщения, такой HTML не кешируется.
+        anonymous = not any(name in request.COOKIES for name in PERSONAL_COOKIES)
+        key = f'booking:ticket:{reservation.public_code}:{version}'
+        content = cache.get(key) if anonymous else None
+        if content is not None:
+            return HttpResponse(content)
+        response = render(request, 'booking/ticket.html', {
+            'reservation': reservation,
+            'qr': ticket_qr(reservation.public_code),
+        })
+        if anonymous:
+            cache.set(key, response.content, TICKET_CACHE_TIMEOUT)
+        return response
+
+    response = _ticket_response(request, public_code, 'page', build)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def booking_ticket_image(request, public_code):
+    """Отдает билет одной PNG-картинкой для показа без интернета."""
+    def build(reservation, version):
+        """Отдает PNG билета из кеша по версии."""
+        response = HttpResponse(ticket_image(reservation, version), content_type='image/png')
+        response['Content-Disposition'] = f'attachment; filename="ticket-{reservation.public_code}.png"'
+        return response
+
+    return _ticket_response(request, public_code, 'image', build)
+
+
+def booking_ticket_qr(request, public_code):
+    """Перенаправляет на PNG с QR-кодом билета, создавая файл при первом обращении.
+
+    Письмо с билетом ссылается сюда, поэтому запрос бронирования только
+    ставит письмо в очередь и не пишет файлы в медиахранилище.
+    """
     reservation = get_object_or_404(Reservation, public_code=public_code)
-    return render(request, 'booking/ticket.html', {'reservation': reservation})
+    return redirect(ticket_qr(reservation.public_code)['png'])
+
+
+def calendar_api(request):
+    """Возвращает JSON-календарь доступности на диапазон дат (до 90 дней)."""
+    form = CalendarQueryForm({
+        'date_from': request.GET.get('from', ''),
+        'date_to': request.GET.get('to', ''),
+        'duration_minutes': request.GET.get('duration', ''),
+        'seats': request.GET.get('seats', ''),
+    })
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+
+    data = form.cleaned_data
+    days = find_calendar_availability(
+        data['date_from'],
+        data['date_to'],
+        data['duration_minutes'],
+        data['seats'],
+    )
+    return JsonResponse({
+        'from': data['date_from'].isoformat(),
+        'to': data['date_to'].isoformat(),
+        'duration': data['duration_minutes'],
+        'seats': data['seats'],
+        'days': [
+            {
+                'date': day['date'].isoformat(),
+                'is_open': day['is_open'],
+                'free_start_times': day['free_start_times'],
+                'earliest': day['earliest'].strftime('%H:%M') if day['earliest'] else None,
+            }
+            for day in days
+        ],
+    })
+
+
+def _availability_etag(date, *params) -> str:
+    """Строит ETag по изменениям броней и действующим удержаниям на дату и версиям доступности."""
+    changes = Reservation.objects.filter(date=date).aggregate(count=Count('id'), last=Max('updated_at'))
+    last = changes['last'].isoformat() if changes['last'] else ''
+    # Истечение удержания ничего не пишет в базу, поэтому учитываем набор действующих удержаний.
+    holds = SlotHold.objects.filter(date=date, expires_at__gt=timezone.now()).aggregate(
+        count=Count('id'), first=Min('expires_at')
+    )
+    first = holds['first'].isoformat() if holds['first'] else ''
+    raw = ':'.join(
+        str(part)
+        for part in (
+            date.isoformat(), *params, changes['count'], last, holds['count'], first,
+            availability_fingerprint(date),
+        )
+    )
+    return quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+
+def _conditional_json(request, etag, build_payload):
+    """Отдает 304 при совпадении ETag, иначе JSON из build_payload с ETag."""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(build_payload())
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def tables_api(request):
+    """Возвращает JSON со столами, у которых есть свободное время на дату."""
+    form = BookingAvailabilityForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+    date = form.cleaned_data['date']
+    duration = form.cleaned_data['duration_minutes']
+    seats = form.cleaned_data['seats']
+    hold_token = _hold_token(request)
+
+    def build_payload():
+        """Собирает список свободных столов."""
+        tables = find_available_tables_for_date(date, duration, seats, hold_token=hold_token)
+        return {
+            'date': date.isoformat(),
+            'tables': [
+                {'id': table.id, 'name': table.name, 'capacity': table.capacity}
+                for table in tables
+            ],
+        }
+
+    etag = _availability_etag(date, 'tables', duration, seats, own_hold_token(date, hold_token))
+    return _conditional_json(request, etag, build_payload)
+
+
+def times_api(request):
+    """Возвращает JSON со свободными временами начала для выбранного стола."""
+    form = BookingAvailabilityForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+    date = form.cleaned_data['date']
+    duration = form.cleaned_data['duration_minutes']
+    seats = form.cleaned_data['seats']
+    try:
+        table_id = int(request.GET.get('table', ''))
+    except ValueError:
+        return JsonResponse({'errors': {'table': [{'message': 'Выберите стол.'}]}}, status=400)
+    hold_token = _hold_token(request)
+
+    def build_payload():
+        """Собирает свободные времена стола."""
+        table = Table.objects.filter(id=table_id, is_active=True).first()
+        times = []
+        if table is not None:
+            times = find_available_start_times_for_table(date, duration, seats, table, hold_token=hold_token)
+        return {
+            'date': date.isoformat(),
+            'table': table_id,
+            'times': [value.strftime('%H:%M') for value in times],
+        }
+
+    etag = _availability_etag(date, 'times', table_id, duration, seats, own_hold_token(date, hold_token))
+    return _conditional_json(request, etag, build_payload)
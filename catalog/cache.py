@@ -0,0 +1,15 @@
+from site_settings.cache import bump_generation, get_generation
+
+CATALOG_GENERATION_KEY = 'catalog:generation'
+# Сколько секунд живет отрисованный фрагмент каталога.
+FRAGMENT_TIMEOUT = 60 * 10
+
+
+def catalog_generation() -> int:
+    """Возвращает поколение каталога для ключей закешированных фрагментов."""
+    return get_generation(CATALOG_GENERATION_KEY)
+
+
+def invalidate_catalog() -> None:
+    """Делает недействительными все закешированные фрагменты каталога."""
+    bump_generation(CATALOG_GENERATION_KEY)
@@ -0,0 +1,15 @@
+from django import forms
+
+
+class GameFilterForm(forms.Form):
+    """Форма фильтров каталога настольных игр."""
+    q = forms.CharField(label='Название', required=False, max_length=100)
+    players = forms.IntegerField(label='Игроков', required=False, min_value=1, max_value=99)
+    max_time = forms.IntegerField(label='Не дольше (мин.)', required=False, min_value=1, max_value=1440)
+    age = forms.IntegerField(label='Возраст игрока', required=False, min_value=0, max_value=99)
+
+
+class ProductFilterForm(forms.Form):
+    """Форма фильтров меню."""
+    q = forms.CharField(label='Название', required=False, max_length=100)
+    max_price = forms.DecimalField(label='Цена до', required=False, min_value=0, max_digits=10, decimal_places=2)
@@ -0,0 +1,182 @@
+"""Уменьшенные JPEG/WebP-варианты загруженных изображений для srcset."""
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Модель, поле изображения и поле со списком его вариантов.
+VARIANT_FIELDS = [
+    ('catalog.BoardGame', 'image', 'image_variants'),
+    ('catalog.Product', 'image', 'image_variants'),
+    ('site_settings.SiteSettings', 'logo', 'logo_variants'),
+    ('site_settings.SiteSettings', 'og_image', 'og_image_variants'),
+]
+WIDTHS = (320, 640, 960, 1280)
+# Формат варианта: (расширение, параметры сохранения Pillow).
+FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 78, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 80, 'optimize': True, 'progressive': True}),
+}
+HASH_LENGTH = 12
+
+
+def content_hash(data) -> str:
+    """Возвращает короткий SHA-256 содержимого файла."""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def variant_name(source, digest, width, extension) -> str:
+    """Возвращает имя варианта рядом с оригиналом: dir/variants/<имя>-<хеш>-<ширина>w.<ext>."""
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'variants', f'{stem}-{digest}-{width}w.{extension}')
+
+
+def _prepare(image, image_format):
+    """Приводит режим изображения к поддерживаемому форматом варианта."""
+    if image_format == 'jpeg':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB')
+    if image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+    return image
+
+
+def build_variants(source, storage=default_storage) -> dict:
+    """Создает варианты изображения и возвращает их описание для поля вариантов.
+
+    Имена вариантов содержат хеш содержимого оригинала, поэтому уже
+    существующие файлы не перекодируются, а замена картинки всегда дает
+    новые адреса, которые можно кешировать навсегда.
+    """
+    with storage.open(source, 'rb') as handle:
+        data = handle.read()
+    digest = content_hash(data)
+    with Image.open(io.BytesIO(data)) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+    widths = [width for width in WIDTHS if width < original.width] or [original.width]
+    if original.width < WIDTHS[-1] and original.width not in widths:
+        widths.append(original.width)
+    variants = {image_format: {} for image_format in FORMATS}
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = None
+        for image_format, (extension, options) in FORMATS.items():
+            name = variant_name(source, digest, width, extension)
+            if not storage.exists(name):
+                if resized is None:
+                    resized = original.resize((width, height), Image.LANCZOS)
+                buffer = io.BytesIO()
+                _prepare(resized, image_format).save(buffer, **options)
+                storage.save(name, ContentFile(buffer.getvalue()))
+            variants[image_format][str(width)] = name
+    return {
+        'source': source,
+        'hash': digest,
+        'width': original.width,
+        'height': original.height,
+        'variants': variants,
+    }
+
+
+def variant_names(manifest) -> set:
+    """Возвращает имена всех файлов вариантов из описания."""
+    return {
+        name
+        for names in (manifest or {}).get('variants', {}).values()
+        for name in names.values()
+    }
+
+
+def delete_variants(manifest, keep=None, storage=default_storage) -> int:
+    """Удаляет файлы вариантов описания, кроме вошедших в описание keep.
+
+    Возвращает число удаленных файлов. Вызывается, когда изображение
+    заменили, очистили или удалили запись, чтобы старые варианты не копились.
+    """
+    stale = variant_names(manifest) - variant_names(keep)
+    for name in stale:
+        storage.delete(name)
+    return len(stale)
+
+
+def is_current(manifest, source) -> bool:
+    """Проверяет, что описание вариантов построено для текущего файла."""
+    return bool(manifest) and manifest.get('source') == source
+
+
+def pending_images():
+    """Перечисляет (модель, поле, поле вариантов, pk, файл) без актуальных вариантов.
+
+    Запись с очищенным изображением и старым описанием тоже попадает в
+    список: ее варианты нужно удалить.
+    """
+    for label, field, manifest_field in VARIANT_FIELDS:
+        model = apps.get_model(label)
+        rows = model.objects.values_list('pk', field, manifest_field)
+        for pk, source, manifest in rows:
+            if (source and not is_current(manifest, source)) or (not source and manifest):
+                yield model, field, manifest_field, pk, source
+
+
+def process_pending(limit=None) -> dict:
+    """Строит варианты для изображений без них и сохраняет описания в записи.
+
+    Запись сохраняется через save(update_fields), чтобы сработали сигналы
+    сброса кешей, после чего удаляются варианты прежнего изображения. Файл,
+    который не открывается как изображение, получает описание с ошибкой
+    и больше не обрабатывается, пока его не заменят.
+    """
+    stats = {'built': 0, 'failed': 0}
+    for model, field, manifest_field, pk, source in pending_images():
+        if limit is not None and stats['built'] + stats['failed'] >= limit:
+            break
+        if not source:
+            manifest = {}
+        else:
+            try:
+                manifest = build_variants(source)
+            except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+                logger.warning('Cannot build variants for %s: %s', source, exc)
+                manifest = {'source': source, 'error': str(exc)[:200]}
+                stats['failed'] += 1
+            else:
+                stats['built'] += 1
+        instance = model.objects.filter(pk=pk, **{field: source}).first()
+        if instance is None:
+            # Изображение заменили, пока строились варианты: им займется следующий проход.
+            continue
+        previous = getattr(instance, manifest_field)
+        setattr(instance, manifest_field, manifest)
+        instance.save(update_fields=[manifest_field])
+        delete_variants(previous, keep=manifest)
+    return stats
+
+
+def srcset(manifest, image_format) -> str:
+    """Возвращает значение srcset для формата из описания вариантов."""
+    items = sorted(
+        ((int(width), name) for width, name in manifest.get('variants', {}).get(image_format, {}).items()),
+    )
+    return ', '.join(f'{default_storage.url(name)} {width}w' for width, name in items)
+
+
+def best_variant_url(manifest, image_format, max_width) -> str:
+    """Возвращает адрес самого широкого варианта формата не шире max_width или ''."""
+    variants = manifest.get('variants', {}).get(image_format, {})
+    widths = sorted(int(width) for width in variants if int(width) <= max_width)
+    if not widths:
+        return ''
+    return default_storage.url(variants[str(widths[-1])])
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.images import process_pending
+
+
+class Command(BaseCommand):
+    """Строит уменьшенные варианты загруженных изображений."""
+    help = "Build resized JPEG/WebP variants for uploaded catalog and site images."
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=10.0,
+            help="Seconds to wait before looking for new uploads again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process pending images once and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        totals = {"built": 0, "failed": 0}
+        started = time.monotonic()
+        while True:
+            stats = process_pending()
+            for key, value in stats.items():
+                totals[key] += value
+            if any(stats.values()) and not options["once"]:
+                self.stdout.write("Built: {built}, failed: {failed}".format(**stats))
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS("Built: {built}, failed: {failed}".format(**totals) + f" in {elapsed:.2f}s"))
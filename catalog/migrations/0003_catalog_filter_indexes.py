@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='boardgame',
+            index=models.Index(fields=['is_available', 'title', 'id'], name='catalog_boa_is_avai_c1a199_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='boardgame',
+            index=models.Index(fields=['is_available', 'players_min', 'players_max'], name='catalog_boa_is_avai_1dfdc8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='boardgame',
+            index=models.Index(fields=['is_available', 'play_time_min'], name='catalog_boa_is_avai_c3c56b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_available', 'title', 'id'], name='catalog_pro_is_avai_833988_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_available', 'price'], name='catalog_pro_is_avai_e2b7e9_idx'),
+        ),
+    ]
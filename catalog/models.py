@@ -10,12 +10,19 @@ class BoardGame(models.Model):
     play_time_min = models.PositiveIntegerField('Длительность (мин.)', null=True, blank=True)
     age = models.PositiveIntegerField('Возраст', null=True, blank=True)
     image = models.ImageField('Изображение', upload_to='games/', blank=True)
+    image_variants = models.JSONField('Варианты изображения', default=dict, blank=True, editable=False)
     is_available = models.BooleanField('Доступна', default=True)
 
     class Meta:
         """Мета-настройки модели или формы."""
         verbose_name = 'Настольная игра'
         verbose_name_plural = 'Настольные игры'
+        # Каталог всегда фильтрует доступные игры и сортирует их по названию.
+        indexes = [
+            models.Index(fields=['is_available', 'title', 'id']),
+            models.Index(fields=['is_available', 'players_min', 'players_max']),
+            models.Index(fields=['is_available', 'play_time_min']),
+        ]
 
     def __str__(self) -> str:
         """Возвращает человекочитаемое строковое представление объекта."""
@@ -28,12 +35,17 @@ class Product(models.Model):
     price = models.DecimalField('Цена', max_digits=10, decimal_places=2)
     description = models.TextField('Описание', blank=True)
     image = models.ImageField('Изображение', upload_to='products/', blank=True)
+    image_variants = models.JSONField('Варианты изображения', default=dict, blank=True, editable=False)
     is_available = models.BooleanField('Доступен', default=True)
 
     class Meta:
         """Мета-настройки модели или формы."""
         verbose_name = 'Продукт'
         verbose_name_plural = 'Продукты'
+        indexes = [
+            models.Index(fields=['is_available', 'title', 'id']),
+            models.Index(fields=['is_available', 'price']),
+        ]
 
     def __str__(self) -> str:
         """Возвращает человекочитаемое строковое представление объекта."""
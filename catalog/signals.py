@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from site_settings.page_cache import invalidate_public_pages
+
+from .cache import invalidate_catalog
+from .images import delete_variants
+from .models import BoardGame, Product
+
+
+@receiver(post_save, sender=BoardGame)
+@receiver(post_delete, sender=BoardGame)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def catalog_changed(sender, **kwargs):
+    """Сбрасывает фрагменты и страницы каталога после изменения игры или продукта."""
+    invalidate_catalog()
+    invalidate_public_pages()
+
+
+@receiver(post_delete, sender=BoardGame)
+@receiver(post_delete, sender=Product)
+def catalog_image_deleted(sender, instance, **kwargs):
+    """Удаляет варианты изображения удаленной позиции после фиксации транзакции."""
+    manifest = instance.image_variants
+    if manifest:
+        transaction.on_commit(lambda: delete_variants(manifest))
@@ -0,0 +1,53 @@
+from django import template
+from django.utils.html import format_html
+
+from catalog.images import best_variant_url, is_current, srcset
+
+register = template.Library()
+
+# Ширина запасного JPEG для браузеров без srcset.
+FALLBACK_WIDTH = 640
+
+
+@register.simple_tag
+def responsive_image(image, manifest, alt='', sizes='100vw', css_class=''):
+    """Выводит <picture> с WebP и JPEG srcset или исходное изображение, пока вариантов нет."""
+    if not image:
+        return ''
+    if not is_current(manifest, image.name) or not manifest.get('variants'):
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="lazy" decoding="async">',
+            image.url,
+            css_class,
+            alt,
+        )
+    fallback = best_variant_url(manifest, 'jpeg', FALLBACK_WIDTH) or best_variant_url(manifest, 'jpeg', manifest['width'])
+    width = min(FALLBACK_WIDTH, manifest['width'])
+    height = round(manifest['height'] * width / manifest['width'])
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" class="{}" alt="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        srcset(manifest, 'webp'),
+        sizes,
+        fallback,
+        srcset(manifest, 'jpeg'),
+        sizes,
+        width,
+        height,
+        css_class,
+        alt,
+    )
+
+
+@register.simple_tag
+def variant_url(image, manifest, max_width=1280):
+    """Возвращает адрес JPEG-варианта не шире max_width или исходного изображения."""
+    if not image:
+        return ''
+    if is_current(manifest, image.name):
+        url = best_variant_url(manifest, 'jpeg', max_width)
+        if url:
+            return url
+    return image.url
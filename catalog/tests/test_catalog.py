@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import BoardGame, Product
+from catalog.views import PAGE_SIZE
+
+
+class CatalogListTests(TestCase):
+    """Тесты фильтров, постраничного вывода и кеша фрагментов каталога."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        cache.clear()
+        self.party = BoardGame.objects.create(
+            title="Кодовые имена", players_min=4, players_max=8, play_time_min=15, age=10, is_available=True
+        )
+        self.duel = BoardGame.objects.create(
+            title="Дуэль", players_min=2, players_max=2, play_time_min=30, age=12, is_available=True
+        )
+        self.epic = BoardGame.objects.create(
+            title="Сумерки империи", players_min=3, players_max=6, play_time_min=240, age=14, is_available=True
+        )
+        BoardGame.objects.create(title="Скрытая", players_min=2, players_max=4, is_available=False)
+
+    def _titles(self, response):
+        """Возвращает названия позиций каталога на странице."""
+        return [item.title for item in response.context['page']]
+
+    def test_filters_by_players_time_age_and_title(self):
+        """Проверяет сценарий: filters by players time age and title."""
+        url = reverse('catalog:games')
+        self.assertEqual(self._titles(self.client.get(url)), ["Дуэль", "Кодовые имена", "Сумерки империи"])
+        self.assertEqual(self._titles(self.client.get(url, {'players': 5})), ["Кодовые имена", "Сумерки империи"])
+        self.assertEqual(self._titles(self.client.get(url, {'max_time': 60})), ["Дуэль", "Кодовые имена"])
+        self.assertEqual(self._titles(self.client.get(url, {'age': 12})), ["Дуэль", "Кодовые имена"])
+        self.assertEqual(self._titles(self.client.get(url, {'q': 'импер'})), ["Сумерки империи"])
+        self.assertEqual(self._titles(self.client.get(url, {'players': 'много'})), ["Дуэль", "Кодовые имена", "Сумерки империи"])
+        self.assertContains(self.client.get(url, {'players': 20}), "Ничего не найдено.")
+
+    def test_games_without_play_time_pass_time_filter(self):
+        """Проверяет сценарий: games without play time pass time filter."""
+        BoardGame.objects.create(title="Без времени", players_min=2, players_max=4, is_available=True)
+        url = reverse('catalog:games')
+        self.assertEqual(
+            self._titles(self.client.get(url, {'max_time': 60})), ["Без времени", "Дуэль", "Кодовые имена"]
+        )
+
+    def test_pages_keep_filters_in_links(self):
+        """Проверяет сценарий: pages keep filters in links."""
+        BoardGame.objects.bulk_create([
+            BoardGame(title=f"Игра {index:03d}", players_min=2, players_max=4, is_available=True)
+            for index in range(PAGE_SIZE + 5)
+        ])
+        url = reverse('catalog:games')
+        first = self.client.get(url, {'players': 2})
+        self.assertEqual(len(self._titles(first)), PAGE_SIZE)
+        self.assertContains(first, 'href="?players=2&amp;page=2"')
+        second = self.client.get(url, {'players': 2, 'page': 2})
+        self.assertEqual(len(self._titles(second)), 6)
+        self.assertEqual(self.client.get(url, {'page': 'x'}).context['page'].number, 1)
+
+    def test_cached_fragment_skips_catalog_queries(self):
+        """Проверяет сценарий: cached fragment skips catalog queries."""
+        url = reverse('catalog:games')
+        self.client.get(url, {'players': 2})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'players': 2})
+        self.assertContains(response, "Дуэль")
+        self.assertFalse([query for query in queries if 'catalog_boardgame' in query['sql']])
+
+    def test_staff_edit_invalidates_fragment(self):
+        """Проверяет сценарий: staff edit invalidates fragment."""
+        url = reverse('catalog:games')
+        self.assertContains(self.client.get(url), "Дуэль")
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.post(reverse('staff:game_edit', args=[self.duel.id]), {
+            'title': "Дуэль: издание 2",
+            'players_min': 2,
+            'players_max': 2,
+            'play_time_min': 30,
+            'age': 12,
+            'is_available': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.client.logout()
+        self.assertContains(self.client.get(url), "Дуэль: издание 2")
+
+    def test_products_filter_by_price_and_title(self):
+        """Проверяет сценарий: products filter by price and title."""
+        Product.objects.create(title="Чай", price=Decimal('3.50'), is_available=True)
+        Product.objects.create(title="Чизкейк", price=Decimal('6.00'), is_available=True)
+        Product.objects.create(title="Кофе", price=Decimal('4.00'), is_available=False)
+        url = reverse('catalog:products')
+        self.assertEqual(self._titles(self.client.get(url)), ["Чай", "Чизкейк"])
+        self.assertEqual(self._titles(self.client.get(url, {'max_price': '5'})), ["Чай"])
+        self.assertEqual(self._titles(self.client.get(url, {'q': 'Чиз'})), ["Чизкейк"])
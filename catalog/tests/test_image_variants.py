@@ -0,0 +1,142 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from catalog.images import WIDTHS, pending_images, process_pending, variant_names
+from catalog.models import BoardGame
+from site_settings.models import SiteSettings, invalidate_solo
+
+
+def _image_bytes(width, height, image_format='JPEG', mode='RGB', noise=False):
+    """Возвращает байты тестового изображения."""
+    if noise:
+        image = Image.frombytes(mode, (width, height), os.urandom(width * height * len(mode)))
+    else:
+        image = Image.new(mode, (width, height), (200, 120, 40, 128)[:len(mode)])
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **({'quality': 95} if image_format == 'JPEG' else {}))
+    return buffer.getvalue()
+
+
+class ImageVariantTests(TestCase):
+    """Тесты построения вариантов изображений и тега srcset."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        # Откат транзакции теста не сбрасывает кеш настроек процесса.
+        self.addCleanup(invalidate_solo)
+
+    def _game(self, data, name='photo.jpg'):
+        """Создает игру с загруженным изображением."""
+        game = BoardGame(title='Каркассон', is_available=True)
+        game.image.save(name, ContentFile(data), save=False)
+        game.save()
+        return game
+
+    def test_variants_are_built_once_with_content_hash_names(self):
+        """Проверяет сценарий: variants are built once with content hash names."""
+        game = self._game(_image_bytes(2000, 1000))
+        self.assertEqual(process_pending(), {'built': 1, 'failed': 0})
+        game.refresh_from_db()
+        manifest = game.image_variants
+        self.assertEqual(manifest['source'], game.image.name)
+        self.assertEqual((manifest['width'], manifest['height']), (2000, 1000))
+        for image_format in ('webp', 'jpeg'):
+            self.assertEqual(sorted(map(int, manifest['variants'][image_format])), list(WIDTHS))
+        name = manifest['variants']['webp']['640']
+        self.assertTrue(name.startswith('games/variants/'))
+        self.assertIn(manifest['hash'], name)
+        with default_storage.open(name) as handle, Image.open(handle) as variant:
+            self.assertEqual((variant.format, variant.size), ('WEBP', (640, 320)))
+        self.assertEqual(list(pending_images()), [])
+        self.assertEqual(process_pending(), {'built': 0, 'failed': 0})
+
+    def test_stale_variants_are_deleted(self):
+        """Проверяет сценарий: stale variants are deleted."""
+        game = self._game(_image_bytes(2000, 1000))
+        process_pending()
+        game.refresh_from_db()
+        first = variant_names(game.image_variants)
+        game.image.save('other.jpg', ContentFile(_image_bytes(1000, 1000)), save=True)
+        process_pending()
+        game.refresh_from_db()
+        second = variant_names(game.image_variants)
+        self.assertFalse(any(default_storage.exists(name) for name in first))
+        self.assertTrue(all(default_storage.exists(name) for name in second))
+
+        game.image = ''
+        game.save()
+        self.assertEqual(process_pending(), {'built': 0, 'failed': 0})
+        game.refresh_from_db()
+        self.assertEqual(game.image_variants, {})
+        self.assertFalse(any(default_storage.exists(name) for name in second))
+
+        other = self._game(_image_bytes(800, 600), name='deleted.jpg')
+        process_pending()
+        other.refresh_from_db()
+        names = variant_names(other.image_variants)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+    def test_small_transparent_image_keeps_its_width(self):
+        """Проверяет сценарий: small transparent image keeps its width."""
+        game = self._game(_image_bytes(200, 100, 'PNG', 'RGBA'), name='logo.png')
+        process_pending()
+        game.refresh_from_db()
+        self.assertEqual(list(game.image_variants['variants']['jpeg']), ['200'])
+        with default_storage.open(game.image_variants['variants']['jpeg']['200']) as handle:
+            with Image.open(handle) as variant:
+                self.assertEqual(variant.mode, 'RGB')
+
+    def test_broken_upload_is_marked_and_not_retried(self):
+        """Проверяет сценарий: broken upload is marked and not retried."""
+        game = self._game(b'not an image')
+        with self.assertLogs('catalog.images', 'WARNING'):
+            self.assertEqual(process_pending(), {'built': 0, 'failed': 1})
+        game.refresh_from_db()
+        self.assertIn('error', game.image_variants)
+        self.assertEqual(process_pending(), {'built': 0, 'failed': 0})
+
+    def test_catalog_page_uses_srcset_after_build(self):
+        """Проверяет сценарий: catalog page uses srcset after build."""
+        game = self._game(_image_bytes(1600, 1200))
+        response = self.client.get('/games/')
+        self.assertContains(response, f'src="{game.image.url}"')
+        self.assertNotContains(response, '<picture>')
+        process_pending()
+        response = self.client.get('/games/')
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, '-640w.webp 640w')
+        self.assertContains(response, 'width="640" height="480"')
+        self.assertNotContains(response, f'src="{game.image.url}"')
+
+    def test_variants_are_an_order_of_magnitude_lighter(self):
+        """Проверяет сценарий: variants are an order of magnitude lighter."""
+        game = self._game(_image_bytes(3000, 2000, noise=True))
+        process_pending()
+        game.refresh_from_db()
+        original = game.image.size
+        for image_format in ('webp', 'jpeg'):
+            variant = default_storage.size(game.image_variants['variants'][image_format]['640'])
+            self.assertLess(variant * 10, original)
+
+    def test_og_image_uses_jpeg_variant(self):
+        """Проверяет сценарий: og image uses jpeg variant."""
+        settings = SiteSettings.get_solo()
+        settings.og_image.save('share.png', ContentFile(_image_bytes(2400, 1260, 'PNG')), save=False)
+        settings.save()
+        process_pending()
+        response = self.client.get('/games/')
+        self.assertContains(response, '-1280w.jpg">')
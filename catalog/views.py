@@ -1,15 +1,89 @@
+from urllib.parse import urlencode
+
+from django.core.paginator import Paginator
+from django.db.models import Q
 from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
+
+from site_settings.page_cache import cache_public_page
 
+from .cache import FRAGMENT_TIMEOUT, catalog_generation
+from .forms import GameFilterForm, ProductFilterForm
 from .models import BoardGame, Product
 
+PAGE_SIZE = 24
 
-def games_list(request):
-    """Показывает список доступных настольных игр."""
+
+def _filters(form) -> dict:
+    """Возвращает корректно заполненные фильтры формы, пропуская пустые и ошибочные."""
+    form.is_valid()
+    return {name: value for name, value in form.cleaned_data.items() if value not in (None, '')}
+
+
+def _page_number(request) -> int:
+    """Возвращает номер страницы из запроса или 1."""
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        return 1
+
+
+def filter_games(filters):
+    """Возвращает доступные игры, подходящие под фильтры, по названию."""
     games = BoardGame.objects.filter(is_available=True)
-    return render(request, 'catalog/games_list.html', {'games': games})
+    if filters.get('q'):
+        games = games.filter(title__icontains=filters['q'])
+    if filters.get('players'):
+        players = filters['players']
+        games = games.filter(
+            Q(players_min__isnull=True) | Q(players_min__lte=players),
+            Q(players_max__isnull=True) | Q(players_max__gte=players),
+        )
+    if filters.get('max_time'):
+        games = games.filter(Q(play_time_min__isnull=True) | Q(play_time_min__lte=filters['max_time']))
+    if filters.get('age') is not None:
+        games = games.filter(Q(age__isnull=True) | Q(age__lte=filters['age']))
+    return games.order_by('title', 'id')
 
 
-def products_list(request):
-    """Показывает список доступных продуктов."""
+def filter_products(filters):
+    """Возвращает доступные продукты, подходящие под фильтры, по названию."""
     products = Product.objects.filter(is_available=True)
-    return render(request, 'catalog/products_list.html', {'products': products})
+    if filters.get('q'):
+        products = products.filter(title__icontains=filters['q'])
+    if filters.get('max_price') is not None:
+        products = products.filter(price__lte=filters['max_price'])
+    return products.order_by('title', 'id')
+
+
+def _catalog_context(request, form, queryset_for) -> dict:
+    """Собирает контекст страницы каталога с ленивой страницей и ключом фрагмента.
+
+    Страница выбирается из базы только при промахе кеша фрагмента: при
+    попадании шаблон не обращается к ней и запросов к каталогу нет.
+    """
+    filters = _filters(form)
+    page_number = _page_number(request)
+    filter_query = urlencode(sorted(filters.items()))
+    return {
+        'form': form,
+        'page': SimpleLazyObject(lambda: Paginator(queryset_for(filters), PAGE_SIZE).get_page(page_number)),
+        'filter_query': filter_query,
+        'fragment_key': f'{filter_query}&page={page_number}',
+        'catalog_generation': catalog_generation(),
+        'fragment_timeout': FRAGMENT_TIMEOUT,
+    }
+
+
+@cache_public_page(params=(*GameFilterForm.base_fields, 'page'))
+def games_list(request):
+    """Показывает доступные настольные игры с фильтрами и постраничным выводом."""
+    context = _catalog_context(request, GameFilterForm(request.GET), filter_games)
+    return render(request, 'catalog/games_list.html', context)
+
+
+@cache_public_page(params=(*ProductFilterForm.base_fields, 'page'))
+def products_list(request):
+    """Показывает доступные продукты с фильтрами и постраничным выводом."""
+    context = _catalog_context(request, ProductFilterForm(request.GET), filter_products)
+    return render(request, 'catalog/products_list.html', context)
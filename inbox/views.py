@@ -1,7 +1,8 @@
 from django.contrib import messages
+from django.db import transaction
 from django.shortcuts import redirect, render
 
-from integrations.telegram import send_telegram_message
+from integrations.outbox import enqueue_telegram
 
 from .forms import ContactForm
 
@@ -11,11 +12,12 @@ def contact(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
-            message = form.save()
-            send_telegram_message(
-                f'Новое сообщение: {message.name}, телефон: {message.phone}, '
-                f'сообщение: {message.message}'
-            )
+            with transaction.atomic():
+                message = form.save()
+                enqueue_telegram(
+                    f'Новое сообщение: {message.name}, телефон: {message.phone}, '
+                    f'сообщение: {message.message}'
+                )
             messages.success(request, 'Спасибо! Мы свяжемся с вами.')
             return redirect('inbox:contact')
     else:
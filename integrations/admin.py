@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Админ-конфигурация для исходящих уведомлений."""
+    list_display = ('created_at', 'channel', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('channel', 'status', 'kind')
+    readonly_fields = ('created_at', 'sent_at')
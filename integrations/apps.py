@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class IntegrationsConfig(AppConfig):
+    """Конфигурация приложения внешних интеграций."""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'integrations'
+    verbose_name = 'Интеграции'
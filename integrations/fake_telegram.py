@@ -0,0 +1,109 @@
+"""Локальная заглушка Telegram Bot API для офлайн-тестов и отладки."""
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METHOD_PATH = re.compile(r'/bot(?P<token>[^/]+)/(?P<method>\w+)$')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Обработчик запросов к заглушке с поддержкой keep-alive."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        """Принимает вызов метода API и отвечает как Telegram."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        match = METHOD_PATH.search(self.path)
+        status, result = self.server.fake.handle(
+            match.group('token') if match else None,
+            match.group('method') if match else None,
+            json.loads(body or b'{}'),
+        )
+        data = json.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Не пишет журнал запросов в stderr."""
+
+
+class _Server(ThreadingHTTPServer):
+    """HTTP-сервер заглушки, считающий входящие соединения."""
+    daemon_threads = True
+
+    def process_request(self, request, client_address):
+        """Считает новое соединение и передает его обработчику."""
+        self.fake.connections += 1
+        super().process_request(request, client_address)
+
+
+class FakeTelegramServer:
+    """Заглушка Bot API на localhost: запоминает сообщения и умеет отвечать 429.
+
+    Используется как контекстный менеджер; адрес для TELEGRAM_API_URL — в url.
+    """
+
+    def __init__(self, token='test-token'):
+        """Готовит сервер на свободном порту localhost."""
+        self.token = token
+        self.messages = []
+        self.connections = 0
+        self._rate_limited = []
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Базовый адрес API заглушки."""
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def rate_limit(self, times, retry_after=1) -> None:
+        """Отвечает 429 с retry_after на ближайшие times запросов sendMessage."""
+        with self._lock:
+            self._rate_limited.extend([retry_after] * times)
+
+    def handle(self, token, method, payload):
+        """Возвращает (HTTP-статус, тело ответа) для вызова метода API."""
+        if token != self.token:
+            return 401, {'ok': False, 'error_code': 401, 'description': 'Unauthorized'}
+        if method != 'sendMessage':
+            return 404, {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+        with self._lock:
+            if self._rate_limited:
+                retry_after = self._rate_limited.pop(0)
+                return 429, {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f'Too Many Requests: retry after {retry_after}',
+                    'parameters': {'retry_after': retry_after},
+                }
+            self.messages.append(payload)
+            message_id = len(self.messages)
+        return 200, {'ok': True, 'result': {'message_id': message_id, 'text': payload.get('text')}}
+
+    def start(self) -> 'FakeTelegramServer':
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер и закрывает сокет."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        """Запускает сервер при входе в контекст."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер при выходе из контекста."""
+        self.stop()
@@ -0,0 +1,42 @@
+"""Пакетная отправка писем через одно SMTP-соединение."""
+import logging
+
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch_emails(emails) -> list:
+    """Отправляет письма через одно соединение и возвращает результат по каждому.
+
+    Каждое письмо уходит отдельным send_messages, чтобы сбой одного не ронял
+    остальные. Результат — список той же длины: None для отправленного письма
+    или исключение. После ошибки соединение переоткрывается, потому что
+    состояние SMTP-сессии после сбоя неизвестно.
+    """
+    results = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning('Failed to open mail connection: %s', exc)
+        return [exc] * len(emails)
+    try:
+        for index, email in enumerate(emails):
+            email.connection = connection
+            try:
+                connection.send_messages([email])
+            except Exception as exc:
+                results.append(exc)
+                connection.close()
+                try:
+                    connection.open()
+                except Exception as reopen_exc:
+                    logger.warning('Failed to reopen mail connection: %s', reopen_exc)
+                    results.extend([reopen_exc] * (len(emails) - index - 1))
+                    break
+                continue
+            results.append(None)
+    finally:
+        connection.close()
+    return results
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from integrations.outbox import process_batch
+
+
+class Command(BaseCommand):
+    """Отправляет уведомления из очереди пачками."""
+    help = "Deliver queued e-mail and Telegram notifications with retries and backoff."
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="How many messages to claim per batch.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет команду."""
+        batch_size = options["batch_size"]
+        totals = {"sent": 0, "skipped": 0, "retried": 0, "failed": 0}
+        started = time.monotonic()
+        while True:
+            batch_started = time.monotonic()
+            stats = process_batch(batch_size)
+            processed = sum(stats.values())
+            for key, value in stats.items():
+                totals[key] += value
+            if processed and not options["once"]:
+                self.stdout.write(self._report(stats, time.monotonic() - batch_started))
+            if processed >= batch_size:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(self._report(totals, time.monotonic() - started)))
+
+    def _report(self, stats, elapsed) -> str:
+        """Форматирует счетчики и скорость отправки."""
+        rate = stats["sent"] / elapsed if elapsed > 0 else 0.0
+        return (
+            "Sent: {sent}, skipped: {skipped}, retried: {retried}, failed: {failed}".format(**stats)
+            + f" in {elapsed:.2f}s ({rate:.1f} msg/s)"
+        )
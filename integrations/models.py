@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+CHANNEL_EMAIL = 'email'
+CHANNEL_TELEGRAM = 'telegram'
+
+CHANNEL_CHOICES = [
+    (CHANNEL_EMAIL, 'E-mail'),
+    (CHANNEL_TELEGRAM, 'Telegram'),
+]
+
+STATUS_PENDING = 'PENDING'
+STATUS_SENT = 'SENT'
+STATUS_SKIPPED = 'SKIPPED'
+STATUS_FAILED = 'FAILED'
+
+STATUS_CHOICES = [
+    (STATUS_PENDING, 'В очереди'),
+    (STATUS_SENT, 'Отправлено'),
+    (STATUS_SKIPPED, 'Пропущено'),
+    (STATUS_FAILED, 'Ошибка'),
+]
+
+
+class OutboxMessage(models.Model):
+    """Уведомление, ожидающее отправки фоновым обработчиком."""
+    channel = models.CharField('Канал', max_length=20, choices=CHANNEL_CHOICES)
+    kind = models.CharField('Тип', max_length=50)
+    payload = models.JSONField('Данные', default=dict)
+    reservation = models.ForeignKey(
+        'booking.Reservation',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='outbox_messages',
+    )
+    status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField('Следующая попытка', default=timezone.now)
+    locked_until = models.DateTimeField('Занято до', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        """Мета-настройки модели или формы."""
+        verbose_name = 'Исходящее уведомление'
+        verbose_name_plural = 'Исходящие уведомления'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self) -> str:
+        """Возвращает человекочитаемое строковое представление объекта."""
+        return f'{self.get_channel_display()} {self.kind} {self.get_status_display()}'
@@ -0,0 +1,218 @@
+"""Транзакционная очередь уведомлений и ее обработка."""
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings as django_settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from site_settings.models import SiteSettings
+
+from .mail import dispatch_emails
+from .models import (
+    CHANNEL_EMAIL,
+    CHANNEL_TELEGRAM,
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_SENT,
+    STATUS_SKIPPED,
+    OutboxMessage,
+)
+from .telegram import MAX_MESSAGE_LENGTH, MESSAGE_SEPARATOR, coalesce_texts, get_chat
+
+logger = logging.getLogger(__name__)
+
+KIND_TICKET = 'ticket'
+KIND_REMINDER = 'reminder'
+KIND_STATUS = 'status'
+KIND_TEXT = 'text'
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+LEASE_SECONDS = 5 * 60
+# Сообщения Telegram, поставленные в очередь в пределах этого окна, уходят одним сообщением:
+# отправка откладывается до конца окна.
+COALESCE_SECONDS = 10
+
+
+def enqueue_email(email, kind=KIND_TEXT, reservation=None) -> OutboxMessage:
+    """Ставит готовое письмо в очередь; вызывается в транзакции основной записи."""
+    payload = {
+        'subject': email.subject,
+        'body': email.body,
+        'from_email': email.from_email,
+        'to': list(email.to),
+        'reply_to': list(email.reply_to),
+    }
+    alternatives = getattr(email, 'alternatives', None)
+    if alternatives:
+        payload['alternatives'] = [[content, mimetype] for content, mimetype in alternatives]
+    return OutboxMessage.objects.create(
+        channel=CHANNEL_EMAIL,
+        kind=kind,
+        reservation=reservation,
+        payload=payload,
+    )
+
+
+def _coalesce_window() -> timedelta:
+    """Возвращает окно склейки сообщений Telegram из настроек."""
+    return timedelta(seconds=getattr(django_settings, 'TELEGRAM_COALESCE_SECONDS', COALESCE_SECONDS))
+
+
+def _coalesce_deadline(now, window):
+    """Возвращает момент отправки нового сообщения Telegram.
+
+    Сообщение откладывается до конца окна, открытого первым еще не отправленным
+    сообщением последних секунд, поэтому вся серия становится готовой
+    одновременно и попадает в одну пачку обработчика, даже если он успел
+    пройтись по очереди между постановками.
+    """
+    opened_at = (
+        OutboxMessage.objects.filter(
+            channel=CHANNEL_TELEGRAM,
+            status=STATUS_PENDING,
+            attempts=0,
+            locked_until__isnull=True,
+            created_at__gt=now - window,
+        )
+        .order_by('created_at')
+        .values_list('created_at', flat=True)
+        .first()
+    )
+    return (opened_at or now) + window
+
+
+def enqueue_telegram(text, kind=KIND_TEXT, reservation=None):
+    """Ставит сообщение для Telegram в очередь, если интеграция включена."""
+    if not SiteSettings.get_solo().tg_enabled:
+        return None
+    return OutboxMessage.objects.create(
+        channel=CHANNEL_TELEGRAM,
+        kind=kind,
+        reservation=reservation,
+        payload={'text': text},
+        next_attempt_at=_coalesce_deadline(timezone.now(), _coalesce_window()),
+    )
+
+
+def retry_delay(attempts) -> timedelta:
+    """Возвращает экспоненциальную задержку перед следующей попыткой."""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def claim_batch(limit) -> list:
+    """Забирает пачку готовых к отправке сообщений, не мешая другим обработчикам.
+
+    В PostgreSQL строки, занятые параллельным обработчиком, пропускаются через
+    SKIP LOCKED; аренда locked_until не дает забрать сообщение повторно, пока
+    его отправка не закончится или обработчик не упадет.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=STATUS_PENDING, next_attempt_at__lte=now)
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        OutboxMessage.objects.filter(id__in=ids).update(locked_until=now + timedelta(seconds=LEASE_SECONDS))
+    return list(OutboxMessage.objects.filter(id__in=ids).order_by('next_attempt_at', 'id'))
+
+
+def _mark_sent(messages, delivered=True) -> None:
+    """Фиксирует отправку пачки сообщений и время последнего письма в бронях."""
+    if not messages:
+        return
+    now = timezone.now()
+    OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+        status=STATUS_SENT if delivered else STATUS_SKIPPED,
+        attempts=F('attempts') + 1,
+        sent_at=now if delivered else None,
+        locked_until=None,
+        last_error='',
+    )
+    reservation_ids = {
+        message.reservation_id
+        for message in messages
+        if delivered and message.channel == CHANNEL_EMAIL and message.reservation_id
+    }
+    if reservation_ids:
+        Reservation = apps.get_model('booking', 'Reservation')
+        Reservation.objects.filter(id__in=reservation_ids).update(email_sent_at=now)
+
+
+def _mark_failed(message, error) -> None:
+    """Планирует повтор с задержкой или окончательно помечает сообщение ошибкой."""
+    attempts = message.attempts + 1
+    status = STATUS_FAILED if attempts >= MAX_ATTEMPTS else STATUS_PENDING
+    OutboxMessage.objects.filter(id=message.id).update(
+        status=status,
+        attempts=attempts,
+        next_attempt_at=timezone.now() + retry_delay(attempts),
+        locked_until=None,
+        last_error=str(error)[:1000],
+    )
+
+
+def _deliver_emails(messages, stats) -> None:
+    """Отправляет письма пачки через одно соединение с почтовым сервером."""
+    emails = [EmailMultiAlternatives(**message.payload) for message in messages]
+    sent = []
+    for message, error in zip(messages, dispatch_emails(emails)):
+        if error is None:
+            sent.append(message)
+        else:
+            _fail(message, error, stats)
+    _mark_sent(sent)
+    stats['sent'] += len(sent)
+
+
+def _deliver_telegram(messages, stats) -> None:
+    """Отправляет сообщения Telegram, склеивая поставленные в очередь почти одновременно."""
+    chat = get_chat()
+    if chat is None:
+        _mark_sent(messages, delivered=False)
+        stats['skipped'] += len(messages)
+        return
+    client, chat_id = chat
+    window = _coalesce_window().total_seconds()
+    items = [(message.created_at, message.payload['text']) for message in messages]
+    sent = []
+    for group in coalesce_texts(items, window):
+        text = MESSAGE_SEPARATOR.join(items[index][1] for index in group)[:MAX_MESSAGE_LENGTH]
+        try:
+            client.send_message(chat_id, text)
+        except Exception as exc:
+            for index in group:
+                _fail(messages[index], exc, stats)
+            continue
+        sent.extend(messages[index] for index in group)
+    _mark_sent(sent)
+    stats['sent'] += len(sent)
+
+
+def _fail(message, error, stats) -> None:
+    """Регистрирует неудачную отправку сообщения в журнале и в счетчиках."""
+    logger.warning('Outbox message %s failed: %s', message.id, error)
+    _mark_failed(message, error)
+    stats['failed' if message.attempts + 1 >= MAX_ATTEMPTS else 'retried'] += 1
+
+
+def process_batch(limit=50) -> dict:
+    """Отправляет одну пачку сообщений и возвращает счетчики результатов."""
+    stats = {'sent': 0, 'skipped': 0, 'retried': 0, 'failed': 0}
+    batch = claim_batch(limit)
+    emails = [message for message in batch if message.channel == CHANNEL_EMAIL]
+    telegram = [message for message in batch if message.channel == CHANNEL_TELEGRAM]
+    if emails:
+        _deliver_emails(emails, stats)
+    if telegram:
+        telegram.sort(key=lambda message: (message.created_at, message.id))
+        _deliver_telegram(telegram, stats)
+    return stats
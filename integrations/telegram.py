@@ -1,24 +1,195 @@
+"""Вспомогательные интеграции (Telegram, email)."""
+import http.client
 import json
-from urllib import request
+import logging
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings as django_settings
 
 from site_settings.models import SiteSettings
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = 'https://api.telegram.org'
+# Ограничение Telegram на длину текста одного сообщения.
+MAX_MESSAGE_LENGTH = 4096
+MESSAGE_SEPARATOR = '\n\n'
+
+
+class TelegramError(Exception):
+    """Ошибка ответа Telegram Bot API."""
+
+    def __init__(self, description, status=None, retry_after=None):
+        """Сохраняет описание ошибки, HTTP-статус и паузу из retry_after."""
+        super().__init__(description)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Ограничитель частоты: rate событий в секунду с запасом до capacity подряд."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """Создает полный бакет."""
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Забирает токен и возвращает, сколько секунд нужно подождать перед событием."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class TelegramClient:
+    """Клиент Bot API с одним keep-alive соединением и лимитом сообщений на чат.
+
+    Повторяет запрос после 429 через указанный Telegram retry_after и один раз
+    переподключается, если сервер закрыл простаивающее соединение.
+    """
+
+    def __init__(
+        self,
+        token,
+        api_url=DEFAULT_API_URL,
+        timeout=5,
+        per_chat_rate=1.0,
+        per_chat_burst=1,
+        max_retries=3,
+        sleep=None,
+        clock=None,
+    ):
+        """Сохраняет параметры подключения и ограничений."""
+        parts = urlsplit(api_url)
+        self.token = token
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_retries = max_retries
+        self.sleep = sleep or time.sleep
+        self.clock = clock or time.monotonic
+        self._connection = None
+        self._buckets = {}
+
+    def _connect(self):
+        """Возвращает открытое соединение, создавая его при необходимости."""
+        if self._connection is None:
+            connection_class = (
+                http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            )
+            self._connection = connection_class(self.netloc, timeout=self.timeout)
+        return self._connection
+
+    def close(self) -> None:
+        """Закрывает соединение с API."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _post(self, method, payload) -> dict:
+        """Выполняет POST к методу API, переподключаясь один раз при обрыве соединения."""
+        body = json.dumps(payload).encode('utf-8')
+        path = f'{self.base_path}/bot{self.token}/{method}'
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                status = response.status
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # OSError покрывает обрыв соединения и таймаут: недочитанное
+                # keep-alive соединение повторно использовать нельзя.
+                self.close()
+                if attempt:
+                    raise
+        try:
+            result = json.loads(data or b'{}')
+        except ValueError:
+            result = {}
+        if status == 200 and result.get('ok'):
+            return result
+        retry_after = (result.get('parameters') or {}).get('retry_after')
+        raise TelegramError(result.get('description') or f'HTTP {status}', status, retry_after)
+
+    def _wait_for_chat(self, chat_id) -> None:
+        """Ждет, пока лимит чата разрешит следующее сообщение."""
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.per_chat_rate, self.per_chat_burst, self.clock)
+        delay = bucket.reserve()
+        if delay > 0:
+            self.sleep(delay)
+
+    def send_message(self, chat_id, text) -> dict:
+        """Отправляет сообщение в чат, соблюдая лимит и повторяя запрос после 429."""
+        payload = {'chat_id': chat_id, 'text': text}
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_chat(chat_id)
+            try:
+                return self._post('sendMessage', payload)
+            except TelegramError as exc:
+                if exc.status != 429 or attempt == self.max_retries:
+                    raise
+                logger.warning('Telegram rate limit for chat %s, retry after %s s', chat_id, exc.retry_after)
+                self.sleep(exc.retry_after or 1)
+        return {}
+
+
+def coalesce_texts(items, window_seconds, limit=MAX_MESSAGE_LENGTH) -> list:
+    """Группирует тексты, поставленные в очередь с разницей не больше окна.
+
+    items — пары (момент постановки, текст) по возрастанию времени. Возвращает
+    списки индексов items; тексты одной группы помещаются в одно сообщение.
+    """
+    groups = []
+    group_start = None
+    length = 0
+    for index, (queued_at, text) in enumerate(items):
+        extra = len(MESSAGE_SEPARATOR) + len(text)
+        if (
+            not groups
+            or (queued_at - group_start).total_seconds() > window_seconds
+            or length + extra > limit
+        ):
+            groups.append([index])
+            group_start = queued_at
+            length = len(text)
+            continue
+        groups[-1].append(index)
+        length += extra
+    return groups
+
+
+_clients = {}
+
+
+def get_client(token) -> TelegramClient:
+    """Возвращает клиент процесса для токена, чтобы соединение переиспользовалось."""
+    api_url = getattr(django_settings, 'TELEGRAM_API_URL', DEFAULT_API_URL)
+    key = (token, api_url)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = TelegramClient(token, api_url)
+    return client
+
 
-def send_telegram_message(text: str) -> None:
-    """Отправляет уведомление в Telegram при включенной интеграции."""
+def get_chat():
+    """Возвращает (клиент, чат) из настроек сайта или None, если интеграция выключена."""
     settings = SiteSettings.get_solo()
-    if not settings.tg_enabled:
-        return
-    if not settings.tg_bot_token or not settings.tg_chat_id:
-        return
-
-    url = f'https://api.telegram.org/bot{settings.tg_bot_token}/sendMessage'
-    payload = json.dumps({'chat_id': settings.tg_chat_id, 'text': text}).encode('utf-8')
-
-    # Важно: это простой вызов без повторов и очередей, чтобы MVP оставался легким.
-    req = request.Request(url, data=payload, headers={'Content-Type': 'application/json'})
-    try:
-        request.urlopen(req, timeout=5)
-    except Exception:
-        # В MVP игнорируем ошибки, чтобы не ломать основной поток бронирования.
-        return
+    if not settings.tg_enabled or not settings.tg_bot_token or not settings.tg_chat_id:
+        return None
+    return get_client(settings.tg_bot_token), settings.tg_chat_id
@@ -0,0 +1,115 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking.constants import STATUS_CONFIRMED
+from booking.models import Reservation, Table
+from booking.notifications import build_ticket_email
+from integrations.models import STATUS_PENDING, STATUS_SENT, OutboxMessage
+from integrations.outbox import KIND_TICKET, enqueue_email, process_batch
+from site_settings.models import SiteSettings, WeeklySchedule
+
+
+class CountingBackend(EmailBackend):
+    """Почтовый бэкенд в памяти, считающий соединения и отклоняющий адреса с bounce."""
+    opened = 0
+
+    def open(self):
+        """Считает открытие соединения."""
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        """Отклоняет письма на адреса с bounce, остальные сохраняет в mail.outbox."""
+        for message in messages:
+            if any('bounce' in address for address in message.to):
+                raise OSError('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='integrations.tests.test_mail.CountingBackend')
+class BatchedMailTests(TestCase):
+    """Тесты пакетной отправки писем из очереди."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        CountingBackend.opened = 0
+        settings = SiteSettings.get_solo()
+        settings.min_notice_minutes = 0
+        settings.save()
+        WeeklySchedule.objects.all().delete()
+        self.date = timezone.localdate() + timedelta(days=1)
+        WeeklySchedule.objects.create(
+            day_of_week=self.date.weekday(),
+            is_open=True,
+            open_time=time(8, 0),
+            close_time=time(22, 0),
+        )
+        self.table = Table.objects.create(name="T1", capacity=4, is_active=True)
+
+    def _reservation(self, hour, email):
+        """Создает бронь и ставит письмо с билетом в очередь."""
+        reservation = Reservation.objects.create(
+            table=self.table,
+            date=self.date,
+            start_time=time(hour, 0),
+            duration_minutes=60,
+            end_time=time(hour + 1, 0),
+            seats=2,
+            customer_name="Test",
+            customer_email=email,
+        )
+        enqueue_email(build_ticket_email(reservation, 'http://testserver/t/'), KIND_TICKET, reservation)
+        return reservation
+
+    def test_batch_is_sent_over_one_connection(self):
+        """Проверяет сценарий: batch is sent over one connection."""
+        reservations = [self._reservation(hour, f'guest{hour}@example.com') for hour in range(8, 20)]
+        self.assertEqual(process_batch(50)['sent'], 12)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 12)
+        self.assertFalse(Reservation.objects.filter(id__in=[r.id for r in reservations], email_sent_at=None).exists())
+        self.assertEqual(OutboxMessage.objects.filter(status=STATUS_SENT).count(), 12)
+
+    def test_failed_message_does_not_stop_batch(self):
+        """Проверяет сценарий: failed message does not stop batch."""
+        first = self._reservation(10, 'a@example.com')
+        bounced = self._reservation(11, 'bounce@example.com')
+        last = self._reservation(12, 'c@example.com')
+        with self.assertLogs('integrations.outbox', 'WARNING'):
+            stats = process_batch(50)
+        self.assertEqual((stats['sent'], stats['retried']), (2, 1))
+        self.assertEqual([m.to for m in mail.outbox], [['a@example.com'], ['c@example.com']])
+        first.refresh_from_db()
+        bounced.refresh_from_db()
+        last.refresh_from_db()
+        self.assertIsNotNone(first.email_sent_at)
+        self.assertIsNone(bounced.email_sent_at)
+        self.assertIsNotNone(last.email_sent_at)
+        self.assertEqual(OutboxMessage.objects.get(reservation=bounced).status, STATUS_PENDING)
+
+    def test_worker_reports_throughput(self):
+        """Проверяет сценарий: worker reports throughput."""
+        for hour in range(10, 13):
+            self._reservation(hour, f'guest{hour}@example.com')
+        out = StringIO()
+        call_command('run_notification_worker', '--once', stdout=out)
+        self.assertIn('Sent: 3, skipped: 0, retried: 0, failed: 0 in', out.getvalue())
+        self.assertIn('msg/s', out.getvalue())
+
+    def test_status_change_enqueues_customer_email(self):
+        """Проверяет сценарий: status change enqueues customer email."""
+        reservation = self._reservation(10, 'guest@example.com')
+        OutboxMessage.objects.all().delete()
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+        self.client.post(f'/staff/reservations/{reservation.id}/status/', {'status': STATUS_CONFIRMED})
+        self.assertEqual(len(mail.outbox), 0)
+        process_batch()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('подтверждена', mail.outbox[0].subject)
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from inbox.models import ContactMessage
+from integrations.fake_telegram import FakeTelegramServer
+from integrations.models import STATUS_FAILED, STATUS_SENT, OutboxMessage
+from integrations.outbox import (
+    MAX_ATTEMPTS,
+    claim_batch,
+    enqueue_email,
+    enqueue_telegram,
+    process_batch,
+    retry_delay,
+)
+from site_settings.models import SiteSettings, invalidate_solo
+
+LOCMEM_SEND = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+
+
+class NotificationOutboxTests(TestCase):
+    """Тесты очереди уведомлений и ее обработчика."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.tg_enabled = True
+        settings.tg_bot_token = 'test-token'
+        settings.tg_chat_id = '42'
+        settings.save()
+        # Откат транзакции теста не сбрасывает кеш настроек процесса.
+        self.addCleanup(invalidate_solo)
+
+    def test_contact_form_only_enqueues_telegram_message(self):
+        """Проверяет сценарий: contact form only enqueues telegram message."""
+        with FakeTelegramServer() as fake, override_settings(TELEGRAM_API_URL=fake.url):
+            response = self.client.post(
+                '/contact/',
+                {'name': 'Ivan', 'phone': '+7 900', 'message': 'Hello'},
+            )
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(fake.messages, [])
+            self.assertEqual(ContactMessage.objects.count(), 1)
+            self.assertEqual(process_batch()['sent'], 0)
+            # Сообщение Telegram ждет конца окна склейки.
+            OutboxMessage.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(process_batch(), {'sent': 1, 'skipped': 0, 'retried': 0, 'failed': 0})
+            self.assertEqual(len(fake.messages), 1)
+            self.assertEqual(fake.messages[0]['chat_id'], '42')
+        self.assertEqual(OutboxMessage.objects.get().status, STATUS_SENT)
+
+    def test_disabled_telegram_is_not_enqueued(self):
+        """Проверяет сценарий: disabled telegram is not enqueued."""
+        settings = SiteSettings.get_solo()
+        settings.tg_enabled = False
+        settings.save()
+        self.assertIsNone(enqueue_telegram('text'))
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_claimed_messages_are_leased(self):
+        """Проверяет сценарий: claimed messages are leased."""
+        for index in range(3):
+            enqueue_email(EmailMessage(subject=f'S{index}', body='B', to=['a@example.com']))
+        first = claim_batch(2)
+        second = claim_batch(5)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({m.id for m in first} & {m.id for m in second})
+        self.assertEqual(claim_batch(5), [])
+
+    def test_failures_back_off_and_give_up(self):
+        """Проверяет сценарий: failures back off and give up."""
+        enqueue_email(EmailMessage(subject='S', body='B', to=['a@example.com']))
+        self.assertLess(retry_delay(1), retry_delay(2))
+        with patch(LOCMEM_SEND, side_effect=OSError('SMTP down')), \
+                self.assertLogs('integrations.outbox', 'WARNING'):
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                OutboxMessage.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+                process_batch()
+                message = OutboxMessage.objects.get()
+                self.assertEqual(message.attempts, attempt)
+        self.assertEqual(message.status, STATUS_FAILED)
+        self.assertIn('SMTP down', message.last_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_retry_is_sent_once_due(self):
+        """Проверяет сценарий: retry is sent once due."""
+        enqueue_email(EmailMessage(subject='S', body='B', to=['a@example.com']))
+        with patch(LOCMEM_SEND, side_effect=OSError('SMTP down')), \
+                self.assertLogs('integrations.outbox', 'WARNING'):
+            process_batch()
+        self.assertEqual(process_batch()['sent'], 0)
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_batch()['sent'], 1)
+        self.assertEqual(OutboxMessage.objects.get().status, STATUS_SENT)
+        self.assertEqual(len(mail.outbox), 1)
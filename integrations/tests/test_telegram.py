@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from integrations.fake_telegram import FakeTelegramServer
+from integrations.models import STATUS_PENDING, STATUS_SENT, OutboxMessage
+from integrations.outbox import enqueue_telegram, process_batch
+from integrations.telegram import TelegramClient, TelegramError, coalesce_texts
+from site_settings.models import SiteSettings, invalidate_solo
+
+
+class TelegramClientTests(TestCase):
+    """Тесты клиента Telegram на локальной заглушке API."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        self.fake = FakeTelegramServer().start()
+        self.addCleanup(self.fake.stop)
+        self.sleeps = []
+        self.client_api = TelegramClient(
+            'test-token',
+            self.fake.url,
+            sleep=self.sleeps.append,
+            clock=lambda: 0.0,
+        )
+        self.addCleanup(self.client_api.close)
+
+    def test_messages_reuse_one_connection_and_respect_chat_limit(self):
+        """Проверяет сценарий: messages reuse one connection and respect chat limit."""
+        for index in range(3):
+            self.client_api.send_message('42', f'message {index}')
+        self.client_api.send_message('43', 'other chat')
+        self.assertEqual([m['text'] for m in self.fake.messages][:3], ['message 0', 'message 1', 'message 2'])
+        self.assertEqual(self.fake.connections, 1)
+        self.assertEqual(self.sleeps, [1.0, 2.0])
+
+    def test_rate_limited_request_is_retried_after_pause(self):
+        """Проверяет сценарий: rate limited request is retried after pause."""
+        self.fake.rate_limit(2, retry_after=7)
+        with self.assertLogs('integrations.telegram', 'WARNING'):
+            self.client_api.send_message('42', 'hello')
+        self.assertEqual(len(self.fake.messages), 1)
+        self.assertEqual(self.sleeps.count(7), 2)
+
+    def test_errors_are_raised(self):
+        """Проверяет сценарий: errors are raised."""
+        self.fake.rate_limit(10, retry_after=1)
+        with self.assertRaises(TelegramError) as ctx, self.assertLogs('integrations.telegram', 'WARNING'):
+            self.client_api.send_message('42', 'hello')
+        self.assertEqual(ctx.exception.status, 429)
+        bad = TelegramClient('wrong', self.fake.url, sleep=self.sleeps.append)
+        self.addCleanup(bad.close)
+        with self.assertRaises(TelegramError):
+            bad.send_message('42', 'hello')
+
+    def test_timed_out_connection_is_closed_and_replaced(self):
+        """Проверяет сценарий: timed out connection is closed and replaced."""
+        stale = Mock()
+        stale.getresponse.side_effect = TimeoutError('timed out')
+        self.client_api._connection = stale
+        self.client_api.send_message('42', 'hello')
+        stale.close.assert_called_once()
+        self.assertEqual([m['text'] for m in self.fake.messages], ['hello'])
+
+    def test_coalesce_texts_by_window_and_length(self):
+        """Проверяет сценарий: coalesce texts by window and length."""
+        start = datetime(2026, 1, 1, 12, 0)
+        items = [
+            (start, 'a'),
+            (start + timedelta(seconds=5), 'b'),
+            (start + timedelta(seconds=30), 'c'),
+            (start + timedelta(seconds=31), 'x' * 10),
+        ]
+        self.assertEqual(coalesce_texts(items, 10), [[0, 1], [2, 3]])
+        self.assertEqual(coalesce_texts(items, 10, limit=8), [[0, 1], [2], [3]])
+
+
+class TelegramOutboxTests(TestCase):
+    """Тесты отправки очереди Telegram через заглушку API."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.tg_enabled = True
+        settings.tg_bot_token = 'test-token'
+        settings.tg_chat_id = '42'
+        settings.save()
+        # Откат транзакции теста не сбрасывает кеш настроек процесса.
+        self.addCleanup(invalidate_solo)
+        self.fake = FakeTelegramServer().start()
+        self.addCleanup(self.fake.stop)
+
+    def test_burst_is_coalesced_into_one_message(self):
+        """Проверяет сценарий: burst is coalesced into one message."""
+        for index in range(3):
+            enqueue_telegram(f'Новая бронь {index}')
+        late = enqueue_telegram('Позже')
+        OutboxMessage.objects.filter(id=late.id).update(created_at=timezone.now() + timedelta(minutes=1))
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        with override_settings(TELEGRAM_API_URL=self.fake.url), patch('integrations.telegram.time.sleep'):
+            stats = process_batch()
+        self.assertEqual(stats['sent'], 4)
+        self.assertEqual(
+            [m['text'] for m in self.fake.messages],
+            ['Новая бронь 0\n\nНовая бронь 1\n\nНовая бронь 2', 'Позже'],
+        )
+        self.assertEqual(OutboxMessage.objects.filter(status=STATUS_SENT).count(), 4)
+
+    def test_messages_queued_between_worker_passes_are_coalesced(self):
+        """Проверяет сценарий: messages queued between worker passes are coalesced."""
+        start = timezone.now()
+        with override_settings(TELEGRAM_API_URL=self.fake.url, TELEGRAM_COALESCE_SECONDS=10), \
+                patch('integrations.telegram.time.sleep'), patch('django.utils.timezone.now') as now:
+            now.return_value = start
+            first = enqueue_telegram('Первая')
+            now.return_value = start + timedelta(seconds=4)
+            self.assertEqual(process_batch()['sent'], 0)
+            second = enqueue_telegram('Вторая')
+            now.return_value = start + timedelta(seconds=11)
+            self.assertEqual(process_batch()['sent'], 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(second.next_attempt_at, first.next_attempt_at)
+        self.assertEqual([m['text'] for m in self.fake.messages], ['Первая\n\nВторая'])
+
+    def test_unreachable_api_keeps_messages_queued(self):
+        """Проверяет сценарий: unreachable api keeps messages queued."""
+        enqueue_telegram('text')
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        url = self.fake.url
+        self.fake.stop()
+        with override_settings(TELEGRAM_API_URL=url), self.assertLogs('integrations.outbox', 'WARNING'):
+            self.assertEqual(process_batch()['retried'], 1)
+        self.assertEqual(OutboxMessage.objects.get().status, STATUS_PENDING)
@@ -1,12 +1,14 @@
 from django.urls import path
 
+from site_settings.page_cache import cache_public_page
+
 from .views import AboutView, HomeView, PricingView, RulesView
 
 app_name = 'landing'
 
 urlpatterns = [
-    path('', HomeView.as_view(), name='home'),
-    path('about/', AboutView.as_view(), name='about'),
-    path('pricing/', PricingView.as_view(), name='pricing'),
-    path('rules/', RulesView.as_view(), name='rules'),
+    path('', cache_public_page(HomeView.as_view()), name='home'),
+    path('about/', cache_public_page(AboutView.as_view()), name='about'),
+    path('pricing/', cache_public_page(PricingView.as_view()), name='pricing'),
+    path('rules/', cache_public_page(RulesView.as_view()), name='rules'),
 ]
@@ -0,0 +1,23 @@
+import time
+
+from django.core.cache import cache
+
+
+def get_generation(key) -> int:
+    """Читает счетчик поколения из общего кеша, создавая его при первом обращении."""
+    generation = cache.get(key)
+    if generation is None:
+        # Начальное значение зависит от времени: если ключ вытеснен из кеша,
+        # новое поколение не совпадет со старыми и устаревшие данные не вернутся.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        generation = cache.get(key, 0)
+    return generation
+
+
+def bump_generation(key) -> None:
+    """Увеличивает счетчик поколения, делая недействительными данные прежнего поколения."""
+    get_generation(key)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
@@ -8,12 +8,13 @@ from django.db import transaction
 from booking.models import Reservation, Table
 from catalog.models import BoardGame, Product
 from inbox.models import ContactMessage
+from integrations.models import OutboxMessage
 from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
 
 
 class Command(BaseCommand):
     """Очищает все данные приложения (без удаления пользователей)."""
-    help = "Delete all app data (reservations, tables, catalog, messages, settings, schedules)."
+    help = "Delete all app data (reservations, tables, catalog, messages, notifications, settings, schedules)."
 
     def add_arguments(self, parser):
         """Добавляет аргументы командной строки."""
@@ -35,6 +36,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR("Refusing to run without --yes."))
             return
 
+        OutboxMessage.objects.all().delete()
         Reservation.objects.all().delete()
         Table.objects.all().delete()
         BoardGame.objects.all().delete()
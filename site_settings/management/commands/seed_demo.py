@@ -14,8 +14,9 @@ from booking.constants import (
     STATUS_NO_SHOW,
 )
 from booking.models import Reservation, Table
+from booking.schedule import ScheduleIndex
 from booking.services import is_table_available
-from booking.utils import compute_end_time, get_working_window
+from booking.utils import compute_end_time
 from catalog.models import BoardGame, Product
 from inbox.models import ContactMessage
 from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
@@ -225,11 +226,13 @@ class Command(BaseCommand):
         ]
         today = timezone.localdate()
         count_per_day = 3 if not big else 6
+        last_offset = max(1, days)
+        schedule = ScheduleIndex.load(today + timedelta(days=1), today + timedelta(days=last_offset))
 
-        for offset in range(1, max(1, days) + 1):
+        for offset in range(1, last_offset + 1):
             target_date = today + timedelta(days=offset)
             created = 0
-            window = get_working_window(target_date)
+            window = schedule.window_for(target_date)
             if window is None:
                 continue
             open_time, close_time = window
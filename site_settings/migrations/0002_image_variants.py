@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_settings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Варианты логотипа'),
+        ),
+        migrations.AddField(
+            model_name='sitesettings',
+            name='og_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Варианты OG image'),
+        ),
+    ]
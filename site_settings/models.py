@@ -1,6 +1,47 @@
+import copy
+import threading
+
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from .cache import bump_generation, get_generation
+
+SOLO_GENERATION_KEY = 'site_settings:generation'
+
+# Экземпляр настроек, общий для процесса: (поколение, объект).
+_solo_cache = {}
+# Поколение, проверенное в рамках текущего запроса (на поток).
+_request_state = threading.local()
+
+
+def start_request_scope() -> None:
+    """Начинает запрос: поколение настроек будет проверено не более одного раза."""
+    _request_state.active = True
+    _request_state.generation = None
+
+
+def end_request_scope() -> None:
+    """Завершает запрос: вне запросов поколение проверяется при каждом обращении."""
+    _request_state.active = False
+    _request_state.generation = None
+
+
+def invalidate_solo() -> None:
+    """Сбрасывает закешированные настройки во всех процессах."""
+    _solo_cache.clear()
+    _request_state.generation = None
+    bump_generation(SOLO_GENERATION_KEY)
+
+
+def _current_generation() -> int:
+    """Возвращает поколение настроек, обращаясь к общему кешу раз в запрос."""
+    generation = getattr(_request_state, 'generation', None)
+    if generation is None:
+        generation = get_generation(SOLO_GENERATION_KEY)
+        if getattr(_request_state, 'active', False):
+            _request_state.generation = generation
+    return generation
+
 
 class SiteSettings(models.Model):
     """Синглтон-настройки сайта и бронирования."""
@@ -9,9 +50,11 @@ class SiteSettings(models.Model):
     address = models.CharField('Адрес', max_length=255)
     phone = models.CharField('Телефон', max_length=50)
     logo = models.ImageField('Логотип', upload_to='logos/', blank=True)
+    logo_variants = models.JSONField('Варианты логотипа', default=dict, blank=True, editable=False)
     meta_title = models.CharField('Meta title', max_length=255, blank=True)
     meta_description = models.CharField('Meta description', max_length=255, blank=True)
     og_image = models.ImageField('OG image', upload_to='og/', blank=True)
+    og_image_variants = models.JSONField('Варианты OG image', default=dict, blank=True, editable=False)
 
     deposit_amount = models.DecimalField(
         'Депозит',
@@ -55,17 +98,29 @@ class SiteSettings(models.Model):
 
     @classmethod
     def get_solo(cls) -> "SiteSettings":
-        """Возвращает единственный экземпляр настроек сайта."""
+        """Возвращает единственный экземпляр настроек сайта.
+
+        Экземпляр кешируется в процессе и сверяется со счетчиком поколения
+        в общем кеше не чаще раза за запрос; сохранение или удаление настроек
+        увеличивает счетчик. Вызывающий получает копию, которую можно менять.
+        """
+        generation = _current_generation()
+        cached = _solo_cache.get(cls)
+        if cached is not None and cached[0] == generation:
+            return copy.deepcopy(cached[1])
+
         settings = cls.objects.first()
-        if settings:
-            return settings
-        return cls.objects.create(
-            site_name='Антикафе',
-            site_description='Уютное пространство для встреч и игр.',
-            address='',
-            phone='',
-            slot_duration_choices=[60, 120, 180, 240],
-        )
+        if settings is None:
+            settings = cls.objects.create(
+                site_name='Антикафе',
+                site_description='Уютное пространство для встреч и игр.',
+                address='',
+                phone='',
+                slot_duration_choices=[60, 120, 180, 240],
+            )
+            generation = _current_generation()
+        _solo_cache[cls] = (generation, settings)
+        return copy.deepcopy(settings)
 
 
 class WeeklySchedule(models.Model):
@@ -0,0 +1,82 @@
+"""Кеш целых страниц для анонимных посетителей с общим сбросом по поколению."""
+import hashlib
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .cache import bump_generation, get_generation
+
+PAGE_GENERATION_KEY = 'site_settings:pages:generation'
+# Сколько секунд страница хранится на сервере; сброс по поколению наступает раньше.
+PAGE_CACHE_TIMEOUT = 60 * 15
+# Сколько секунд страницу может держать браузер или прокси без повторного запроса.
+BROWSER_MAX_AGE = 60
+# Куки, при которых страница может отличаться от анонимной: сессия и флеш-сообщения.
+PERSONAL_COOKIES = (django_settings.SESSION_COOKIE_NAME, 'messages')
+
+
+def invalidate_public_pages() -> None:
+    """Сбрасывает закешированные страницы во всех процессах."""
+    bump_generation(PAGE_GENERATION_KEY)
+
+
+def _page_key(request, params) -> str:
+    """Возвращает ключ страницы по поколению, языку, пути и разрешенным параметрам.
+
+    Прочие параметры запроса (метки рекламных кампаний, мусор от роботов) на
+    страницу не влияют и в ключ не входят, поэтому не плодят записи в кеше.
+    """
+    query = urlencode(sorted(
+        (name, value) for name in params for value in request.GET.getlist(name) if value
+    ))
+    digest = hashlib.md5(f'{request.path}?{query}'.encode('utf-8')).hexdigest()
+    return f'site_settings:page:{get_generation(PAGE_GENERATION_KEY)}:{translation.get_language()}:{digest}'
+
+
+def _is_cacheable(request) -> bool:
+    """Проверяет, что запрос анонимный и только читает страницу."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return not any(name in request.COOKIES for name in PERSONAL_COOKIES)
+
+
+def cache_public_page(view=None, *, params=()):
+    """Кеширует ответ представления для посетителей без сессии.
+
+    Попадание отдается из кеша до вызова представления и контекстных
+    процессоров, поэтому не выполняет запросов к базе. Запросы с сессией
+    (персонал, флеш-сообщения) обрабатываются как обычно и помечаются private.
+    params — параметры запроса, которые читает представление (фильтры,
+    номер страницы); только они входят в ключ кеша.
+    """
+    if view is None:
+        return partial(cache_public_page, params=params)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        """Отдает страницу из кеша или строит и сохраняет ее."""
+        if not _is_cacheable(request):
+            response = view(request, *args, **kwargs)
+            patch_cache_control(response, private=True)
+            return response
+        key = _page_key(request, params)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response = response.render()
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, (response.content, response['Content-Type']), PAGE_CACHE_TIMEOUT)
+        patch_cache_control(response, public=True, max_age=BROWSER_MAX_AGE)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    return wrapper
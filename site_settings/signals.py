@@ -0,0 +1,26 @@
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SiteSettings, end_request_scope, invalidate_solo, start_request_scope
+from .page_cache import invalidate_public_pages
+
+
+@receiver(request_started)
+def settings_request_started(sender, **kwargs):
+    """Открывает область запроса для кеша настроек."""
+    start_request_scope()
+
+
+@receiver(request_finished)
+def settings_request_finished(sender, **kwargs):
+    """Закрывает область запроса для кеша настроек."""
+    end_request_scope()
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def site_settings_changed(sender, **kwargs):
+    """Сбрасывает кеш настроек и страниц после сохранения из панели персонала или админки."""
+    invalidate_solo()
+    invalidate_public_pages()
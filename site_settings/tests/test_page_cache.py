@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import BoardGame
+from site_settings.models import SiteSettings, invalidate_solo
+
+
+class PublicPageCacheTests(TestCase):
+    """Тесты кеша страниц для анонимных посетителей."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        cache.clear()
+        # Откат транзакции теста не сбрасывает кеш настроек процесса.
+        self.addCleanup(invalidate_solo)
+
+    def test_cache_hit_runs_no_queries(self):
+        """Проверяет сценарий: cache hit runs no queries."""
+        url = reverse('landing:about')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_sets_public_cache_headers(self):
+        """Проверяет сценарий: sets public cache headers."""
+        response = self.client.get(reverse('landing:home'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_settings_change_purges_pages(self):
+        """Проверяет сценарий: settings change purges pages."""
+        url = reverse('landing:home')
+        self.client.get(url)
+        settings = SiteSettings.get_solo()
+        settings.site_name = 'Новое название'
+        settings.save()
+        self.assertContains(self.client.get(url), 'Новое название')
+
+    def test_catalog_change_purges_pages(self):
+        """Проверяет сценарий: catalog change purges pages."""
+        url = reverse('catalog:games')
+        self.assertNotContains(self.client.get(url), 'Каркассон')
+        BoardGame.objects.create(title='Каркассон', players_min=2, players_max=5, is_available=True)
+        self.assertContains(self.client.get(url), 'Каркассон')
+
+    def test_query_string_is_part_of_key(self):
+        """Проверяет сценарий: query string is part of key."""
+        BoardGame.objects.create(title='Дуэль', players_min=2, players_max=2, is_available=True)
+        url = reverse('catalog:games')
+        self.assertContains(self.client.get(url), 'Дуэль')
+        self.assertNotContains(self.client.get(url, {'players': 5}), 'Дуэль')
+
+    def test_unknown_params_share_the_cached_page(self):
+        """Проверяет сценарий: unknown params share the cached page."""
+        url = reverse('catalog:games')
+        first = self.client.get(url, {'players': 2})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'players': 2, 'utm_source': 'ad', 'x': 'random'})
+        self.assertEqual(second.content, first.content)
+        keys = set(cache._cache)
+        self.client.get(url, {'players': 2, 'utm_source': 'other'})
+        self.assertEqual(set(cache._cache), keys)
+
+    def test_session_bypasses_cache(self):
+        """Проверяет сценарий: session bypasses cache."""
+        url = reverse('landing:pricing')
+        self.client.get(url)
+        user = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(user)
+        response = self.client.get(url)
+        self.assertIsNotNone(response.context)
+        self.assertIn('private', response['Cache-Control'])
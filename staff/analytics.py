@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractIsoWeekDay
+
+from booking.models import OccupancyRollup, Table
+from booking.rollups import STATUS_COUNTERS, hour_parts
+from booking.schedule import ScheduleIndex
+
+WEEKDAYS = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+
+
+def _open_minutes(start, end) -> dict:
+    """Возвращает рабочие минуты одного стола по ключу (дата, час) из графика."""
+    minutes = defaultdict(int)
+    for date, window in ScheduleIndex.load(start, end).windows_for(start, end).items():
+        if window is None:
+            continue
+        for part_date, hour, value in hour_parts(date, *window):
+            minutes[part_date, hour] += value
+    return minutes
+
+
+def _percent(part, whole) -> float:
+    """Возвращает долю в процентах с одним знаком после запятой."""
+    return round(100 * part / whole, 1) if whole else 0.0
+
+
+def _row(label, booked, capacity) -> dict:
+    """Собирает строку отчета: подпись, занятые часы и загрузку."""
+    return {'label': label, 'booked_hours': round(booked / 60, 1), 'utilization': _percent(booked, capacity)}
+
+
+def build_analytics(start, end) -> dict:
+    """Строит отчет о загрузке столов за даты [start, end] только по сводкам.
+
+    Брони не читаются: загрузка — это занятые минуты сводок, деленные на
+    рабочие минуты графика, умноженные на число столов.
+    """
+    rollups = OccupancyRollup.objects.filter(date__range=(start, end))
+    open_minutes = _open_minutes(start, end)
+    table_count = Table.objects.filter(is_active=True).count()
+    total_open = sum(open_minutes.values())
+
+    by_table = [
+        _row(row['table__name'], row['booked'], total_open)
+        for row in rollups.values('table__name').annotate(booked=Sum('booked_minutes')).order_by('table__name')
+    ]
+
+    open_by_hour = defaultdict(int)
+    open_by_weekday = defaultdict(int)
+    open_by_date = defaultdict(int)
+    for (date, hour), value in open_minutes.items():
+        open_by_hour[hour] += value
+        open_by_weekday[date.isoweekday()] += value
+        open_by_date[date] += value
+    booked_by_hour = dict(rollups.values_list('hour').annotate(booked=Sum('booked_minutes')).order_by())
+    hours = sorted(set(open_by_hour) | set(booked_by_hour))
+    by_hour = [
+        _row(f'{hour:02d}:00', booked_by_hour.get(hour, 0), open_by_hour[hour] * table_count)
+        for hour in hours
+    ]
+    booked_by_weekday = dict(
+        rollups.annotate(weekday=ExtractIsoWeekDay('date'))
+        .values_list('weekday')
+        .annotate(booked=Sum('booked_minutes'))
+        .order_by()
+    )
+    by_weekday = [
+        _row(label, booked_by_weekday.get(day, 0), open_by_weekday[day] * table_count)
+        for day, label in enumerate(WEEKDAYS, start=1)
+    ]
+    booked_by_date = dict(rollups.values_list('date').annotate(booked=Sum('booked_minutes')).order_by())
+    by_date = [
+        _row(date, booked_by_date.get(date, 0), open_by_date[date] * table_count)
+        for date in sorted(set(open_by_date) | set(booked_by_date))
+    ]
+
+    totals = rollups.aggregate(
+        booked=Sum('booked_minutes'),
+        **{counter: Sum(counter) for counter in STATUS_COUNTERS.values()},
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    reservations = sum(totals[counter] for counter in STATUS_COUNTERS.values())
+    not_cancelled = reservations - totals['cancelled_count']
+    return {
+        'by_table': by_table,
+        'by_hour': by_hour,
+        'by_weekday': by_weekday,
+        'by_date': by_date,
+        'reservations': reservations,
+        'utilization': _percent(totals['booked'], total_open * table_count),
+        'cancellation_rate': _percent(totals['cancelled_count'], reservations),
+        'no_show_rate': _percent(totals['no_show_count'], not_cancelled),
+    }
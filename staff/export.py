@@ -0,0 +1,220 @@
+"""Потоковая выгрузка броней в CSV и XLSX с постоянным расходом памяти."""
+import csv
+import re
+import zipfile
+from datetime import date, datetime, time
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from booking.constants import RESERVATION_STATUSES
+from booking.models import Reservation
+
+from .search import filter_reservations
+
+# Заголовок колонки и поле values_list в порядке вывода.
+COLUMNS = [
+    ('Дата', 'date'),
+    ('Начало', 'start_time'),
+    ('Окончание', 'end_time'),
+    ('Стол', 'table__name'),
+    ('Мест', 'seats'),
+    ('Имя', 'customer_name'),
+    ('Email', 'customer_email'),
+    ('Статус', 'status'),
+    ('Код билета', 'public_code'),
+    ('Комментарий', 'comment'),
+    ('Создано', 'created_at'),
+]
+CHUNK_SIZE = 2000
+# Сколько байт архива копить перед отдачей очередного куска ответа.
+XLSX_FLUSH_BYTES = 64 * 1024
+
+STATUS_LABELS = dict(RESERVATION_STATUSES)
+# Excel исполняет ячейку CSV, начинающуюся с этих символов, как формулу.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def export_rows(filters):
+    """Возвращает итератор строк выгрузки, читающий брони из БД порциями."""
+    reservations = filter_reservations(Reservation.objects.all(), filters).order_by('date', 'start_time', 'id')
+    fields = [field for _, field in COLUMNS]
+    status_index = fields.index('status')
+    created_index = fields.index('created_at')
+    for row in reservations.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        row = list(row)
+        row[status_index] = STATUS_LABELS.get(row[status_index], row[status_index])
+        row[created_index] = timezone.localtime(row[created_index]).replace(tzinfo=None, microsecond=0)
+        yield row
+
+
+class _Echo:
+    """Псевдофайл, возвращающий записанную строку вместо буферизации."""
+
+    def write(self, value):
+        """Возвращает переданное значение."""
+        return value
+
+
+def _csv_value(value):
+    """Готовит значение ячейки CSV и обезвреживает строки-формулы."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return value
+
+
+def stream_csv(rows):
+    """Отдает CSV построчно; BOM в начале нужен Excel для распознавания UTF-8."""
+    writer = csv.writer(_Echo(), delimiter=';')
+    yield '\ufeff' + writer.writerow([header for header, _ in COLUMNS])
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+class _Pipe:
+    """Несматываемый поток для zipfile: копит записанные байты до выдачи наружу."""
+
+    def __init__(self):
+        """Создает пустой буфер."""
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        """Добавляет байты в буфер."""
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        """Ничего не делает: данные забирает drain."""
+
+    def drain(self) -> bytes:
+        """Возвращает накопленные байты и очищает буфер."""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Бронирования" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Стили ячеек: 0 — обычный, 1 — дата, 2 — время, 3 — дата и время.
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd.mm.yyyy hh:mm"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+    '<cellXfs count="4"><xf/>'
+    '<xf numFmtId="14" applyNumberFormat="1"/>'
+    '<xf numFmtId="20" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value) -> str:
+    """Возвращает XML ячейки: даты и время — числами Excel со стилем, текст — inline."""
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        seconds = value.hour * 3600 + value.minute * 60 + value.second
+        serial = (value.date() - EXCEL_EPOCH).days + seconds / 86400
+        return f'<c s="3"><v>{serial!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c s="1"><v>{(value - EXCEL_EPOCH).days}</v></c>'
+    if isinstance(value, time):
+        seconds = value.hour * 3600 + value.minute * 60 + value.second
+        return f'<c s="2"><v>{seconds / 86400!r}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values) -> bytes:
+    """Возвращает XML строки листа."""
+    return ('<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>').encode('utf-8')
+
+
+def stream_xlsx(rows):
+    """Отдает XLSX кусками по мере записи строк листа.
+
+    Архив пишется в несматываемый поток, поэтому zipfile ставит дескрипторы
+    данных после каждого файла и не возвращается к заголовкам: ни лист, ни
+    архив целиком не держатся в памяти.
+    """
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', XLSX_STYLES)
+        yield pipe.drain()
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(XLSX_SHEET_HEAD.encode('utf-8'))
+            sheet.write(_xlsx_row(header for header, _ in COLUMNS))
+            for row in rows:
+                sheet.write(_xlsx_row(row))
+                if pipe.size >= XLSX_FLUSH_BYTES:
+                    yield pipe.drain()
+            sheet.write(XLSX_SHEET_TAIL.encode('utf-8'))
+    yield pipe.drain()
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
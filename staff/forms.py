@@ -1,5 +1,6 @@
 from django import forms
 
+from booking.constants import RESERVATION_STATUSES
 from booking.models import Reservation, Table
 from catalog.models import BoardGame, Product
 from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
@@ -21,6 +22,50 @@ class ReservationStatusForm(forms.ModelForm):
         fields = ['status']
 
 
+class ReservationSearchForm(forms.Form):
+    """Форма фильтров и поиска в списке броней."""
+    date_from = forms.DateField(label='С', required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(label='По', required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    status = forms.MultipleChoiceField(
+        label='Статусы',
+        choices=RESERVATION_STATUSES,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+    table = forms.ModelChoiceField(
+        label='Стол',
+        queryset=Table.objects.order_by('name'),
+        required=False,
+        empty_label='Все столы',
+    )
+    q = forms.CharField(label='Поиск', required=False, max_length=150)
+
+    def clean(self):
+        """Проверяет, что диапазон дат не перевернут."""
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            raise forms.ValidationError('Дата окончания раньше даты начала.')
+        return cleaned_data
+
+
+class ReservationImportForm(forms.Form):
+    """Форма загрузки файла с бронями."""
+    file = forms.FileField(label='Файл CSV или JSON')
+    dry_run = forms.BooleanField(label='Только проверить, ничего не сохранять', required=False)
+
+    def clean_file(self):
+        """Читает файл как UTF-8 и определяет формат по расширению."""
+        upload = self.cleaned_data['file']
+        try:
+            content = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise forms.ValidationError('Файл должен быть в кодировке UTF-8.')
+        self.cleaned_data['format'] = 'json' if upload.name.lower().endswith('.json') else 'csv'
+        return content
+
+
 class BoardGameForm(forms.ModelForm):
     """Форма редактирования настольной игры."""
     class Meta:
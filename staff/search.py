@@ -0,0 +1,69 @@
+from datetime import date, time
+
+from django.db.models import Q
+
+from booking.models import Reservation
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(reservation) -> str:
+    """Возвращает курсор страницы после указанной брони."""
+    return f'{reservation.date.isoformat()}_{reservation.start_time.isoformat()}_{reservation.id}'
+
+
+def decode_cursor(value):
+    """Разбирает курсор в кортеж (дата, время, id) или возвращает None."""
+    try:
+        raw_date, raw_time, raw_id = value.split('_')
+        return date.fromisoformat(raw_date), time.fromisoformat(raw_time), int(raw_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _after(cursor) -> Q:
+    """Возвращает условие «строго после курсора» в порядке (дата, начало, id).
+
+    Граница date >= дата курсора дает PostgreSQL сканировать составной индекс
+    с нужного места, а не с начала истории.
+    """
+    cursor_date, cursor_time, cursor_id = cursor
+    return Q(date__gte=cursor_date) & (
+        Q(date__gt=cursor_date)
+        | Q(start_time__gt=cursor_time)
+        | Q(start_time=cursor_time, id__gt=cursor_id)
+    )
+
+
+def filter_reservations(reservations, filters):
+    """Применяет к queryset броней фильтры формы поиска."""
+    if filters.get('date_from'):
+        reservations = reservations.filter(date__gte=filters['date_from'])
+    if filters.get('date_to'):
+        reservations = reservations.filter(date__lte=filters['date_to'])
+    if filters.get('status'):
+        reservations = reservations.filter(status__in=filters['status'])
+    if filters.get('table'):
+        reservations = reservations.filter(table=filters['table'])
+    query = (filters.get('q') or '').strip()
+    if query:
+        reservations = reservations.filter(
+            Q(customer_name__icontains=query)
+            | Q(customer_email__icontains=query)
+            | Q(public_code=query.upper())
+        )
+    return reservations
+
+
+def search_reservations(filters, cursor=None, page_size=PAGE_SIZE) -> dict:
+    """Возвращает страницу броней по фильтрам и курсор следующей страницы."""
+    reservations = filter_reservations(Reservation.objects.select_related('table'), filters)
+    if cursor is not None:
+        reservations = reservations.filter(_after(cursor))
+    page = list(reservations.order_by('date', 'start_time', 'id')[:page_size + 1])
+    has_next = len(page) > page_size
+    page = page[:page_size]
+    return {
+        'reservations': page,
+        'next_cursor': encode_cursor(page[-1]) if has_next else None,
+    }
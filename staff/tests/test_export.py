@@ -0,0 +1,133 @@
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from datetime import time, timedelta
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED
+from booking.models import Reservation, Table
+from staff.export import EXCEL_EPOCH, export_rows, stream_csv
+
+SHEET_NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+class StaffExportTests(TestCase):
+    """Тесты потоковой выгрузки броней."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.tables = [
+            Table.objects.create(name=f"T{index}", capacity=4, is_active=True)
+            for index in range(3)
+        ]
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+
+    def _reserve(self, table, start, status=STATUS_CONFIRMED, name=None, date=None):
+        """Создает бронь напрямую, без валидации."""
+        count = Reservation.objects.count()
+        return Reservation.objects.bulk_create([
+            Reservation(
+                table=table,
+                date=date or self.date,
+                start_time=start,
+                duration_minutes=60,
+                end_time=time(start.hour + 1, start.minute),
+                seats=2,
+                customer_name=name or f"Guest {count}",
+                customer_email="guest@example.com",
+                status=status,
+                public_code=f"EX{count:06d}",
+            )
+        ])[0]
+
+    def test_csv_streams_filtered_rows(self):
+        """Проверяет сценарий: csv streams filtered rows."""
+        first = self._reserve(self.tables[0], time(10, 0), name="=HYPERLINK(1)")
+        self._reserve(self.tables[1], time(10, 0), status=STATUS_CANCELLED)
+        self._reserve(self.tables[0], time(10, 0), date=self.date + timedelta(days=3))
+        response = self.client.get(reverse('staff:reservations_export'), {
+            'date_from': self.date.isoformat(),
+            'date_to': self.date.isoformat(),
+            'status': STATUS_CONFIRMED,
+            'format': 'csv',
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content), delimiter=';'))
+        self.assertEqual(rows[0][0], 'Дата')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], self.date.isoformat())
+        self.assertEqual(rows[1][3], 'T0')
+        self.assertEqual(rows[1][5], "'=HYPERLINK(1)")
+        self.assertEqual(rows[1][8], first.public_code)
+
+    def test_xlsx_is_valid_workbook(self):
+        """Проверяет сценарий: xlsx is valid workbook."""
+        for hour in range(9, 20):
+            self._reserve(self.tables[hour % 3], time(hour, 30), name=f"Гость <{hour}> & Co")
+        response = self.client.get(reverse('staff:reservations_export'), {
+            'date_from': self.date.isoformat(),
+            'format': 'xlsx',
+        })
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        self.assertIn('xl/workbook.xml', archive.namelist())
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        rows = sheet.findall('s:sheetData/s:row', SHEET_NS)
+        self.assertEqual(len(rows), 12)
+        cells = rows[1].findall('s:c', SHEET_NS)
+        self.assertEqual(cells[0].get('s'), '1')
+        self.assertEqual(int(cells[0].find('s:v', SHEET_NS).text), (self.date - EXCEL_EPOCH).days)
+        self.assertEqual(float(cells[1].find('s:v', SHEET_NS).text), (9 * 60 + 30) / 1440)
+        self.assertEqual(cells[5].find('s:is/s:t', SHEET_NS).text, 'Гость <9> & Co')
+
+    def test_invalid_format_redirects_back(self):
+        """Проверяет сценарий: invalid format redirects back."""
+        response = self.client.get(reverse('staff:reservations_export'), {'format': 'pdf'})
+        self.assertRedirects(response, reverse('staff:reservations'))
+
+    def test_export_reads_rows_in_one_query(self):
+        """Проверяет сценарий: export reads rows in one query."""
+        self._reserve(self.tables[0], time(10, 0))
+        with CaptureQueriesContext(connection) as few:
+            list(stream_csv(export_rows({})))
+        for hour in range(11, 20):
+            for table in self.tables:
+                self._reserve(table, time(hour, 0))
+        with CaptureQueriesContext(connection) as many:
+            rows = list(stream_csv(export_rows({})))
+        self.assertEqual(len(rows), 29)
+        self.assertEqual(len(few), len(many))
+
+    def test_command_writes_files(self):
+        """Проверяет сценарий: command writes files."""
+        self._reserve(self.tables[0], time(10, 0))
+        self._reserve(self.tables[1], time(11, 0))
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'out.csv')
+            xlsx_path = os.path.join(directory, 'out.xlsx')
+            call_command(
+                'export_reservations', '--table', str(self.tables[1].id), '--output', csv_path,
+                stderr=io.StringIO(),
+            )
+            call_command('export_reservations', '--format', 'xlsx', '--output', xlsx_path, stderr=io.StringIO())
+            with open(csv_path, encoding='utf-8-sig') as handle:
+                rows = list(csv.reader(handle, delimiter=';'))
+            with zipfile.ZipFile(xlsx_path) as archive:
+                sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][3], 'T1')
+        self.assertEqual(len(sheet.findall('s:sheetData/s:row', SHEET_NS)), 3)
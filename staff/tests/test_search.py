@@ -0,0 +1,144 @@
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED, STATUS_NEW
+from booking.models import Reservation, Table
+from staff.search import PAGE_SIZE, decode_cursor, encode_cursor, search_reservations
+
+
+class StaffReservationSearchTests(TestCase):
+    """Тесты поиска и постраничной навигации по броням для персонала."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.tables = [
+            Table.objects.create(name=f"T{index}", capacity=4, is_active=True)
+            for index in range(3)
+        ]
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+
+    def _reserve(self, table, start, date=None, status=STATUS_CONFIRMED, name=None, email="guest@example.com"):
+        """Создает бронь напрямую, без валидации."""
+        count = Reservation.objects.count()
+        return Reservation.objects.bulk_create([
+            Reservation(
+                table=table,
+                date=date or self.date,
+                start_time=start,
+                duration_minutes=60,
+                end_time=time(start.hour + 1, start.minute),
+                seats=2,
+                customer_name=name or f"Guest {count}",
+                customer_email=email,
+                status=status,
+                public_code=f"SR{count:06d}",
+            )
+        ])[0]
+
+    def _walk(self, filters, page_size):
+        """Проходит все страницы поиска и возвращает id броней по порядку."""
+        ids = []
+        cursor = None
+        while True:
+            page = search_reservations(filters, cursor, page_size)
+            ids.extend(reservation.id for reservation in page['reservations'])
+            if page['next_cursor'] is None:
+                return ids
+            cursor = decode_cursor(page['next_cursor'])
+
+    def test_pages_cover_ties_without_gaps_or_duplicates(self):
+        """Проверяет сценарий: pages cover ties without gaps or duplicates."""
+        created = []
+        for hour in (10, 12, 14):
+            for table in self.tables:
+                created.append(self._reserve(table, time(hour, 0)))
+        created.append(self._reserve(self.tables[0], time(9, 0), date=self.date + timedelta(days=1)))
+        expected = [
+            reservation.id
+            for reservation in sorted(created, key=lambda item: (item.date, item.start_time, item.id))
+        ]
+        self.assertEqual(self._walk({}, page_size=2), expected)
+        self.assertEqual(self._walk({}, page_size=len(expected)), expected)
+
+    def test_filters_narrow_results(self):
+        """Проверяет сценарий: filters narrow results."""
+        inside = self._reserve(self.tables[0], time(10, 0), status=STATUS_NEW)
+        self._reserve(self.tables[1], time(10, 0), status=STATUS_CANCELLED)
+        self._reserve(self.tables[0], time(10, 0), date=self.date + timedelta(days=5), status=STATUS_NEW)
+        filters = {
+            'date_from': self.date,
+            'date_to': self.date + timedelta(days=1),
+            'status': [STATUS_NEW],
+            'table': self.tables[0],
+        }
+        self.assertEqual(self._walk(filters, page_size=10), [inside.id])
+
+    def test_query_matches_name_email_and_code(self):
+        """Проверяет сценарий: query matches name email and code."""
+        by_name = self._reserve(self.tables[0], time(10, 0), name="Мария Иванова")
+        by_email = self._reserve(self.tables[1], time(10, 0), email="Maria@Example.com")
+        other = self._reserve(self.tables[2], time(10, 0), name="Петр")
+        self.assertEqual(self._walk({'q': 'Иванов'}, page_size=10), [by_name.id])
+        self.assertEqual(self._walk({'q': 'maria@'}, page_size=10), [by_email.id])
+        self.assertEqual(self._walk({'q': other.public_code.lower()}, page_size=10), [other.id])
+
+    def test_invalid_cursor_is_ignored(self):
+        """Проверяет сценарий: invalid cursor is ignored."""
+        reservation = self._reserve(self.tables[0], time(10, 0))
+        self.assertIsNone(decode_cursor('broken'))
+        self.assertEqual(
+            decode_cursor(encode_cursor(reservation)),
+            (reservation.date, reservation.start_time, reservation.id),
+        )
+        response = self.client.get(reverse('staff:reservations'), {'after': 'broken'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['reservations']), [reservation])
+
+    def test_list_view_links_next_page(self):
+        """Проверяет сценарий: list view links next page."""
+        for offset in range(2):
+            for hour in range(9, 20):
+                for table in self.tables:
+                    self._reserve(table, time(hour, 0), date=self.date + timedelta(days=offset))
+        url = reverse('staff:reservations')
+        response = self.client.get(url, {'date_from': self.date.isoformat()})
+        self.assertEqual(len(response.context['reservations']), PAGE_SIZE)
+        self.assertTrue(response.context['is_first_page'])
+        self.assertIn('after=', response.context['next_query'])
+        second = self.client.get(f"{url}?{response.context['next_query']}")
+        self.assertEqual(len(second.context['reservations']), 66 - PAGE_SIZE)
+        self.assertIsNone(second.context['next_query'])
+        self.assertFalse(second.context['is_first_page'])
+
+    def test_reversed_date_range_is_rejected(self):
+        """Проверяет сценарий: reversed date range is rejected."""
+        self._reserve(self.tables[0], time(10, 0))
+        response = self.client.get(reverse('staff:reservations'), {
+            'date_from': (self.date + timedelta(days=1)).isoformat(),
+            'date_to': self.date.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['form'].is_valid())
+        self.assertEqual(response.context['reservations'], [])
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        """Проверяет сценарий: list queries do not grow with rows."""
+        url = reverse('staff:reservations')
+        params = {'date_from': self.date.isoformat()}
+        self._reserve(self.tables[0], time(10, 0))
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url, params)
+        for hour in range(11, 20):
+            for table in self.tables:
+                self._reserve(table, time(hour, 0))
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url, params)
+        self.assertEqual(len(few), len(many))
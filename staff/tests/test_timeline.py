@@ -0,0 +1,107 @@
+from datetime import date as date_cls
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.constants import STATUS_CANCELLED, STATUS_CONFIRMED
+from booking.models import Reservation, Table
+from site_settings.models import SiteSettings, WeeklySchedule
+from staff.timeline import build_timeline
+
+
+class StaffTimelineTests(TestCase):
+    """Тесты сетки броней для персонала."""
+    def setUp(self):
+        """Готовит тестовые данные для сценариев."""
+        settings = SiteSettings.get_solo()
+        settings.min_notice_minutes = 0
+        settings.save()
+        WeeklySchedule.objects.all().delete()
+        self.date = timezone.localdate() + timedelta(days=1)
+        WeeklySchedule.objects.create(
+            day_of_week=self.date.weekday(),
+            is_open=True,
+            open_time=time(10, 0),
+            close_time=time(14, 0),
+        )
+        self.first = Table.objects.create(name="A", capacity=2, is_active=True)
+        self.second = Table.objects.create(name="B", capacity=4, is_active=True)
+        staff = get_user_model().objects.create_user('staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+
+    def _reserve(self, table, start, end, status=STATUS_CONFIRMED, date=None):
+        """Создает бронь напрямую, без валидации."""
+        count = Reservation.objects.count()
+        return Reservation.objects.bulk_create([
+            Reservation(
+                table=table,
+                date=date or self.date,
+                start_time=start,
+                duration_minutes=60,
+                end_time=end,
+                seats=2,
+                customer_name=f"Guest {count}",
+                customer_email="guest@example.com",
+                status=status,
+                public_code=f"TL{count:06d}",
+            )
+        ])[0]
+
+    def test_bookings_span_columns_and_gaps_stay_free(self):
+        """Проверяет сценарий: bookings span columns and gaps stay free."""
+        booking = self._reserve(self.first, time(10, 30), time(12, 0))
+        self._reserve(self.first, time(12, 0), time(13, 0), status=STATUS_CANCELLED)
+        timeline = build_timeline(self.date)
+        self.assertEqual(len(timeline['columns']), 8)
+        first_row, second_row = timeline['rows']
+        self.assertEqual(first_row['table'], self.first)
+        self.assertIsNone(first_row['cells'][0]['reservation'])
+        self.assertEqual(first_row['cells'][1]['reservation'], booking)
+        self.assertEqual(first_row['cells'][1]['span'], 3)
+        self.assertEqual(len(first_row['cells']), 6)
+        self.assertEqual(sum(cell.get('span', 1) for cell in first_row['cells']), 8)
+        self.assertEqual(len(second_row['cells']), 8)
+
+    def test_timeline_queries_do_not_grow_with_reservations(self):
+        """Проверяет сценарий: timeline queries do not grow with reservations."""
+        self._reserve(self.first, time(10, 0), time(11, 0))
+        url = f'/staff/timeline/?date={self.date.isoformat()}'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+        for index in range(20):
+            table = Table.objects.create(name=f"X{index}", capacity=4, is_active=True)
+            self._reserve(table, time(11, 0), time(12, 30))
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(url)
+        self.assertEqual(len(after), len(before))
+        self.assertContains(response, 'timeline-status-confirmed', count=21)
+        self.assertContains(response, f'?date={(self.date + timedelta(days=1)).isoformat()}')
+
+    def test_closed_day_and_invalid_date(self):
+        """Проверяет сценарий: closed day and invalid date."""
+        closed = self.date + timedelta(days=1)
+        response = self.client.get(f'/staff/timeline/?date={closed.isoformat()}')
+        self.assertContains(response, 'заведение закрыто')
+        response = self.client.get('/staff/timeline/?date=nope')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['selected_date'], timezone.localdate())
+
+    def test_dashboard_loads_tables_with_reservations(self):
+        """Проверяет сценарий: dashboard loads tables with reservations."""
+        today = date_cls.today()
+        self._reserve(self.first, time(10, 0), time(11, 0), date=today)
+        self.client.get('/staff/')
+        with CaptureQueriesContext(connection) as before:
+            self.client.get('/staff/')
+        for index in range(10):
+            table = Table.objects.create(name=f"D{index}", capacity=4, is_active=True)
+            self._reserve(table, time(10, 0), time(11, 0), date=today)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get('/staff/')
+        self.assertEqual(len(after), len(before))
+        self.assertContains(response, 'D9')
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from booking.constants import STATUS_CANCELLED
+from booking.models import Reservation, Table
+from booking.utils import get_working_window
+
+
+def _minutes(value) -> int:
+    """Переводит время в минуты от начала суток."""
+    return value.hour * 60 + value.minute
+
+
+def _columns(date, window, step_minutes) -> list:
+    """Возвращает времена начала колонок рабочего окна с заданным шагом."""
+    open_time, close_time = window
+    current = datetime.combine(date, open_time)
+    close = datetime.combine(date, close_time)
+    step = timedelta(minutes=step_minutes)
+    columns = []
+    while current < close:
+        columns.append(current.time())
+        current += step
+    return columns
+
+
+def _span(reservation, open_minutes, step_minutes, count) -> tuple:
+    """Возвращает диапазон колонок [начало, конец), который занимает бронь."""
+    start = _minutes(reservation.start_time) - open_minutes
+    end = _minutes(reservation.end_time) - open_minutes
+    if reservation.end_time <= reservation.start_time:
+        # Бронь до следующего дня занимает колонки до конца окна.
+        end = count * step_minutes
+    first = max(start // step_minutes, 0)
+    last = min(-(-end // step_minutes), count)
+    return first, last
+
+
+def build_timeline(date, step_minutes=30) -> dict:
+    """Строит сетку «столы × время» на дату из одного запроса броней со столами.
+
+    Каждая строка — активный стол и его ячейки: бронь занимает ячейку
+    с colspan на свою длительность, свободный шаг — отдельную пустую ячейку.
+    """
+    window = get_working_window(date)
+    tables = list(Table.objects.filter(is_active=True).order_by('name'))
+    if window is None:
+        return {'window': None, 'columns': [], 'rows': [{'table': table, 'cells': []} for table in tables]}
+
+    columns = _columns(date, window, step_minutes)
+    open_minutes = _minutes(window[0])
+    reservations = (
+        Reservation.objects.filter(date=date)
+        .exclude(status=STATUS_CANCELLED)
+        .select_related('table')
+        .order_by('start_time', 'id')
+    )
+    by_table = {}
+    known = {table.id for table in tables}
+    for reservation in reservations:
+        by_table.setdefault(reservation.table_id, []).append(reservation)
+        if reservation.table_id not in known:
+            # Бронь за столом, который позже сделали неактивным, тоже должна быть видна.
+            known.add(reservation.table_id)
+            tables.append(reservation.table)
+
+    rows = []
+    for table in tables:
+        cells = []
+        position = 0
+        for reservation in by_table.get(table.id, []):
+            first, last = _span(reservation, open_minutes, step_minutes, len(columns))
+            first = max(first, position)
+            if last <= first:
+                continue
+            cells.extend({'time': columns[index], 'reservation': None} for index in range(position, first))
+            cells.append({'time': columns[first], 'reservation': reservation, 'span': last - first})
+            position = last
+        cells.extend({'time': columns[index], 'reservation': None} for index in range(position, len(columns)))
+        rows.append({'table': table, 'cells': cells})
+    return {'window': window, 'columns': columns, 'rows': rows}
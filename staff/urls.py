@@ -6,8 +6,14 @@ app_name = 'staff'
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
+    path('timeline/', views.timeline, name='timeline'),
+    path('analytics/', views.analytics, name='analytics'),
+    path('checkin/', views.checkin, name='checkin'),
+    path('checkin/api/', views.checkin_api, name='checkin_api'),
     path('reservations/', views.reservations_list, name='reservations'),
+    path('reservations/export/', views.reservations_export, name='reservations_export'),
     path('reservations/<int:reservation_id>/status/', views.reservation_status, name='reservation_status'),
+    path('reservations/import/', views.reservations_import, name='reservations_import'),
     path('reservations/manual/', views.manual_booking, name='manual_booking'),
     path('tables/', views.table_list, name='tables'),
     path('tables/<int:table_id>/', views.table_edit, name='table_edit'),
@@ -1,26 +1,48 @@
 from datetime import date as date_cls
+from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
+from django.views.decorators.http import require_POST
+
+from booking.checkin import (
+    RESULT_ALREADY,
+    RESULT_CHECKED_IN,
+    RESULT_INVALID,
+    RESULT_NOT_FOUND,
+    RESULT_WRONG_DATE,
+    check_in,
+)
 from booking.constants import RESERVATION_STATUSES
 from booking.forms import ReservationForm
+from booking.importer import import_reservations, read_rows
 from booking.models import Reservation, Table
+from booking.notifications import STATUS_EMAIL_STATUSES, build_status_email
+from booking.services import save_reservation
 from catalog.models import BoardGame, Product
 from inbox.models import ContactMessage
-from integrations.telegram import send_telegram_message
+from integrations.outbox import KIND_STATUS, enqueue_email, enqueue_telegram
 from site_settings.models import SiteSettings, SpecialDay, WeeklySchedule
 
+from .analytics import build_analytics
+from .export import FORMATS, export_rows
 from .forms import (
     BoardGameForm,
     ProductForm,
+    ReservationImportForm,
+    ReservationSearchForm,
     ReservationStatusForm,
     SiteSettingsForm,
     SpecialDayForm,
     TableForm,
     WeeklyScheduleForm,
 )
+from .search import decode_cursor, search_reservations
+from .timeline import build_timeline
 
 
 def staff_required(view):
@@ -32,30 +54,100 @@ def staff_required(view):
 def dashboard(request):
     """Показывает дашборд с бронями на сегодня."""
     today = date_cls.today()
-    reservations = Reservation.objects.filter(date=today).order_by('start_time')
+    reservations = Reservation.objects.filter(date=today).select_related('table').order_by('start_time')
     return render(request, 'staff/dashboard.html', {'reservations': reservations, 'today': today})
 
 
+@staff_required
+def timeline(request):
+    """Показывает сетку броней «столы × время» на выбранную дату."""
+    try:
+        selected_date = date_cls.fromisoformat(request.GET.get('date', ''))
+    except ValueError:
+        selected_date = date_cls.today()
+    context = build_timeline(selected_date)
+    context.update({
+        'selected_date': selected_date,
+        'previous_date': selected_date - timedelta(days=1),
+        'next_date': selected_date + timedelta(days=1),
+        'today': date_cls.today(),
+    })
+    return render(request, 'staff/timeline.html', context)
+
+
+@staff_required
+def analytics(request):
+    """Показывает загрузку столов, часов и дней недели и доли отмен и неявок."""
+    today = date_cls.today()
+    try:
+        date_to = date_cls.fromisoformat(request.GET.get('date_to', ''))
+    except ValueError:
+        date_to = today
+    try:
+        date_from = date_cls.fromisoformat(request.GET.get('date_from', ''))
+    except ValueError:
+        date_from = date_to - timedelta(days=29)
+    if date_from > date_to:
+        date_from, date_to = date_to, date_from
+    context = build_analytics(date_from, date_to)
+    context.update({
+        'date_from': date_from,
+        'date_to': date_to,
+        'sections': [
+            ('По столам', context['by_table']),
+            ('По часам', context['by_hour']),
+            ('По дням недели', context['by_weekday']),
+        ],
+    })
+    return render(request, 'staff/analytics.html', context)
+
+
 @staff_required
 def reservations_list(request):
-    """Показывает список броней с фильтрами."""
-    selected_date = request.GET.get('date') or date_cls.today().isoformat()
-    status = request.GET.get('status')
-    reservations = Reservation.objects.filter(date=selected_date)
-    if status:
-        reservations = reservations.filter(status=status)
-    reservations = reservations.order_by('start_time')
+    """Показывает список броней с фильтрами, поиском и постраничной навигацией по курсору."""
+    data = request.GET.copy()
+    data.pop('after', None)
+    if not data:
+        data['date_from'] = date_cls.today().isoformat()
+    form = ReservationSearchForm(data)
+    filters = form.cleaned_data if form.is_valid() else None
+    page = {'reservations': [], 'next_cursor': None}
+    if filters is not None:
+        page = search_reservations(filters, decode_cursor(request.GET.get('after')))
+    next_query = None
+    if page['next_cursor']:
+        params = data.copy()
+        params['after'] = page['next_cursor']
+        next_query = params.urlencode()
     return render(
         request,
         'staff/reservations_list.html',
         {
-            'reservations': reservations,
-            'selected_date': selected_date,
+            'form': form,
+            'reservations': page['reservations'],
+            'next_query': next_query,
+            'first_query': data.urlencode(),
+            'is_first_page': 'after' not in request.GET,
             'status_choices': RESERVATION_STATUSES,
         },
     )
 
 
+@staff_required
+def reservations_export(request):
+    """Отдает брони по фильтрам списка потоком в CSV или XLSX."""
+    export_format = request.GET.get('format', 'csv')
+    form = ReservationSearchForm(request.GET)
+    if export_format not in FORMATS or not form.is_valid():
+        messages.error(request, 'Неверные параметры выгрузки.')
+        return redirect('staff:reservations')
+    stream, content_type = FORMATS[export_format]
+    response = StreamingHttpResponse(stream(export_rows(form.cleaned_data)), content_type=content_type)
+    filename = f'reservations-{date_cls.today():%Y%m%d}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @staff_required
 def reservation_status(request, reservation_id):
     """Обновляет статус брони и отправляет уведомление."""
@@ -63,14 +155,70 @@ def reservation_status(request, reservation_id):
     if request.method == 'POST':
         form = ReservationStatusForm(request.POST, instance=reservation)
         if form.is_valid():
-            form.save()
-            send_telegram_message(
-                f'Статус брони изменен: {reservation.public_code} -> {reservation.get_status_display()}'
-            )
+            with transaction.atomic():
+                form.save()
+                enqueue_telegram(
+                    f'Статус брони изменен: {reservation.public_code} -> {reservation.get_status_display()}',
+                    reservation=reservation,
+                )
+                if form.has_changed() and reservation.status in STATUS_EMAIL_STATUSES:
+                    enqueue_email(build_status_email(reservation), KIND_STATUS, reservation)
             messages.success(request, 'Статус обновлен.')
     return redirect('staff:reservations')
 
 
+# HTTP-статус ответа сканеру по результату отметки.
+CHECKIN_STATUS_CODES = {
+    RESULT_CHECKED_IN: 200,
+    RESULT_ALREADY: 200,
+    RESULT_WRONG_DATE: 409,
+    RESULT_INVALID: 409,
+    RESULT_NOT_FOUND: 404,
+}
+
+
+@staff_required
+def checkin(request):
+    """Показывает страницу сканера и отмечает приход гостя по коду билета.
+
+    Запрос со страницы через fetch получает только HTML-фрагмент с результатом.
+    """
+    result = None
+    if request.method == 'POST':
+        result = check_in(request.POST.get('code', ''))
+        if request.headers.get('X-Requested-With') == 'fetch':
+            return render(
+                request, 'staff/checkin_result.html', {'result': result},
+                status=CHECKIN_STATUS_CODES[result['result']],
+            )
+    return render(request, 'staff/checkin.html', {'result': result})
+
+
+@staff_required
+@require_POST
+def checkin_api(request):
+    """Отмечает приход гостя по коду билета и возвращает компактный JSON."""
+    result = check_in(request.POST.get('code', ''))
+    return JsonResponse(result, status=CHECKIN_STATUS_CODES[result['result']])
+
+
+@staff_required
+def reservations_import(request):
+    """Загружает брони из CSV или JSON и показывает ошибки по строкам."""
+    form = ReservationImportForm(request.POST or None, request.FILES or None)
+    report = None
+    if request.method == 'POST' and form.is_valid():
+        try:
+            rows = read_rows(form.cleaned_data['file'], form.cleaned_data['format'])
+            report = import_reservations(rows, dry_run=form.cleaned_data['dry_run'])
+        except ValidationError as exc:
+            form.add_error('file', exc)
+        else:
+            if report['created']:
+                messages.success(request, f'Загружено броней: {report["created"]}.')
+    return render(request, 'staff/reservations_import.html', {'form': form, 'report': report})
+
+
 @staff_required
 def table_list(request):
     """Показывает список столов и форму добавления."""
@@ -202,7 +350,11 @@ def manual_booking(request):
     """Создает бронь из панели персонала."""
     form = ReservationForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
-        form.save()
-        messages.success(request, 'Бронирование создано.')
-        return redirect('staff:reservations')
+        try:
+            save_reservation(form.save(commit=False))
+        except ValidationError as exc:
+            form.add_error(None, exc)
+        else:
+            messages.success(request, 'Бронирование создано.')
+            return redirect('staff:reservations')
     return render(request, 'staff/manual_booking.html', {'form': form})
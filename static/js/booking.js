@@ -0,0 +1,165 @@
+(() => {
+  const widget = document.querySelector("[data-booking-widget]");
+  const form = document.querySelector("[data-booking-availability]");
+  if (!widget || !form) {
+    return;
+  }
+
+  const tablesBox = widget.querySelector("[data-booking-tables]");
+  const timesBox = widget.querySelector("[data-booking-times]");
+  const stepBox = document.querySelector("[data-booking-step]");
+
+  const readParams = () => {
+    const data = new FormData(form);
+    const params = new URLSearchParams();
+    for (const name of ["date", "duration_minutes", "seats"]) {
+      const value = data.get(name);
+      if (!value) {
+        return null;
+      }
+      params.set(name, value);
+    }
+    return params;
+  };
+
+  // cache: "no-cache" заставляет браузер переспрашивать сервер с If-None-Match,
+  // поэтому при неизменной занятости приходит пустой ответ 304.
+  const fetchJson = async (url, params) => {
+    const response = await fetch(`${url}?${params}`, {
+      cache: "no-cache",
+      headers: { Accept: "application/json" },
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    return response.json();
+  };
+
+  const element = (tag, className, text) => {
+    const node = document.createElement(tag);
+    if (className) {
+      node.className = className;
+    }
+    if (text !== undefined) {
+      node.textContent = text;
+    }
+    return node;
+  };
+
+  // Форма шага 2 относится к прежнему выбору: после смены параметров она
+  // снова появится с сервера, когда гость выберет новое время.
+  const resetStep = (text) => {
+    if (stepBox) {
+      stepBox.replaceChildren(element("div", "text-muted", text));
+    }
+  };
+
+  const renderTables = (params, tables, selectedId) => {
+    tablesBox.replaceChildren();
+    const block = element("div", "mt-4");
+    block.append(element("h6", "", "Выберите стол"));
+    const list = element("div", "d-flex flex-wrap gap-2");
+    if (!tables.length) {
+      list.append(element("div", "text-muted", "Нет доступных столов на выбранное время."));
+    }
+    for (const table of tables) {
+      const link = element(
+        "a",
+        `btn btn-sm ${table.id === selectedId ? "btn-primary" : "btn-outline-primary"}`,
+        `${table.name} · до ${table.capacity} мест`
+      );
+      const linkParams = new URLSearchParams(params);
+      linkParams.set("table", table.id);
+      link.href = `?${linkParams}`;
+      link.dataset.tableId = table.id;
+      list.append(link);
+    }
+    block.append(list);
+    tablesBox.append(block);
+  };
+
+  const renderTimes = (params, times) => {
+    timesBox.replaceChildren();
+    if (!times.length) {
+      timesBox.append(element("div", "text-muted mt-3", "Нет доступного времени для выбранного стола."));
+      return;
+    }
+    const hint = element("div", "mt-4");
+    hint.append(element("h6", "", "Теперь выберите время"));
+    const block = element("div", "mt-3");
+    block.append(element("h6", "", "Доступное время"));
+    const chips = element("div", "d-flex flex-wrap gap-2 time-chips");
+    // Время выбирается POST-запросом: только он закрепляет слот за клиентом.
+    for (const time of times) {
+      const chip = element("form");
+      chip.method = "post";
+      const fields = new URLSearchParams(params);
+      fields.set("csrfmiddlewaretoken", widget.dataset.csrfToken);
+      for (const [name, value] of fields) {
+        const input = element("input");
+        input.type = "hidden";
+        input.name = name;
+        input.value = value;
+        chip.append(input);
+      }
+      const button = element("button", "btn btn-sm btn-outline-secondary", time);
+      button.type = "submit";
+      button.name = "start_time";
+      button.value = time;
+      chip.append(button);
+      chips.append(chip);
+    }
+    block.append(chips);
+    timesBox.append(hint, block);
+  };
+
+  const loadTables = async () => {
+    const params = readParams();
+    if (!params) {
+      resetStep("Выберите дату, длительность и количество мест, затем стол и время.");
+      return;
+    }
+    try {
+      const data = await fetchJson(widget.dataset.tablesUrl, params);
+      renderTables(params, data.tables, null);
+      timesBox.replaceChildren();
+      resetStep("Выберите стол и время слева, чтобы продолжить.");
+      history.replaceState(null, "", `?${params}`);
+    } catch (error) {
+      form.requestSubmit();
+    }
+  };
+
+  const loadTimes = async (link) => {
+    const params = readParams();
+    if (!params) {
+      window.location.href = link.href;
+      return;
+    }
+    params.set("table", link.dataset.tableId);
+    try {
+      const data = await fetchJson(widget.dataset.timesUrl, params);
+      tablesBox.querySelectorAll("[data-table-id]").forEach((button) => {
+        const selected = button === link;
+        button.classList.toggle("btn-primary", selected);
+        button.classList.toggle("btn-outline-primary", !selected);
+      });
+      renderTimes(params, data.times);
+      resetStep("Выберите время из списка слева, чтобы продолжить.");
+      history.replaceState(null, "", `?${params}`);
+    } catch (error) {
+      window.location.href = link.href;
+    }
+  };
+
+  form.addEventListener("change", loadTables);
+
+  widget.addEventListener("click", (event) => {
+    const link = event.target.closest("[data-table-id]");
+    if (!link) {
+      return;
+    }
+    event.preventDefault();
+    loadTimes(link);
+  });
+})();
@@ -0,0 +1,27 @@
+(() => {
+  const form = document.querySelector("[data-checkin-form]");
+  const resultBox = document.querySelector("[data-checkin-result]");
+  if (!form || !resultBox) {
+    return;
+  }
+  const input = form.querySelector("input[name=code]");
+
+  // Сканер вводит код как клавиатура и нажимает Enter: отправляем без перезагрузки
+  // страницы и сразу освобождаем поле для следующего билета.
+  form.addEventListener("submit", async (event) => {
+    event.preventDefault();
+    const data = new FormData(form);
+    input.value = "";
+    input.focus();
+    try {
+      const response = await fetch(form.action || window.location.href, {
+        method: "POST",
+        body: data,
+        headers: { "X-Requested-With": "fetch" },
+      });
+      resultBox.innerHTML = await response.text();
+    } catch (error) {
+      resultBox.textContent = "Нет связи с сервером, повторите скан.";
+    }
+  });
+})();